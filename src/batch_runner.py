@@ -0,0 +1,132 @@
+# batch_runner.py
+import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".m4v", ".webm")
+
+SUMMARY_FIELDS = ["source", "status", "frames", "elapsed_seconds", "frames_per_second",
+                  "bpm", "rpm", "face_detection_rate", "pose_detection_rate", "error"]
+
+# Pipeline per proses worker, dibuat sekali oleh _init_worker lalu dipakai untuk semua file
+_worker_pipeline = None
+
+def collect_recordings(inputs):
+    """
+    Kumpulkan daftar rekaman dari file dan/atau folder.
+
+    Args:
+        inputs (list): Path file rekaman atau folder yang berisi rekaman.
+
+    Returns:
+        list: Path rekaman (video dan tumpukan frame .npy), terurut.
+    """
+    recordings = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                lower = name.lower()
+                if lower.endswith(VIDEO_EXTENSIONS) or (lower.endswith(".npy") and not lower.endswith("_timestamps.npy")):
+                    recordings.append(os.path.join(path, name))
+        else:
+            recordings.append(path)
+    return recordings
+
+def _init_worker(pipeline_options):
+    # Dipanggil sekali per proses: model MediaPipe tidak dimuat ulang untuk setiap file
+    global _worker_pipeline
+    import cv2
+    from pipeline import PhysioPipeline
+    cv2.setNumThreads(1)  # Paralelisme sudah di level proses, hindari oversubscription thread OpenCV
+    _worker_pipeline = PhysioPipeline(**pipeline_options)
+
+def _process_recording(path, output_dir, fmt, fps):
+    from pipeline import ResultWriter, run_source
+    from video_capture import open_video_source
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    summary = {"source": path, "status": "ok", "error": ""}
+    try:
+        source = open_video_source(path, realtime=False, fps=fps)
+        writer = ResultWriter(output_dir, fmt=fmt, prefix=f"{name}_")
+        try:
+            summary.update(run_source(_worker_pipeline, source, writer))
+        finally:
+            writer.close()
+            source.release()
+    except Exception as e:
+        summary.update({"status": "error", "error": str(e)})
+    return summary
+
+def run_batch(inputs, output_dir, workers=None, fmt="csv", fps=30.0, pipeline_options=None):
+    """
+    Proses banyak rekaman secara paralel dengan ProcessPoolExecutor.
+
+    Setiap worker memegang satu set FaceDetectorMP + PoseRespirationTracker +
+    SignalProcessor (lewat PhysioPipeline) yang diinisialisasi sekali per worker.
+
+    Args:
+        inputs (list): File rekaman dan/atau folder berisi rekaman.
+        output_dir (str): Folder output hasil per file dan ringkasan gabungan.
+        workers (int, optional): Jumlah proses worker, default jumlah core.
+        fmt (str): Format hasil per file, 'csv' atau 'jsonl'.
+        fps (float): FPS untuk tumpukan .npy tanpa file timestamp.
+        pipeline_options (dict, optional): Argumen PhysioPipeline untuk setiap worker.
+
+    Returns:
+        list: Ringkasan per rekaman (dict), urut sesuai daftar input.
+    """
+    recordings = collect_recordings(inputs)
+    if not recordings:
+        print("Tidak ada rekaman yang ditemukan.")
+        return []
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(recordings))
+    print(f"Memproses {len(recordings)} rekaman dengan {workers} worker...")
+
+    summaries = {}
+    start = time.perf_counter()
+    # 'spawn' agar setiap worker memulai MediaPipe dari proses bersih (graph MediaPipe tidak aman di-fork)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(pipeline_options or {},)) as executor:
+        futures = {executor.submit(_process_recording, path, output_dir, fmt, fps): path for path in recordings}
+        for done_count, future in enumerate(as_completed(futures), start=1):
+            path = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:  # Worker mati (misal kehabisan memori)
+                summary = {"source": path, "status": "error", "error": str(e)}
+            summaries[path] = summary
+            if summary["status"] == "ok":
+                print(f"[{done_count}/{len(recordings)}] {os.path.basename(path)}: {summary['frames']} frame, "
+                      f"{summary['frames_per_second']:.1f} FPS, BPM {summary['bpm']:.1f}, RPM {summary['rpm']:.1f}")
+            else:
+                print(f"[{done_count}/{len(recordings)}] {os.path.basename(path)}: GAGAL - {summary['error']}")
+    elapsed = time.perf_counter() - start
+
+    ordered = [summaries[path] for path in recordings]
+    total_frames = sum(s.get("frames", 0) for s in ordered)
+    aggregate = {
+        "recordings": len(ordered),
+        "failed": sum(s["status"] != "ok" for s in ordered),
+        "workers": workers,
+        "total_frames": total_frames,
+        "wall_seconds": elapsed,
+        "aggregate_frames_per_second": total_frames / elapsed if elapsed > 0 else 0.0,
+        "results": ordered,
+    }
+    with open(os.path.join(output_dir, "batch_summary.json"), "w") as f:
+        json.dump(aggregate, f, indent=2)
+    with open(os.path.join(output_dir, "batch_summary.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(ordered)
+
+    print(f"Selesai: {total_frames} frame dari {len(ordered)} rekaman dalam {elapsed:.1f} dtk "
+          f"({aggregate['aggregate_frames_per_second']:.1f} FPS total), {aggregate['failed']} gagal.")
+    return ordered
@@ -0,0 +1,184 @@
+# benchmark_dsp.py
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from signal_processing import (SignalProcessor, PROCESSING_MODE_BLOCK, PROCESSING_MODE_STREAMING,
+                               RPPG_METHOD_GREEN, RPPG_METHOD_POS, RPPG_METHOD_CHROM)
+from synthetic_signals import (SCENARIOS, sample_timestamps, synthetic_rppg_trace, synthetic_respiration_trace,
+                               synthetic_rgb_trace)
+
+RPPG_TOLERANCE_BPM = 3.0  # Estimasi dianggap benar jika selisihnya <= toleransi ini
+RESP_TOLERANCE_RPM = 2.0
+
+# Kasus tambahan untuk --check: CHROM memfilter X/Y per window, sehingga hasilnya harus tetap benar
+# baik jika setiap sampel memicu satu window (hop 0) maupun jika banyak window diproses sekaligus (hop panjang)
+CHROM_HOP_CHECK_CASES = [
+    # (fs, buffer_size, skenario, rppg_hop_seconds)
+    (30.0, 256, "noisy", 0.0),
+    (30.0, 256, "noisy", 2.0),
+    (10.0, 256, "noisy", 2.0),
+]
+
+def parse_list(text, cast=float):
+    # "15,30,60" -> [15.0, 30.0, 60.0]
+    return [cast(item) for item in text.split(",") if item.strip()]
+
+def run_case(kind, fs, buffer_size, scenario, seconds, true_rate, processor_options, seed=0,
+             jitter=0.0, drop_fraction=0.0):
+    """
+    Jalankan satu trace sintetis per sampel melalui SignalProcessor, ukur waktu tiap panggilan
+    dan bandingkan setiap estimasi baru (window penuh) dengan laju sebenarnya. Dengan jitter
+    atau frame yang dibuang, sinyal dievaluasi pada timestamp sebenarnya dan timestamp itu
+    yang diberikan ke processor.
+
+    Args:
+        kind (str): 'rppg' atau 'resp'.
+        fs (float): Frekuensi sampling (Hz).
+        buffer_size (int): Ukuran buffer SignalProcessor.
+        scenario (str): Kunci `synthetic_signals.SCENARIOS`.
+        seconds (float): Durasi trace (detik).
+        true_rate (float): Laju sebenarnya (BPM atau RPM).
+        processor_options (dict): Argumen tambahan SignalProcessor.
+        seed (int): Seed generator acak.
+        jitter (float): Jitter timestamp sebagai pecahan periode sampling.
+        drop_fraction (float): Pecahan frame yang dibuang.
+
+    Returns:
+        dict: Hasil waktu ('mean_us', 'p95_us', 'max_us', 'ms_per_signal_second', 'realtime_factor')
+              dan akurasi ('estimates', 'mae', 'max_error', 'within_tolerance', 'final', 'ok').
+    """
+    processor = SignalProcessor(fs=fs, buffer_size=buffer_size, **processor_options)
+    use_rgb = kind == "rppg" and processor.rppg_projector is not None
+    timestamps = sample_timestamps(fs, seconds, jitter, seed, drop_fraction)
+    if kind == "resp":
+        trace = synthetic_respiration_trace(fs, seconds, true_rate, scenario, seed, timestamps)
+        process, schedule, tolerance = processor.process_respiration, processor.resp_estimate, RESP_TOLERANCE_RPM
+    else:
+        if use_rgb:
+            trace = synthetic_rgb_trace(fs, seconds, true_rate, scenario, seed, timestamps)
+            process = processor.process_rppg_rgb
+        else:
+            trace = synthetic_rppg_trace(fs, seconds, true_rate, scenario, seed, timestamps)
+            process = processor.process_rppg
+        schedule, tolerance = processor.rppg_estimate, RPPG_TOLERANCE_BPM
+
+    n = len(trace)
+    call_seconds = np.zeros(n)
+    estimates = []
+    for i in range(n):
+        value = trace[i]
+        start = time.perf_counter()
+        _, rate = process(value, timestamps[i])
+        call_seconds[i] = time.perf_counter() - start
+        if schedule.fresh and rate > 0 and not schedule.provisional:
+            estimates.append(rate)
+
+    total = call_seconds.sum()
+    errors = np.abs(np.asarray(estimates) - true_rate)
+    mae = float(errors.mean()) if len(errors) else float("nan")
+    return {
+        "kind": kind,
+        "fs": fs,
+        "buffer_size": buffer_size,
+        "scenario": scenario,
+        "true_rate": true_rate,
+        "mean_us": float(call_seconds.mean() * 1e6),
+        "p95_us": float(np.percentile(call_seconds, 95) * 1e6),
+        "max_us": float(call_seconds.max() * 1e6),
+        "ms_per_signal_second": float(total / seconds * 1000.0),
+        "realtime_factor": float(seconds / total) if total > 0 else float("inf"),
+        "estimates": len(estimates),
+        "mae": mae,
+        "max_error": float(errors.max()) if len(errors) else float("nan"),
+        "within_tolerance": float(np.mean(errors <= tolerance)) if len(errors) else 0.0,
+        "final": float(estimates[-1]) if estimates else 0.0,
+        "ok": bool(len(errors) and mae <= tolerance),
+    }
+
+def format_row(result):
+    return (f"{result['kind']:<5} {result['fs']:>5.0f} {result['buffer_size']:>6d} {result['scenario']:<8} "
+            f"{result['mean_us']:>8.1f} {result['p95_us']:>8.1f} {result['ms_per_signal_second']:>7.2f} "
+            f"{result['realtime_factor']:>7.0f} {result['estimates']:>4d} {result['mae']:>6.2f} "
+            f"{result['max_error']:>6.2f} {result['final']:>6.1f}  {'OK' if result['ok'] else 'GAGAL'}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark throughput dan akurasi SignalProcessor pada trace sintetis berlaju diketahui.")
+    parser.add_argument("--fs", default="15,30,60", help="Daftar frekuensi sampling (Hz), dipisah koma.")
+    parser.add_argument("--buffer-sizes", default="256,384,512", help="Daftar ukuran buffer (sampel), dipisah koma.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Skenario sintetis, dipisah koma.")
+    parser.add_argument("--kinds", default="rppg,resp", help="Jenis sinyal: rppg dan/atau resp.")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Durasi setiap trace (detik).")
+    parser.add_argument("--bpm", type=float, default=72.0, help="Detak jantung sebenarnya.")
+    parser.add_argument("--rpm", type=float, default=15.0, help="Laju napas sebenarnya.")
+    parser.add_argument("--mode", choices=[PROCESSING_MODE_BLOCK, PROCESSING_MODE_STREAMING],
+                        default=PROCESSING_MODE_BLOCK, help="Mode pemrosesan SignalProcessor.")
+    parser.add_argument("--rppg-method", choices=[RPPG_METHOD_GREEN, RPPG_METHOD_POS, RPPG_METHOD_CHROM],
+                        default=RPPG_METHOD_GREEN, help="Ekstraksi pulsa rPPG.")
+    parser.add_argument("--rppg-hop", type=float, default=0.5, help="Interval estimasi BPM (detik).")
+    parser.add_argument("--resp-hop", type=float, default=2.0, help="Interval estimasi RPM (detik).")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Jitter timestamp frame, pecahan periode sampling (misal 0.2).")
+    parser.add_argument("--drop-fraction", type=float, default=0.0,
+                        help="Pecahan frame yang dibuang secara acak (misal 0.2 = 20%%).")
+    parser.add_argument("--resample", action="store_true",
+                        help="Aktifkan resampling berbasis timestamp di SignalProcessor.")
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON.")
+    parser.add_argument("--check", action="store_true",
+                        help="Keluar dengan kode 1 jika ada kasus dengan MAE di atas toleransi.")
+    args = parser.parse_args()
+
+    processor_options = {
+        "mode": args.mode,
+        "rppg_hop_seconds": args.rppg_hop,
+        "resp_hop_seconds": args.resp_hop,
+        "progressive": True,
+        "zero_pad_factor": 4,
+        "peak_interpolation": True,
+        "rppg_method": args.rppg_method,
+        "resample": args.resample,
+    }
+    results = []
+    print(f"{'jenis':<5} {'fs':>5} {'buffer':>6} {'skenario':<8} {'us/pgl':>8} {'p95 us':>8} "
+          f"{'ms/dtk':>7} {'xRT':>7} {'n':>4} {'MAE':>6} {'maks':>6} {'akhir':>6}  status")
+    for kind in parse_list(args.kinds, str):
+        true_rate = args.bpm if kind == "rppg" else args.rpm
+        for fs in parse_list(args.fs):
+            for buffer_size in parse_list(args.buffer_sizes, int):
+                for scenario in parse_list(args.scenarios, str):
+                    result = run_case(kind, fs, buffer_size, scenario, args.seconds, true_rate, processor_options,
+                                      jitter=args.jitter, drop_fraction=args.drop_fraction)
+                    results.append(result)
+                    print(format_row(result))
+
+    if args.check:
+        print("\nKasus CHROM tambahan (hop 0 dan hop panjang):")
+        for fs, buffer_size, scenario, rppg_hop in CHROM_HOP_CHECK_CASES:
+            options = dict(processor_options, rppg_method=RPPG_METHOD_CHROM, rppg_hop_seconds=rppg_hop)
+            result = run_case("rppg", fs, buffer_size, scenario, args.seconds, args.bpm, options,
+                              jitter=args.jitter, drop_fraction=args.drop_fraction)
+            result["rppg_hop_seconds"] = rppg_hop
+            results.append(result)
+            print(f"{format_row(result)}  (hop {rppg_hop:g} dtk)")
+
+    failed = [r for r in results if not r["ok"]]
+    print(f"\n{len(results) - len(failed)}/{len(results)} kasus dalam toleransi "
+          f"(rPPG <= {RPPG_TOLERANCE_BPM} BPM, respirasi <= {RESP_TOLERANCE_RPM} RPM).")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "seconds": args.seconds,
+                "jitter": args.jitter,
+                "drop_fraction": args.drop_fraction,
+                "processor_options": processor_options,
+                "results": results,
+            }, f, indent=2)
+        print(f"Hasil ditulis ke: {args.json}")
+    if args.check and failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+# benchmark_replay.py
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+from pipeline import DEFAULT_INFERENCE_WIDTH, DEFAULT_PROCESSOR_OPTIONS, PhysioPipeline
+from profiling import profiler
+from session_recording import SessionReader
+from signal_processing import SignalProcessor, RPPG_METHOD_GREEN, RPPG_METHOD_POS, RPPG_METHOD_CHROM
+from utils import TrackedFaceDetector
+from video_capture import FileFrameSource
+
+try:
+    import resource  # Tidak tersedia di Windows
+except ImportError:
+    resource = None
+
+BACKGROUND_BGR = (200, 200, 205)
+SKIN_BGR = (140, 170, 220)
+SHIRT_BGR = (120, 60, 40)
+HAIR_BGR = (30, 30, 40)
+PULSE_AMPLITUDE = 2.0        # Amplitudo modulasi warna kulit (level intensitas 8-bit)
+PULSE_CHANNEL_WEIGHTS = (0.4, 1.0, 0.6)  # Kontribusi pulsa per kanal (B, G, R), terkuat di hijau
+BREATHING_AMPLITUDE = 0.015  # Amplitudo gerakan vertikal tubuh, relatif terhadap tinggi frame
+
+def draw_person(width, height):
+    """
+    Gambar figur kartun (kepala dengan mata/alis/hidung/mulut, leher, bahu, badan) yang
+    dikenali MediaPipe Face Detection dan Pose sebagai wajah dan tubuh.
+
+    Returns:
+        np.array: Frame BGR (height, width, 3).
+    """
+    frame = np.full((height, width, 3), BACKGROUND_BGR, np.uint8)
+    cx, s = width // 2, height / 480.0
+
+    def p(x, y):
+        return int(cx + x * s), int(y * s)
+
+    def r(value):
+        return max(1, int(value * s))
+
+    shoulder_y = 300
+    torso = np.array([p(-150, shoulder_y), p(150, shoulder_y), p(170, 480), p(-170, 480)], np.int32)
+    cv2.fillPoly(frame, [torso], SHIRT_BGR)
+    for x in (-150, 150):
+        cv2.circle(frame, p(x, shoulder_y + 30), r(35), SHIRT_BGR, -1)
+    cv2.rectangle(frame, p(-30, 230), p(30, shoulder_y + 5), SKIN_BGR, -1)
+    cv2.ellipse(frame, p(0, 170), (r(65), r(85)), 0, 0, 360, SKIN_BGR, -1)
+    cv2.ellipse(frame, p(0, 110), (r(68), r(40)), 0, 180, 360, HAIR_BGR, -1)
+    for x in (-25, 25):
+        cv2.ellipse(frame, p(x, 155), (r(12), r(6)), 0, 0, 360, (255, 255, 255), -1)
+        cv2.circle(frame, p(x, 155), r(5), (40, 30, 20), -1)
+        cv2.line(frame, p(x - 14, 140), p(x + 14, 138), (40, 40, 60), r(3))
+    cv2.line(frame, p(0, 160), p(-6, 195), (110, 130, 180), r(3))
+    cv2.ellipse(frame, p(0, 215), (r(22), r(8)), 0, 0, 180, (80, 80, 170), r(3))
+    return frame
+
+class SyntheticVideoSource(FileFrameSource):
+    def __init__(self, width=640, height=480, fps=30.0, seconds=20.0, bpm=72.0, rpm=15.0, seed=0):
+        """
+        Sumber frame sintetis: warna kulit wajah dimodulasi pada `bpm` dan seluruh figur
+        bergerak naik-turun pada `rpm`. Frame dirender saat dibaca dari lapisan yang sudah
+        disiapkan (salin baris + isi piksel kulit), sehingga klip panjang tidak perlu
+        disimpan di memori. Waktu render dicatat terpisah di `render_seconds`.
+
+        Args:
+            width (int): Lebar frame.
+            height (int): Tinggi frame.
+            fps (float): Laju frame (timestamp = indeks / fps).
+            seconds (float): Durasi klip.
+            bpm (float): Detak jantung sebenarnya.
+            rpm (float): Laju napas sebenarnya.
+            seed (int): Seed pola dithering.
+        """
+        super().__init__(fps, realtime=False)
+        self.width, self.height = width, height
+        self.frame_count = int(seconds * fps)
+        self.bpm, self.rpm = bpm, rpm
+        self.render_seconds = 0.0
+        self._index = 0
+
+        # Kanvas lebih tinggi dari frame agar figur bisa digeser vertikal tanpa tepi kosong
+        self._margin = int(np.ceil(BREATHING_AMPLITUDE * height)) + 1
+        person = draw_person(width, height)
+        self._canvas = np.concatenate([np.full((self._margin, width, 3), BACKGROUND_BGR, np.uint8),
+                                       person,
+                                       np.repeat(person[-1:], self._margin, axis=0)])
+        skin = np.all(self._canvas == SKIN_BGR, axis=2)
+        self._skin_index = np.flatnonzero(skin)
+        # Dithering tetap per piksel: rata-rata ROI mengikuti modulasi sub-level meski kuantisasi 8-bit
+        rng = np.random.default_rng(seed)
+        self._dither = rng.random((len(self._skin_index), 1))
+        self._frame = np.empty((height, width, 3), np.uint8)
+
+    def _read_next(self):
+        if self._index >= self.frame_count:
+            return False, None, self._index / self.fps
+        start = time.perf_counter()
+        t = self._index / self.fps
+        self._index += 1
+
+        offset = int(round(BREATHING_AMPLITUDE * self.height * np.sin(2 * np.pi * self.rpm / 60.0 * t)))
+        canvas = self._canvas[self._margin + offset:self._margin + offset + self.height]
+        np.copyto(self._frame, canvas)
+
+        phase = 2 * np.pi * self.bpm / 60.0 * t
+        pulse = np.sin(phase) + 0.3 * np.sin(2 * phase + 0.5)
+        skin_index = self._skin_index - (self._margin + offset) * self.width
+        valid = (skin_index >= 0) & (skin_index < self.width * self.height)
+        skin = np.asarray(SKIN_BGR, np.float64) + PULSE_AMPLITUDE * pulse * np.asarray(PULSE_CHANNEL_WEIGHTS)
+        self._frame.reshape(-1, 3)[skin_index[valid]] = np.floor(skin + self._dither[valid]).astype(np.uint8)
+        self.render_seconds += time.perf_counter() - start
+        return True, self._frame, t
+
+def peak_rss_mb():
+    # Puncak resident set size proses (MB), None jika tidak didukung platform
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if platform.system() == "Darwin" else peak / 1024.0
+
+def git_commit():
+    # Commit kode yang diukur, agar hasil dari commit berbeda bisa dibandingkan
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_replay(source, pipeline, warmup_frames=10):
+    """
+    Putar seluruh klip sintetis melalui pipeline (wajah -> pose -> SignalProcessor)
+    dan ukur latensi `process_frame` per frame.
+
+    Args:
+        source (SyntheticVideoSource): Sumber frame sintetis.
+        pipeline (PhysioPipeline): Pipeline yang diukur.
+        warmup_frames (int): Frame awal (inisialisasi model) yang tidak dihitung dalam latensi.
+
+    Returns:
+        dict: Throughput, persentil latensi, tingkat deteksi dan galat BPM/RPM terhadap nilai sebenarnya.
+    """
+    pipeline.reset(source.fps)
+    latencies = []
+    bpm_errors, rpm_errors = [], []
+    faces = poses = frames = 0
+    result = None
+    start = time.perf_counter()
+    while True:
+        ret, frame_bgr, timestamp, _ = source.get_timed_frame()
+        if not ret:
+            break
+        frame_start = time.perf_counter()
+        result = pipeline.process_frame(frame_bgr, timestamp)
+        if frames >= warmup_frames:
+            latencies.append(time.perf_counter() - frame_start)
+        frames += 1
+        faces += result["face_bbox"] is not None
+        poses += bool(result["pose_detected"])
+        estimates = result["estimates"]
+        if result["new_bpm"] and not estimates["bpm_provisional"]:
+            bpm_errors.append(abs(estimates["bpm"] - source.bpm))
+        if result["new_rpm"] and not estimates["rpm_provisional"]:
+            rpm_errors.append(abs(estimates["rpm"] - source.rpm))
+    total = time.perf_counter() - start
+    pipeline_seconds = total - source.render_seconds
+
+    latencies_ms = np.asarray(latencies) * 1000.0
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]) if len(latencies_ms) else (0.0, 0.0, 0.0)
+    summary = {
+        "frames": frames,
+        "pipeline_seconds": pipeline_seconds,
+        "frames_per_second": frames / pipeline_seconds if pipeline_seconds > 0 else 0.0,
+        "render_ms_per_frame": 1000.0 * source.render_seconds / frames if frames else 0.0,
+        "latency_ms": {
+            "mean": float(latencies_ms.mean()) if len(latencies_ms) else 0.0,
+            "p50": float(p50), "p95": float(p95), "p99": float(p99),
+            "max": float(latencies_ms.max()) if len(latencies_ms) else 0.0,
+        },
+        "face_detection_rate": faces / frames if frames else 0.0,
+        "pose_detection_rate": poses / frames if frames else 0.0,
+        "bpm": {"true": source.bpm, "final": float(result["bpm"]) if result else 0.0,
+                "estimates": len(bpm_errors), "mae": float(np.mean(bpm_errors)) if bpm_errors else None},
+        "rpm": {"true": source.rpm, "final": float(result["rpm"]) if result else 0.0,
+                "estimates": len(rpm_errors), "mae": float(np.mean(rpm_errors)) if rpm_errors else None},
+    }
+    if isinstance(pipeline.face_detector, TrackedFaceDetector):
+        summary["face_tracking"] = pipeline.face_detector.get_stats()
+    return summary
+
+def check_session_replay(source, processor_options, pose_interval=2, **pipeline_options):
+    """
+    Rekam sesi live dari `source`, putar ulang file sesinya ke SignalProcessor baru dengan
+    opsi yang sama, lalu bandingkan setiap estimasi baru BPM/RPM. Dengan `pose_interval` > 1
+    frame tanpa pose ikut diuji (nilai ditahan tanpa resampler, tanpa sampel dengan resampler).
+
+    Args:
+        source (SyntheticVideoSource): Sumber frame sintetis.
+        processor_options (dict): Opsi SignalProcessor untuk pipeline live maupun replay.
+        pose_interval (int): Jalankan model pose setiap N frame.
+        **pipeline_options: Argumen tambahan PhysioPipeline.
+
+    Returns:
+        dict: {'live', 'replayed', 'mismatches', 'ok'}; estimasi berupa (timestamp, jenis, nilai).
+    """
+    pipeline = PhysioPipeline(fs=source.fps, processor_options=processor_options,
+                              pose_interval=pose_interval, **pipeline_options)
+    live = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "check.physses")
+        try:
+            pipeline.reset(source.fps)
+            pipeline.start_recording(path)
+            while True:
+                ret, frame_bgr, timestamp, _ = source.get_timed_frame()
+                if not ret:
+                    break
+                result = pipeline.process_frame(frame_bgr, timestamp)
+                for kind in ("bpm", "rpm"):
+                    if result[f"new_{kind}"]:
+                        live.append((float(timestamp), kind, float(result["estimates"][kind])))
+            pipeline.stop_recording()
+        finally:
+            pipeline.close()
+        replay = SessionReader(path).replay(SignalProcessor(fs=source.fps, **processor_options))
+    replayed = [(e["timestamp"], e["kind"], e["value"]) for e in replay["estimates"]]
+    mismatches = sum(a != b for a, b in zip(live, replayed)) + abs(len(live) - len(replayed))
+    return {"live": len(live), "replayed": len(replayed), "mismatches": mismatches,
+            "ok": mismatches == 0 and len(live) > 0}
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark end-to-end (wajah -> pose -> DSP) dengan video sintetis berlaju diketahui.")
+    parser.add_argument("--width", type=int, default=640, help="Lebar frame sintetis.")
+    parser.add_argument("--height", type=int, default=480, help="Tinggi frame sintetis.")
+    parser.add_argument("--fps", type=float, default=30.0, help="Laju frame klip.")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Durasi klip (detik).")
+    parser.add_argument("--bpm", type=float, default=72.0, help="Detak jantung sebenarnya.")
+    parser.add_argument("--rpm", type=float, default=15.0, help="Laju napas sebenarnya.")
+    parser.add_argument("--pose-complexity", type=int, choices=[0, 1, 2], default=1,
+                        help="Kompleksitas model MediaPipe Pose.")
+    parser.add_argument("--face-detect-interval", type=int, default=10,
+                        help="Deteksi wajah penuh setiap N frame, tracking di antaranya (1 = setiap frame).")
+    parser.add_argument("--rppg-method", choices=[RPPG_METHOD_GREEN, RPPG_METHOD_POS, RPPG_METHOD_CHROM],
+                        default=RPPG_METHOD_GREEN, help="Ekstraksi pulsa rPPG.")
+    parser.add_argument("--inference-width", type=int, default=DEFAULT_INFERENCE_WIDTH,
+                        help="Lebar frame untuk model wajah/pose (0 = resolusi asli).")
+    parser.add_argument("--profile", action="store_true", help="Sertakan latensi per tahap (profiling.profiler).")
+    parser.add_argument("--output", default="replay_benchmark.json", help="File JSON hasil.")
+    parser.add_argument("--check-replay", action="store_true",
+                        help="Hanya periksa bahwa replay file sesi menghasilkan estimasi identik dengan sesi live "
+                             "(resample aktif dan nonaktif, pose setiap 2 frame); keluar dengan kode 1 jika berbeda.")
+    args = parser.parse_args()
+
+    if args.check_replay:
+        failed = False
+        for resample in (False, True):
+            source = SyntheticVideoSource(args.width, args.height, args.fps, args.seconds, args.bpm, args.rpm)
+            options = dict(DEFAULT_PROCESSOR_OPTIONS, rppg_method=args.rppg_method, resample=resample)
+            check = check_session_replay(source, options, pose_model_complexity=args.pose_complexity,
+                                         face_detect_interval=args.face_detect_interval,
+                                         inference_width=args.inference_width or None)
+            failed |= not check["ok"]
+            print(f"resample={resample}: {check['live']} estimasi live, {check['replayed']} estimasi replay, "
+                  f"{check['mismatches']} berbeda  {'OK' if check['ok'] else 'GAGAL'}")
+        sys.exit(1 if failed else 0)
+
+    profiler.enabled = args.profile
+    source = SyntheticVideoSource(args.width, args.height, args.fps, args.seconds, args.bpm, args.rpm)
+    pipeline = PhysioPipeline(fs=args.fps,
+                              processor_options=dict(DEFAULT_PROCESSOR_OPTIONS, rppg_method=args.rppg_method),
+                              pose_model_complexity=args.pose_complexity,
+                              face_detect_interval=args.face_detect_interval,
+                              inference_width=args.inference_width or None)
+    try:
+        summary = run_replay(source, pipeline)
+    finally:
+        pipeline.close()
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": git_commit(),
+        "machine": {"platform": platform.platform(), "processor": platform.processor(),
+                    "python": platform.python_version(), "cpu_count": os.cpu_count()},
+        "options": vars(args),
+        "peak_rss_mb": peak_rss_mb(),
+        "results": summary,
+    }
+    if args.profile:
+        report["profile"] = profiler.summary()
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    latency = summary["latency_ms"]
+    print(f"{summary['frames']} frame {args.width}x{args.height}: {summary['frames_per_second']:.1f} FPS, "
+          f"latensi p50/p95/p99 {latency['p50']:.1f}/{latency['p95']:.1f}/{latency['p99']:.1f} ms, "
+          f"puncak memori {report['peak_rss_mb'] or 0:.0f} MB")
+    print(f"Deteksi wajah {summary['face_detection_rate']:.0%}, pose {summary['pose_detection_rate']:.0%}; "
+          f"BPM akhir {summary['bpm']['final']:.1f} (sebenarnya {args.bpm:.0f}), "
+          f"RPM akhir {summary['rpm']['final']:.1f} (sebenarnya {args.rpm:.0f})")
+    print(f"Hasil ditulis ke: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,24 @@ from tkinter import ttk, messagebox, filedialog
 import cv2
 import numpy as np
 from PIL import Image, ImageTk
-import threading
 import time
 import os
-from video_capture import VideoCapture
-from signal_processing import SignalProcessor, SIGNAL_BUFFER_SIZE
-from visualization import RealtimePlotter # Pastikan ini versi yang menampilkan semua 4 sinyal dalam 3 subplot & get_current_plot_data()
-from utils import FaceDetectorMP, get_roi_pixels
-from pose_respiration_tracker import PoseRespirationTracker
+from video_capture import VideoCapture, open_video_source
+from signal_processing import SIGNAL_BUFFER_SIZE
+from visualization import RealtimePlotter, PLOT_RENDER_HZ # Pastikan ini versi yang menampilkan semua 4 sinyal dalam 3 subplot & get_current_plot_data()
+from pipeline import PhysioPipeline
+from pipeline_stages import LatestMailbox, StagedPipeline
+from profiling import profiler
+from load_controller import LoadSheddingController
 
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 
 VIDEO_DISPLAY_WIDTH = 640
 VIDEO_DISPLAY_HEIGHT = 480
+GUI_POLL_INTERVAL_MS = 33  # Thread Tk mengambil snapshot terbaru ~30 kali per detik
+PROFILE_REFRESH_MS = 1000  # Panel profil latensi diperbarui setiap detik
+VALID_SOURCE_FPS_RANGE = (5.0, 120.0)  # FPS sumber di luar rentang ini dianggap laporan driver yang salah
 
 class AppGUI(tk.Tk):
     def __init__(self):
@@ -31,26 +35,32 @@ class AppGUI(tk.Tk):
         self.processing_fps = 0.0
         self.frame_count_fps_calc = 0
         self.start_time_fps_calc = time.time()
+        self.display_buffer = None  # Buffer letterbox RGB yang dipakai ulang setiap frame
+        self.display_photo = None   # PhotoImage persisten, diperbarui dengan paste()
+        self._display_geometry = None
+        # Snapshot tampilan terbaru dari thread render; snapshot lama yang belum tampil ditimpa
+        self.gui_mailbox = LatestMailbox()
 
         self.video_stream = None
+        self.video_source = 0  # ID kamera, atau path rekaman (video/folder gambar/.npy)
         self.processor = None
         self.plotter = None
         self.plot_canvas_agg = None
         self.plot_canvas_widget = None
         
-        self.face_detector_mp = None
-        self.pose_tracker = None     
+        self.pipeline = None
         self.raw_resp_debug_label = None
 
-        self.processing_thread = None
+        self.staged_pipeline = None  # capture -> inferensi -> DSP -> render di thread terpisah
+        self.load_controller = None  # Penurunan kualitas adaptif saat pemrosesan melebihi budget frame
+        self.frame_count_proc_fps = 0
+        self.start_time_proc_fps = time.time()
         self.is_processing = False
-        self.effective_fps = 30.0 
+        self.effective_fps = 30.0  # fs cadangan jika FPS sumber tidak valid; diganti FPS sumber saat mulai
         print(f"Target effective FPS set to: {self.effective_fps}")
 
-        self.bpm_history = []
-        self.rpm_history = []
-        self.rate_history_size = 15 
 
+        self.session_save_path = "sessions"  # Rekaman sesi biner (lihat session_recording.py)
         self.plot_save_path = "saved_plots"
         if not os.path.exists(self.plot_save_path):
             os.makedirs(self.plot_save_path)
@@ -66,6 +76,7 @@ class AppGUI(tk.Tk):
 
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
         self._initialize_video_placeholder()
+        self._refresh_profile_panel()
         print("AppGUI Initialized")
 
     def _setup_left_panel(self):
@@ -89,6 +100,8 @@ class AppGUI(tk.Tk):
         self.gui_fps_label.grid(row=1, column=1, padx=10, pady=3, sticky="w")
         self.raw_resp_debug_label = ttk.Label(self.data_frame, text="Raw Resp Motion: --", font=("Helvetica", 9))
         self.raw_resp_debug_label.grid(row=2, column=0, columnspan=2, padx=10, pady=3, sticky="w")
+        self.quality_label = ttk.Label(self.data_frame, text="Kualitas: --", font=("Helvetica", 9))
+        self.quality_label.grid(row=3, column=0, columnspan=2, padx=10, pady=3, sticky="w")
 
         self.control_frame = ttk.Frame(self.main_left_frame)
         self.control_frame.pack(pady=10, padx=5, fill="x")
@@ -96,26 +109,57 @@ class AppGUI(tk.Tk):
         self.start_button.pack(side="left", padx=5, pady=5)
         self.stop_button = ttk.Button(self.control_frame, text="Berhenti", command=lambda: self.stop_processing(), state=tk.DISABLED)
         self.stop_button.pack(side="left", padx=5, pady=5)
+        self.open_file_button = ttk.Button(self.control_frame, text="Buka Rekaman...", command=self.open_recording)
+        self.open_file_button.pack(side="left", padx=5, pady=5)
         
         # Tombol untuk menyimpan plot dengan layout 4 subplot terpisah
         self.save_custom_layout_button = ttk.Button(self.control_frame, text="Simpan Plot (4 Subplot)", command=self.save_plot_with_custom_layout)
         self.save_custom_layout_button.pack(side="left", padx=5, pady=5)
         self.save_custom_layout_button.config(state=tk.DISABLED)
 
+        # Rekam sinyal mentah per frame ke file sesi agar DSP bisa diulang tanpa kamera (main.py replay)
+        self.record_session_var = tk.BooleanVar(value=False)
+        self.record_session_checkbutton = ttk.Checkbutton(self.control_frame, text="Rekam Sesi",
+                                                          variable=self.record_session_var)
+        self.record_session_checkbutton.pack(side="left", padx=5, pady=5)
+
+        # Turunkan kualitas bertahap (plot, model pose, frekuensi pose, resolusi) saat mesin sibuk
+        self.load_shedding_var = tk.BooleanVar(value=True)
+        self.load_shedding_checkbutton = ttk.Checkbutton(self.control_frame, text="Kualitas Adaptif",
+                                                         variable=self.load_shedding_var)
+        self.load_shedding_checkbutton.pack(side="left", padx=5, pady=5)
+
 
     def _setup_right_panel(self):
         self.plot_display_frame = ttk.LabelFrame(self.main_right_frame, text="Plot Sinyal")
         self.plot_display_frame.pack(pady=5, padx=5, fill="both", expand=True)
 
+        # Panel profil latensi per tahap (p50/p95/p99 bergulir), nonaktif secara default
+        self.profile_frame = ttk.LabelFrame(self.main_right_frame, text="Profil Latensi per Tahap")
+        self.profile_frame.pack(pady=5, padx=5, fill="x")
+        self.profile_enabled_var = tk.BooleanVar(value=profiler.enabled)
+        self.profile_checkbutton = ttk.Checkbutton(self.profile_frame, text="Aktifkan Profiling",
+                                                   variable=self.profile_enabled_var, command=self.toggle_profiling)
+        self.profile_checkbutton.grid(row=0, column=0, padx=10, pady=3, sticky="w")
+        self.save_profile_button = ttk.Button(self.profile_frame, text="Simpan Profil", command=self.save_profile)
+        self.save_profile_button.grid(row=0, column=1, padx=10, pady=3, sticky="w")
+        self.profile_label = ttk.Label(self.profile_frame, text="Profiling nonaktif.", font=("Courier", 9), justify=tk.LEFT)
+        self.profile_label.grid(row=1, column=0, columnspan=2, padx=10, pady=3, sticky="w")
+
 
     def _initialize_video_placeholder(self):
         print("Initializing video placeholder...")
         try:
-            placeholder_img = Image.new('RGB', (self.VIDEO_DISPLAY_WIDTH, self.VIDEO_DISPLAY_HEIGHT), color = (128, 128, 128))
-            self.imgtk_placeholder_ref = ImageTk.PhotoImage(image=placeholder_img)
+            # Buffer letterbox (RGB) dan PhotoImage dibuat sekali lalu diperbarui di tempat setiap frame
+            if self.display_buffer is None:
+                self.display_buffer = np.full((self.VIDEO_DISPLAY_HEIGHT, self.VIDEO_DISPLAY_WIDTH, 3), 128, dtype=np.uint8)
+                self.display_photo = ImageTk.PhotoImage('RGB', (self.VIDEO_DISPLAY_WIDTH, self.VIDEO_DISPLAY_HEIGHT))
+            self.display_buffer.fill(128)
+            self._display_geometry = None
+            self.display_photo.paste(Image.fromarray(self.display_buffer))
             if hasattr(self, 'video_label') and self.video_label:
-                 self.video_label.imgtk = self.imgtk_placeholder_ref
-                 self.video_label.config(image=self.imgtk_placeholder_ref)
+                 self.video_label.imgtk = self.display_photo
+                 self.video_label.config(image=self.display_photo)
                  print("Video placeholder set.")
             else:
                 print("Error: video_label not initialized before placeholder.")
@@ -126,23 +170,50 @@ class AppGUI(tk.Tk):
     def initialize_processing_components(self):
         print("Initializing processing components...")
         try:
-            self.video_stream = VideoCapture(device_id=0) 
-            print(f"VideoCapture opened: {self.video_stream.cap.isOpened() if self.video_stream and self.video_stream.cap else 'N/A'}")
+            if isinstance(self.video_source, int):
+                # Grabber di thread terpisah: pemrosesan selalu mendapat frame terbaru dengan latensi stabil
+                self.video_stream = VideoCapture(device_id=self.video_source, threaded=True, driver_buffer_size=1)
+            else:
+                # Rekaman diputar sesuai timestamp aslinya agar tampilan GUI seperti kamera
+                self.video_stream = open_video_source(self.video_source, realtime=True)
+            print(f"Video source opened: {self.video_source}")
             
-            actual_cam_fps = self.video_stream.fps if self.video_stream.fps and self.video_stream.fps > 0 else None
-            if not actual_cam_fps:
+            # fs mengikuti FPS sumber yang sebenarnya; SignalProcessor meresample sampel ke grid
+            # 1 / fs berdasarkan timestamp frame, jadi frame terlambat/dilewati tidak membiaskan BPM/RPM
+            actual_cam_fps = self.video_stream.fps
+            min_fps, max_fps = VALID_SOURCE_FPS_RANGE
+            if not actual_cam_fps or not min_fps <= actual_cam_fps <= max_fps:
+                 processing_fs = 30.0
                  messagebox.showwarning("Peringatan FPS Kamera",
-                                       f"FPS kamera tidak valid ({self.video_stream.fps}). Pemrosesan akan menggunakan target fs={self.effective_fps} FPS.")
+                                       f"FPS kamera tidak valid ({self.video_stream.fps}). Pemrosesan akan menggunakan fs={processing_fs} FPS.")
             else:
-                 print(f"Kamera FPS terdeteksi: {actual_cam_fps}. Pemrosesan akan menggunakan target fs={self.effective_fps}")
-
-            self.processor = SignalProcessor(fs=self.effective_fps, buffer_size=SIGNAL_BUFFER_SIZE)
+                 processing_fs = float(actual_cam_fps)
+                 print(f"Kamera FPS terdeteksi: {actual_cam_fps}. Pemrosesan akan menggunakan fs={processing_fs}")
+            self.effective_fps = processing_fs
+
+            # Rantai wajah -> pose -> SignalProcessor yang sama dengan mode headless
+            if self.pipeline is None:
+                self.pipeline = PhysioPipeline(fs=self.effective_fps, buffer_size=SIGNAL_BUFFER_SIZE,
+                                               pose_model_complexity=1)
+            else:
+                self.pipeline.reset(self.effective_fps)
+            self.processor = self.pipeline.processor
+            # Setiap sesi dimulai dengan kualitas penuh; budget frame = 1 / fs sumber
+            self.pipeline.apply_quality_settings(self.pipeline.base_quality)
+            if self.load_shedding_var.get():
+                self.load_controller = LoadSheddingController(dict(self.pipeline.base_quality, plot_hz=PLOT_RENDER_HZ),
+                                                              self.effective_fps, frame_width=self.video_stream.width)
+            else:
+                self.load_controller = None
+            if self.record_session_var.get():
+                session_file = os.path.join(self.session_save_path, f"session_{time.strftime('%Y%m%d-%H%M%S')}.physses")
+                self.pipeline.start_recording(session_file, metadata={"source": str(self.video_source)})
+                print(f"Merekam sesi ke: {session_file}")
             self.plotter = RealtimePlotter(buffer_size=SIGNAL_BUFFER_SIZE) # visualization.py harus menampilkan 3 subplot (resp raw & filtered ditumpuk)
-            self.face_detector_mp = FaceDetectorMP(model_selection=0)
-            self.pose_tracker = PoseRespirationTracker(model_complexity=1)
             
             if self.plot_canvas_widget: self.plot_canvas_widget.destroy()
             self.plot_canvas_agg = FigureCanvasTkAgg(self.plotter.get_figure(), master=self.plot_display_frame)
+            self.plotter.attach(self.plot_canvas_agg)  # Blitting: latar statis disimpan setiap draw penuh
             self.plot_canvas_agg.draw()
             self.plot_canvas_widget = self.plot_canvas_agg.get_tk_widget()
             self.plot_canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
@@ -156,6 +227,17 @@ class AppGUI(tk.Tk):
             return False
 
 
+    def open_recording(self):
+        path = filedialog.askopenfilename(title="Pilih rekaman video atau tumpukan frame .npy",
+                                          filetypes=[("Video", "*.mp4 *.avi *.mkv *.mov"), ("Frame NumPy", "*.npy"), ("Semua file", "*.*")])
+        if not path:
+            return
+        self.video_source = path
+        print(f"Sumber rekaman dipilih: {path}")
+        if not self.is_processing:
+            self.start_processing()
+
+
     def start_processing(self):
         print("Start processing called.")
         if not self.initialize_processing_components():
@@ -163,21 +245,37 @@ class AppGUI(tk.Tk):
             return
         self.is_processing = True
         self.start_button.config(state=tk.DISABLED)
+        self.open_file_button.config(state=tk.DISABLED)
+        self.record_session_checkbutton.config(state=tk.DISABLED)
+        self.load_shedding_checkbutton.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.save_custom_layout_button.config(state=tk.NORMAL) # Enable tombol simpan kustom
-        self.processing_thread = threading.Thread(target=self._process_loop, daemon=True)
-        self.processing_thread.start()
+        self.processing_fps = 0.0
+        self.frame_count_proc_fps = 0
+        self.start_time_proc_fps = time.time()
+        self.gui_mailbox.clear()
+        self.frame_count_fps_calc = 0
+        self.start_time_fps_calc = time.time()
+        self.staged_pipeline = StagedPipeline(self.video_stream, self.pipeline,
+                                              render_func=self._render_result,
+                                              on_finished=self._on_pipeline_finished,
+                                              load_controller=self.load_controller)
+        self.staged_pipeline.start()
         self.update_gui_fps_display()
-        print("Processing thread started.")
+        self._render_plots()
+        print("Processing stages started.")
 
 
     def stop_processing(self, called_on_exit=False):
         print("Stop processing called.")
         self.is_processing = False
-        if self.processing_thread and self.processing_thread.is_alive():
-            print("Joining processing thread...")
-            self.processing_thread.join(timeout=1.5) 
-            print("Processing thread joined.")
+        if self.staged_pipeline:
+            print("Stopping processing stages...")
+            self.staged_pipeline.stop(timeout=1.5)
+            self.staged_pipeline = None
+            print("Processing stages stopped.")
+        if self.pipeline:
+            self.pipeline.stop_recording()  # Setelah tahap DSP berhenti: semua frame sudah tercatat
         if self.video_stream:
             print("Releasing video stream...")
             self.video_stream.release(); self.video_stream = None
@@ -191,111 +289,109 @@ class AppGUI(tk.Tk):
             self.bpm_label.config(text="BPM (rPPG): --"); self.rpm_label.config(text="RPM (Resp): --")
             self.processing_fps_label.config(text="Processing FPS: --"); self.gui_fps_label.config(text="GUI FPS: --")
             if self.raw_resp_debug_label: self.raw_resp_debug_label.config(text="Raw Resp Motion: --")
-            self.bpm_history = []; self.rpm_history = []
+            self.quality_label.config(text="Kualitas: --")
             self.start_button.config(state=tk.NORMAL); self.stop_button.config(state=tk.DISABLED)
+            self.open_file_button.config(state=tk.NORMAL)
+            self.record_session_checkbutton.config(state=tk.NORMAL)
+            self.load_shedding_checkbutton.config(state=tk.NORMAL)
+            self.video_source = 0  # Tombol Mulai berikutnya kembali memakai kamera
             self.save_custom_layout_button.config(state=tk.DISABLED) # Disable tombol simpan kustom
         print("Pemrosesan dihentikan (GUI updated).")
 
 
-    def _process_loop(self):
-        # ... (Konten _process_loop tetap sama, pastikan semua data sinyal dikirim ke self.plotter.update_plots) ...
-        print("Process loop started.")
-        frame_count_proc_fps = 0
-        start_time_proc_fps = time.time()
-        current_processing_fps = 0.0
-        
-        r_signal_value, g_signal_value, b_signal_value = 0.0, 0.0, 0.0
-        averaged_bpm, averaged_rpm = 0.0, 0.0
-        raw_resp_motion_signal = 0.0 
-
-        target_frame_duration = 1.0 / self.effective_fps
-        frame_counter = 0
-        
-        while self.is_processing and self.video_stream:
-            loop_start_time = time.time()
-            frame_counter +=1
-
-            ret, frame_original_bgr = self.video_stream.get_frame()
-            if not ret or frame_original_bgr is None:
-                print(f"Loop {frame_counter}: Failed to get frame or frame is None. Stopping. Ret: {ret}")
-                if self.is_processing: self.after(0, lambda: messagebox.showerror("Stream Error", "Gagal mendapatkan frame atau frame kosong."))
-                self.is_processing = False; break
-            
-            frame_original_rgb_mp = cv2.cvtColor(frame_original_bgr, cv2.COLOR_BGR2RGB)
-            processed_frame_for_drawing = frame_original_bgr.copy()
-
-            face_bbox = self.face_detector_mp.detect_face_bounding_box(frame_original_rgb_mp)
-            
-            r_fallback = np.mean(frame_original_bgr[:, :, 2])
-            g_fallback = np.mean(frame_original_bgr[:, :, 1])
-            b_fallback = np.mean(frame_original_bgr[:, :, 0])
-            r_signal_value, g_signal_value, b_signal_value = r_fallback, g_fallback, b_fallback
-            
-            if face_bbox is not None:
-                cv2.rectangle(processed_frame_for_drawing,
-                              (face_bbox[0], face_bbox[1]),
-                              (face_bbox[0] + face_bbox[2], face_bbox[1] + face_bbox[3]),
-                              (0, 255, 0), 2)
-                face_roi_pixels = get_roi_pixels(frame_original_bgr, face_bbox)
-                if face_roi_pixels.size > 0 and len(face_roi_pixels.shape) == 3:
-                    r_signal_value = np.mean(face_roi_pixels[:, :, 2])
-                    g_signal_value = np.mean(face_roi_pixels[:, :, 1])
-                    b_signal_value = np.mean(face_roi_pixels[:, :, 0])
-            
-            filtered_rppg, bpm_current = self.processor.process_rppg(g_signal_value)
-            raw_resp_motion_signal, pose_detected = self.pose_tracker.get_respiration_signal_and_draw_landmarks(
-                frame_original_rgb_mp, processed_frame_for_drawing
-            )
-            filtered_resp, rpm_current = self.processor.process_respiration(raw_resp_motion_signal)
-            
-            current_bpm_to_average = bpm_current
-            current_rpm_to_average = rpm_current
-
-            if current_bpm_to_average > 0:
-                self.bpm_history.append(current_bpm_to_average)
-                if len(self.bpm_history) > self.rate_history_size: self.bpm_history.pop(0)
-                if self.bpm_history: averaged_bpm = np.mean(self.bpm_history)
-            elif not self.bpm_history: averaged_bpm = 0.0
-            
-            if current_rpm_to_average > 0:
-                self.rpm_history.append(current_rpm_to_average)
-                if len(self.rpm_history) > self.rate_history_size: self.rpm_history.pop(0)
-                if self.rpm_history: averaged_rpm = np.mean(self.rpm_history)
-            elif not self.rpm_history: averaged_rpm = 0.0
-
-            frame_for_gui_display = self._prepare_frame_for_display(processed_frame_for_drawing)
-            
-            if self.winfo_exists():
-                self.after(0, self._update_gui_data, frame_for_gui_display, averaged_bpm, averaged_rpm, current_processing_fps, raw_resp_motion_signal)
-
-            if self.plotter and self.plot_canvas_agg and self.winfo_exists():
-                rppg_plot_data_to_send = filtered_rppg if len(filtered_rppg) > 0 else self.processor.get_raw_rppg_signal_for_plot()
-                resp_filtered_plot_data_to_send = filtered_resp if len(filtered_resp) > 0 else self.processor.get_raw_resp_signal_for_plot()
-                
-                self.plotter.update_plots(rppg_plot_data_to_send, 
+    def _render_result(self, result):
+        # Tahap render (thread sendiri): siapkan frame tampilan dan data plot lalu titipkan snapshot
+        # ke mailbox; thread Tk mengambilnya sendiri (update_gui_fps_display), tanpa after() per frame.
+        # Plotter hanya menerima data numpy di sini, artist matplotlib disentuh di thread Tk.
+        # Capture, inferensi dan DSP berjalan di tahap lain yang dihubungkan antrean terbatas.
+        # Tidak ada panggilan Tk di thread ini; cek winfo_exists() dilakukan sisi Tk
+        # (update_gui_fps_display, _render_plots) yang mengambil hasilnya.
+        if not self.is_processing:
+            return
+        r_signal_value, g_signal_value, b_signal_value = result["rgb"]
+        raw_resp_motion_signal = result["resp_raw"]
+        averaged_bpm, averaged_rpm = result["bpm"], result["rpm"]
+
+        self.frame_count_proc_fps += 1
+        elapsed_time_proc_cycle = time.time() - self.start_time_proc_fps
+        if elapsed_time_proc_cycle >= 1.0:
+            self.processing_fps = self.frame_count_proc_fps / elapsed_time_proc_cycle
+            self.frame_count_proc_fps = 0; self.start_time_proc_fps = time.time()
+
+        # Frame beranotasi dikirim apa adanya; resize ke letterbox dilakukan thread Tk hanya jika terlihat
+        self.gui_mailbox.publish((result["frame_display"], averaged_bpm, averaged_rpm, self.processing_fps, raw_resp_motion_signal,
+                                  result["estimates"]))
+
+        if self.plotter and self.plot_canvas_agg:
+            # Salinan dari tahap DSP (trace terfilter, atau sinyal mentah jika filter belum siap)
+            rppg_plot_data_to_send = result["rppg_plot"]
+            resp_filtered_plot_data_to_send = result["resp_plot"]
+
+            with profiler.stage("plot_update"):
+                self.plotter.update_plots(rppg_plot_data_to_send,
                                           resp_filtered_plot_data_to_send,
                                           r_raw_value=r_signal_value,
                                           g_raw_value=g_signal_value,
                                           b_raw_value=b_signal_value,
-                                          resp_raw_value=raw_resp_motion_signal) # Ini penting untuk tampilan GUI
-                self.after(0, lambda: self.plot_canvas_agg.draw_idle() if self.plot_canvas_agg and self.winfo_exists() else None)
-            
-            frame_count_proc_fps += 1
-            elapsed_time_proc_cycle = time.time() - start_time_proc_fps
-            if elapsed_time_proc_cycle >= 1.0:
-                current_processing_fps = frame_count_proc_fps / elapsed_time_proc_cycle
-                frame_count_proc_fps = 0; start_time_proc_fps = time.time()
-            
-            loop_processing_time = time.time() - loop_start_time
-            sleep_time = target_frame_duration - loop_processing_time
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-        
-        print("Process loop attempting to stop naturally or by flag.")
-        if self.winfo_exists() and not self.is_processing:
-            print("Scheduling stop_processing from _process_loop due to is_processing=False")
+                                          resp_raw_value=raw_resp_motion_signal) # Hanya data; digambar oleh _render_plots
+
+
+    def _render_plots(self):
+        # Render plot di thread Tk dengan laju tetap (PLOT_RENDER_HZ, atau lebih rendah saat pengendali
+        # beban menurunkan kualitas), terlepas dari laju pemrosesan
+        if not self.is_processing or not self.winfo_exists():
+            return
+        if self.plotter and self.plot_canvas_agg and self._is_display_visible():
+            try:
+                with profiler.stage("plot_render"):
+                    self.plotter.render()
+            except Exception as e:
+                print(f"Error rendering plots: {e}")
+        plot_hz = self.load_controller.settings["plot_hz"] if self.load_controller else PLOT_RENDER_HZ
+        self.after(int(1000 / plot_hz), self._render_plots)
+
+
+    def toggle_profiling(self):
+        # Profiler global: semua tahap (capture, inferensi, DSP, tampilan, plot) mulai/berhenti diukur
+        profiler.enabled = self.profile_enabled_var.get()
+        if profiler.enabled:
+            profiler.reset()
+        print(f"Profiling {'diaktifkan' if profiler.enabled else 'dinonaktifkan'}.")
+
+
+    def _refresh_profile_panel(self):
+        if not self.winfo_exists():
+            return
+        if profiler.enabled:
+            self.profile_label.config(text=profiler.format_summary())
+        self.after(PROFILE_REFRESH_MS, self._refresh_profile_panel)
+
+
+    def save_profile(self):
+        stats = profiler.summary()
+        if not stats:
+            messagebox.showwarning("Simpan Profil", "Belum ada data profil. Aktifkan profiling dan jalankan pemrosesan terlebih dahulu.")
+            return
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        filename = os.path.join(self.plot_save_path, f"latency_profile_{timestamp}.json")
+        try:
+            profiler.dump(filename)
+            messagebox.showinfo("Simpan Profil", f"Profil latensi berhasil disimpan sebagai:\n{filename}")
+        except OSError as e:
+            messagebox.showerror("Simpan Profil Error", f"Gagal menyimpan profil: {e}")
+
+
+    def _on_pipeline_finished(self):
+        # Dipanggil dari thread pengawas saat sumber habis/gagal atau salah satu tahap error
+        print("Staged pipeline berhenti sendiri (sumber habis atau error).")
+        if not self.is_processing:
+            return
+        self.is_processing = False
+        is_live = self.video_stream is not None and self.video_stream.is_live
+        if self.winfo_exists():
+            if is_live:
+                self.after(0, lambda: messagebox.showerror("Stream Error", "Gagal mendapatkan frame atau frame kosong."))
             self.after(0, self.stop_processing)
-        print("Process loop ended.")
 
 
     # --- Metode save_plot_with_custom_layout BARU ---
@@ -398,61 +494,61 @@ class AppGUI(tk.Tk):
             messagebox.showerror("Simpan Plot Error", "Objek plotter tidak tersedia atau metode get_current_plot_data tidak ditemukan.")
 
 
-    def _prepare_frame_for_display(self, frame_to_display):
-        if frame_to_display is None or frame_to_display.size == 0:
-            return np.full((self.VIDEO_DISPLAY_HEIGHT, self.VIDEO_DISPLAY_WIDTH, 3), 128, dtype=np.uint8)
-        
-        original_h, original_w = frame_to_display.shape[:2]
+    def _display_frame(self, frame_bgr):
+        # Tampilkan frame tanpa alokasi array baru: resize langsung ke bagian dalam buffer letterbox
+        # (dst), konversi BGR->RGB di tempat, lalu perbarui PhotoImage yang sama
+        if frame_bgr is None or frame_bgr.size == 0:
+            return
+        original_h, original_w = frame_bgr.shape[:2]
         target_w, target_h = self.VIDEO_DISPLAY_WIDTH, self.VIDEO_DISPLAY_HEIGHT
-        
-        aspect_ratio_original = original_w / original_h
-        aspect_ratio_target = target_w / target_h
 
-        if aspect_ratio_original > aspect_ratio_target:
-            new_w = target_w
-            new_h = int(target_w / aspect_ratio_original)
-        else:
-            new_h = target_h
-            new_w = int(target_h * aspect_ratio_original)
+        if self._display_geometry is None or self._display_geometry[0] != (original_h, original_w):
+            # Ukuran sumber berubah: hitung ulang area letterbox dan reset latar abu-abu
+            aspect_ratio_original = original_w / original_h
+            if aspect_ratio_original > target_w / target_h:
+                new_w, new_h = target_w, int(target_w / aspect_ratio_original)
+            else:
+                new_w, new_h = int(target_h * aspect_ratio_original), target_h
+            if new_w <= 0 or new_h <= 0:
+                return
+            x_offset, y_offset = (target_w - new_w) // 2, (target_h - new_h) // 2
+            self.display_buffer.fill(128)
+            self._display_geometry = ((original_h, original_w), (new_w, new_h),
+                                      self.display_buffer[y_offset:y_offset + new_h, x_offset:x_offset + new_w])
 
-        if new_w <= 0 or new_h <= 0:
-             return np.full((target_h, target_w, 3), 128, dtype=np.uint8)
+        _, (new_w, new_h), content = self._display_geometry
+        cv2.resize(frame_bgr, (new_w, new_h), dst=content, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(content, cv2.COLOR_BGR2RGB, dst=content)
+        self.display_photo.paste(Image.fromarray(self.display_buffer))
 
-        try:
-            resized_content = cv2.resize(frame_to_display, (new_w, new_h))
-        except Exception as e:
-            print(f"Error resizing frame in _prepare_frame_for_display: {e}")
-            return np.full((target_h, target_w, 3), 128, dtype=np.uint8)
-        
-        full_sized_frame = np.full((target_h, target_w, 3), (128,128,128), dtype=np.uint8)
-        
-        x_offset = (target_w - new_w) // 2
-        y_offset = (target_h - new_h) // 2
-        
-        full_sized_frame[y_offset:y_offset+new_h, x_offset:x_offset+new_w] = resized_content
-        return full_sized_frame
 
+    def _is_display_visible(self):
+        # Tidak perlu menggambar apa pun saat jendela diminimalkan atau tidak terlihat
+        return self.state() != 'iconic' and self.video_label.winfo_viewable()
 
-    def _update_gui_data(self, frame_cv_display, bpm_to_display, rpm_to_display, proc_fps, raw_resp_signal_val):
+
+    def _update_gui_data(self, frame_cv_display, bpm_to_display, rpm_to_display, proc_fps, raw_resp_signal_val,
+                         estimates=None):
         if not self.winfo_exists(): return
         if frame_cv_display is None:
             print("Error in _update_gui_data: frame_cv_display is None. Skipping update.")
             return
             
         try:
-            img = cv2.cvtColor(frame_cv_display, cv2.COLOR_BGR2RGB)
-            img_pil = Image.fromarray(img)
-            self.imgtk_display_ref = ImageTk.PhotoImage(image=img_pil)
-            
             if hasattr(self, 'video_label') and self.video_label.winfo_exists():
-                 self.video_label.imgtk = self.imgtk_display_ref
-                 self.video_label.config(image=self.imgtk_display_ref)
+                if self._is_display_visible():
+                    with profiler.stage("display_frame"):
+                        self._display_frame(frame_cv_display)
             else:
                 print("Error: video_label not available or destroyed during GUI update.")
 
-            self.bpm_label.config(text=f"BPM (rPPG): {bpm_to_display:.1f}")
-            self.rpm_label.config(text=f"RPM (Resp): {rpm_to_display:.1f}")
-            self.processing_fps_label.config(text=f"Processing FPS: {proc_fps:.2f}")
+            estimates = estimates or {}
+            self.bpm_label.config(text=f"BPM (rPPG): {bpm_to_display:.1f}{self._format_estimate_status(estimates, 'bpm')}")
+            self.rpm_label.config(text=f"RPM (Resp): {rpm_to_display:.1f}{self._format_estimate_status(estimates, 'rpm')}")
+            dropped_frames = self.video_stream.dropped_frames if self.video_stream else 0
+            if self.staged_pipeline:
+                dropped_frames += self.staged_pipeline.frame_queue.dropped
+            self.processing_fps_label.config(text=f"Processing FPS: {proc_fps:.2f} (drop: {dropped_frames})")
             if self.raw_resp_debug_label: self.raw_resp_debug_label.config(text=f"Raw Resp Motion: {raw_resp_signal_val:.4f}")
         except Exception as e:
             print(f"Error updating GUI data: {e}")
@@ -460,18 +556,44 @@ class AppGUI(tk.Tk):
             traceback.print_exc()
 
 
+    def _update_quality_label(self):
+        # Level kualitas dari pengendali beban; perubahan level juga dicatat ke konsol oleh pengendali
+        if self.load_controller is None:
+            self.quality_label.config(text="Kualitas: penuh (adaptif nonaktif)")
+            return
+        stats = self.load_controller.get_stats()
+        self.quality_label.config(text=f"Kualitas: level {stats['level']}/{stats['max_level']} ({stats['level_name']}), "
+                                       f"beban {stats['load'] * 100:.0f}% budget frame")
+
+
+    def _format_estimate_status(self, estimates, key):
+        # Keterangan umur estimasi dan penanda estimasi sementara (window belum penuh)
+        age = estimates.get(f"{key}_age")
+        if age is None:
+            return ""
+        provisional_text = ", sementara" if estimates.get(f"{key}_provisional") else ""
+        return f" ({age:.1f} dtk lalu{provisional_text})"
+
+
     def update_gui_fps_display(self):
+        # Polling mailbox di thread Tk dengan laju tetap: hanya snapshot terbaru yang ditampilkan
         if self.winfo_exists():
-            self.frame_count_fps_calc +=1
+            snapshot = self.gui_mailbox.take()
+            if snapshot is not None:
+                self._update_gui_data(*snapshot)
+                self.frame_count_fps_calc +=1
             elapsed_time = time.time() - self.start_time_fps_calc
             if elapsed_time >= 1.0:
                 current_gui_fps = self.frame_count_fps_calc / elapsed_time
-                if self.winfo_exists(): self.gui_fps_label.config(text=f"GUI FPS: {current_gui_fps:.2f}")
+                if self.winfo_exists():
+                    self.gui_fps_label.config(text=f"GUI FPS: {current_gui_fps:.2f} (tampil: {self.gui_mailbox.taken}, "
+                                                   f"dilewati: {self.gui_mailbox.dropped})")
+                    self._update_quality_label()
                 self.frame_count_fps_calc = 0
                 self.start_time_fps_calc = time.time()
             
             if self.is_processing :
-                 self.after(50, self.update_gui_fps_display)
+                 self.after(GUI_POLL_INTERVAL_MS, self.update_gui_fps_display)
 
 
     def on_closing(self):
@@ -481,15 +603,16 @@ class AppGUI(tk.Tk):
             if user_choice is True:
                 print("User chose Yes to stop and exit.")
                 self.is_processing = False
-                if self.processing_thread and self.processing_thread.is_alive():
-                    print("Waiting for processing thread to join (on_closing)...")
-                    self.processing_thread.join(timeout=1.0)
-                    print("Processing thread joined (on_closing).")
+                if self.staged_pipeline:
+                    print("Stopping processing stages (on_closing)...")
+                    self.staged_pipeline.stop(timeout=1.0)
+                    print("Processing stages stopped (on_closing).")
                 self._cleanup_resources()
                 self.destroy()
             elif user_choice is False:
                 print("User chose No (interpreted as exit now, cleanup and destroy).")
                 self.is_processing = False 
+                if self.staged_pipeline: self.staged_pipeline.stop(timeout=1.0)
                 self._cleanup_resources()
                 self.destroy()
             else: 
@@ -503,13 +626,13 @@ class AppGUI(tk.Tk):
 
     def _cleanup_resources(self):
         print("Cleaning up resources...")
-        if self.video_stream and hasattr(self.video_stream, 'cap') and self.video_stream.cap and self.video_stream.cap.isOpened():
+        self.staged_pipeline = None
+        if self.video_stream:
             print("Releasing video_stream in cleanup...")
             self.video_stream.release()
         self.video_stream = None
         
-        if self.face_detector_mp: self.face_detector_mp.close()
-        if self.pose_tracker: self.pose_tracker.close()      
+        if self.pipeline: self.pipeline.close(); self.pipeline = None
         
         if self.plot_canvas_widget:
             print("Destroying plot_canvas_widget...")
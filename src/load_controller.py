@@ -0,0 +1,164 @@
+# load_controller.py
+from ring_buffer import RingBuffer
+
+# Langkah penurunan kualitas, dari yang paling tidak terasa sampai paling agresif.
+# Langkah yang tidak lebih murah dari level sebelumnya (misal pose sudah kompleksitas 0) dilewati.
+LOAD_SHEDDING_STEPS = [
+    ("plot 5 Hz", {"plot_hz": 5.0}),
+    ("pose ringan", {"pose_complexity": 0}),
+    ("pose tiap 2 frame", {"pose_interval": 2}),
+    ("inferensi 480 px", {"inference_width": 480}),
+    ("pose tiap 3 frame", {"pose_interval": 3}),
+    ("inferensi 320 px", {"inference_width": 320}),
+    ("plot 2 Hz", {"plot_hz": 2.0}),
+]
+
+DEGRADE_LOAD_RATIO = 0.9   # Turunkan kualitas jika rata-rata waktu proses > 90% budget frame
+RESTORE_LOAD_RATIO = 0.5   # Naikkan kualitas hanya jika < 50% budget (hysteresis)
+DEGRADE_WINDOW_FRAMES = 30     # Frame yang diamati sebelum menurunkan level (~1 dtk @ 30 FPS)
+RESTORE_WINDOW_FRAMES = 150    # Frame dengan headroom sebelum menaikkan level (~5 dtk @ 30 FPS)
+MAX_RESTORE_BACKOFF = 8        # Batas pengali jeda restore setelah osilasi
+
+def _effective_width(inference_width, frame_width):
+    # Lebar frame yang benar-benar masuk ke model: frame tidak pernah diperbesar; None = tidak diketahui/tak terbatas
+    if inference_width is None:
+        return frame_width
+    if frame_width is None:
+        return inference_width
+    return min(inference_width, frame_width)
+
+def _is_cheaper(key, current, candidate, frame_width=None):
+    # pose_interval: lebih besar = lebih murah; lainnya lebih kecil = lebih murah (None = resolusi penuh)
+    if key == "pose_interval":
+        return candidate > current
+    if key == "inference_width":
+        current = _effective_width(current, frame_width)
+    return current is None or candidate < current
+
+def build_quality_levels(base_settings, steps=LOAD_SHEDDING_STEPS, frame_width=None):
+    """
+    Susun level kualitas: level 0 = pengaturan awal, setiap level berikutnya menerapkan satu
+    langkah penurunan di atas level sebelumnya.
+
+    Args:
+        base_settings (dict): {'pose_complexity', 'pose_interval', 'inference_width', 'plot_hz'}.
+        steps (list): Pasangan (nama, perubahan) berurutan.
+        frame_width (int, optional): Lebar frame sumber; langkah resolusi yang tidak memperkecil
+                                     frame inferensi (sumber sudah sekecil itu) dilewati.
+
+    Returns:
+        list: [(nama, settings), ...] dimulai dari ('penuh', base_settings).
+    """
+    frame_width = frame_width or None  # 0 = lebar sumber tidak diketahui
+    levels = [("penuh", dict(base_settings))]
+    for name, changes in steps:
+        current = levels[-1][1]
+        applicable = {key: value for key, value in changes.items()
+                      if key in current and _is_cheaper(key, current[key], value, frame_width)}
+        if applicable:
+            levels.append((name, dict(current, **applicable)))
+    return levels
+
+class LoadSheddingController:
+    def __init__(self, base_settings, fs, frame_width=None, steps=LOAD_SHEDDING_STEPS,
+                 degrade_ratio=DEGRADE_LOAD_RATIO, restore_ratio=RESTORE_LOAD_RATIO,
+                 degrade_window=DEGRADE_WINDOW_FRAMES, restore_window=RESTORE_WINDOW_FRAMES):
+        """
+        Pengendali beban adaptif: waktu proses per frame dibandingkan dengan budget frame
+        (1 / fs). Jika rata-rata mendekati budget, kualitas diturunkan satu level (plot lebih
+        jarang, model pose lebih ringan, pose tiap N frame, resolusi inferensi lebih kecil);
+        jika headroom cukup lama, kualitas dinaikkan kembali satu level.
+
+        Args:
+            base_settings (dict): Pengaturan kualitas penuh (lihat build_quality_levels).
+            fs (float): Laju frame sumber; budget per frame = 1 / fs.
+            frame_width (int, optional): Lebar frame sumber, agar level resolusi yang tidak
+                                         berpengaruh pada sumber ini tidak dimasukkan.
+            steps (list): Langkah penurunan kualitas.
+            degrade_ratio (float): Batas beban (pecahan budget) untuk menurunkan kualitas.
+            restore_ratio (float): Batas beban untuk menaikkan kualitas.
+            degrade_window (int): Jumlah frame yang dirata-rata sebelum menurunkan level.
+            restore_window (int): Jumlah frame dengan headroom sebelum menaikkan level.
+        """
+        self.levels = build_quality_levels(base_settings, steps, frame_width)
+        self.frame_budget = 1.0 / fs
+        self.degrade_ratio = degrade_ratio
+        self.restore_ratio = restore_ratio
+        self.degrade_window = degrade_window
+        self.restore_window = restore_window
+        self._durations = RingBuffer(max(degrade_window, restore_window), with_timestamps=False)
+        self.reset()
+
+    def reset(self):
+        self.level = 0
+        self.changes = 0
+        self._frames_at_level = 0
+        self._restore_backoff = 1
+        self._last_change_was_restore = False
+        self._durations.clear()
+
+    @property
+    def settings(self):
+        """Pengaturan kualitas untuk level saat ini."""
+        return self.levels[self.level][1]
+
+    @property
+    def level_name(self):
+        return self.levels[self.level][0]
+
+    def load(self, n=None):
+        """Rata-rata waktu proses `n` frame terakhir sebagai pecahan budget frame."""
+        durations = self._durations.view(n)
+        if len(durations) == 0:
+            return 0.0
+        return float(durations.mean()) / self.frame_budget
+
+    def observe(self, frame_seconds):
+        """
+        Catat waktu proses satu frame dan putuskan perubahan level.
+
+        Args:
+            frame_seconds (float): Waktu proses frame (detik).
+
+        Returns:
+            dict: Pengaturan level baru jika level berubah, selain itu None.
+        """
+        self._durations.append(frame_seconds)
+        self._frames_at_level += 1
+
+        if self._frames_at_level >= self.degrade_window and self.level < len(self.levels) - 1:
+            load = self.load(self.degrade_window)
+            if load > self.degrade_ratio:
+                if self._last_change_was_restore and self._frames_at_level < self.restore_window:
+                    # Kualitas yang baru dinaikkan langsung terlalu berat: tunggu lebih lama sebelum mencoba lagi
+                    self._restore_backoff = min(self._restore_backoff * 2, MAX_RESTORE_BACKOFF)
+                return self._change_level(self.level + 1, load)
+
+        restore_frames = self.restore_window * self._restore_backoff
+        if self._frames_at_level >= restore_frames and self.level > 0:
+            load = self.load(self.restore_window)
+            if load < self.restore_ratio:
+                return self._change_level(self.level - 1, load)
+        return None
+
+    def _change_level(self, new_level, load):
+        old_level = self.level
+        self.level = new_level
+        self.changes += 1
+        self._frames_at_level = 0
+        self._last_change_was_restore = new_level < old_level
+        self._durations.clear()  # Beban level lama tidak berlaku untuk level baru
+        direction = "turun" if new_level > old_level else "naik"
+        print(f"Load shedding: kualitas {direction}, level {old_level} -> {new_level} ({self.level_name}), "
+              f"beban {load * 100:.0f}% dari budget {self.frame_budget * 1000:.1f} ms")
+        return self.settings
+
+    def get_stats(self):
+        """Level saat ini dan ringkasan beban untuk GUI/log."""
+        return {
+            "level": self.level,
+            "level_name": self.level_name,
+            "max_level": len(self.levels) - 1,
+            "load": self.load(),
+            "changes": self.changes,
+        }
@@ -1,26 +1,184 @@
 # main.py
 
-import gui  # Mengimpor modul 'gui' yang berisi kelas AppGUI untuk membuat GUI aplikasi
+import argparse
+import json
+import os
+import time
 import signal_processing  # Mengimpor modul signal_processing yang berisi konfigurasi seperti SIGNAL_BUFFER_SIZE
 
+def run_gui():
+    """Jalankan aplikasi GUI Tkinter (perilaku default tanpa argumen)."""
+    import gui  # Diimpor di sini agar mode headless tidak butuh Tkinter/display
+
+    # Membuat objek aplikasi GUI menggunakan kelas AppGUI dari modul gui
+    app = gui.AppGUI()
+
+    # Memulai event loop utama Tkinter
+    # Ini akan menjalankan GUI dan membuat aplikasi tetap responsif sampai window ditutup
+    app.mainloop()
+
+def run_headless(args):
+    """
+    Jalankan pipeline tanpa GUI pada satu sumber dan tulis hasilnya ke disk.
+
+    Args:
+        args (argparse.Namespace): Argumen subcommand `run`.
+    """
+    from pipeline import DEFAULT_PROCESSOR_OPTIONS, PhysioPipeline, ResultWriter, run_source
+    from profiling import profiler
+    from load_controller import LoadSheddingController
+    from video_capture import open_video_source
+
+    profiler.enabled = args.profile
+    source = open_video_source(args.source, realtime=args.realtime, fps=args.fps)
+    pipeline = PhysioPipeline(processor_options=dict(DEFAULT_PROCESSOR_OPTIONS, rppg_method=args.rppg_method),
+                              pose_model_complexity=args.pose_complexity,
+                              face_detect_interval=args.face_detect_interval,
+                              inference_width=args.inference_width or None)
+    load_controller = None
+    if args.load_shedding:
+        fs = source.fps if source.fps and source.fps > 0 else 30.0
+        load_controller = LoadSheddingController(pipeline.base_quality, fs, frame_width=source.width)
+    writer = ResultWriter(args.output_dir, fmt=args.format)
+    if args.record:
+        pipeline.start_recording(args.record, metadata={"source": str(args.source)})
+    try:
+        summary = run_source(pipeline, source, writer, max_frames=args.max_frames, load_controller=load_controller)
+    finally:
+        writer.close()
+        source.release()
+        pipeline.close()
+
+    summary["source"] = str(args.source)
+    with open(os.path.join(args.output_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Selesai: {summary['frames']} frame dalam {summary['elapsed_seconds']:.1f} dtk "
+          f"({summary['frames_per_second']:.1f} FPS), BPM {summary['bpm']:.1f}, RPM {summary['rpm']:.1f}")
+    if "face_tracking" in summary:
+        stats = summary["face_tracking"]
+        print(f"Tracking wajah: {stats['detections']} deteksi, {stats['track_hits']} hit, "
+              f"{stats['track_misses']} miss, {stats['detector_misses']} deteksi tanpa wajah")
+    if "load_shedding" in summary:
+        stats = summary["load_shedding"]
+        print(f"Load shedding: level akhir {stats['level']}/{stats['max_level']} ({stats['level_name']}), "
+              f"{stats['changes']} perubahan level")
+    print(f"Hasil ditulis ke: {writer.frames_path}, {writer.estimates_path}")
+    if args.profile:
+        profile_path = os.path.join(args.output_dir, "profile.json")
+        profiler.dump(profile_path)
+        print(profiler.format_summary())
+        print(f"Profil latensi ditulis ke: {profile_path}")
+
+def run_batch_command(args):
+    """Jalankan analisis banyak rekaman secara paralel (subcommand `batch`)."""
+    from batch_runner import run_batch
+    from pipeline import DEFAULT_PROCESSOR_OPTIONS
+
+    run_batch(args.inputs, args.output_dir, workers=args.workers, fmt=args.format, fps=args.fps,
+              pipeline_options={"processor_options": dict(DEFAULT_PROCESSOR_OPTIONS, rppg_method=args.rppg_method),
+                                "pose_model_complexity": args.pose_complexity,
+                                "face_detect_interval": args.face_detect_interval,
+                                "inference_width": args.inference_width or None})
+
+def run_replay_command(args):
+    """Putar ulang rekaman sesi biner ke SignalProcessor tanpa kamera/MediaPipe (subcommand `replay`)."""
+    from pipeline import DEFAULT_PROCESSOR_OPTIONS
+    from session_recording import SessionReader
+
+    reader = SessionReader(args.session)
+    print(f"Sesi dibuka: {args.session} ({len(reader)} frame, {reader.duration():.1f} dtk @ {reader.fs} Hz)")
+    processor = signal_processing.SignalProcessor(
+        fs=reader.fs, **dict(DEFAULT_PROCESSOR_OPTIONS, mode=args.mode, rppg_method=args.rppg_method))
+    start = time.perf_counter()
+    summary = reader.replay(processor, speed=args.speed, roi=args.roi)
+    elapsed = time.perf_counter() - start
+    print(f"Selesai: {summary['frames']} frame dalam {elapsed:.2f} dtk, BPM {summary['bpm']:.1f}, "
+          f"RPM {summary['rpm']:.1f}, {len(summary['estimates'])} estimasi")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Estimasi ditulis ke: {args.output}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Pengukuran fisiologis rPPG & pernapasan.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser("gui", help="Jalankan aplikasi GUI (default).")
+
+    run_parser = subparsers.add_parser("run", help="Jalankan pipeline tanpa GUI dan tulis hasil ke disk.")
+    run_parser.add_argument("source", help="ID kamera, file video, folder gambar, atau tumpukan frame .npy.")
+    run_parser.add_argument("--output-dir", default="results", help="Folder output (default: results).")
+    run_parser.add_argument("--format", choices=["csv", "jsonl"], default="csv", help="Format file hasil.")
+    run_parser.add_argument("--realtime", action="store_true",
+                            help="Putar rekaman sesuai timestamp asli (default: secepat mungkin).")
+    run_parser.add_argument("--fps", type=float, default=30.0, help="FPS untuk folder gambar / .npy tanpa timestamp.")
+    run_parser.add_argument("--max-frames", type=int, default=None, help="Batas jumlah frame yang diproses.")
+    run_parser.add_argument("--pose-complexity", type=int, choices=[0, 1, 2], default=1,
+                            help="Kompleksitas model MediaPipe Pose.")
+    run_parser.add_argument("--face-detect-interval", type=int, default=10,
+                            help="Deteksi wajah penuh setiap N frame, tracking di antaranya (1 = setiap frame).")
+    run_parser.add_argument("--rppg-method", choices=["green", "pos", "chrom"], default="green",
+                            help="Ekstraksi pulsa rPPG: kanal hijau, POS, atau CHROM.")
+    run_parser.add_argument("--inference-width", type=int, default=640,
+                            help="Lebar frame untuk model wajah/pose (0 = resolusi asli).")
+    run_parser.add_argument("--profile", action="store_true",
+                            help="Ukur latensi per tahap (p50/p95/p99) dan tulis ke profile.json.")
+    run_parser.add_argument("--record", default=None,
+                            help="Rekam sinyal mentah per frame ke file sesi biner (untuk `replay`).")
+    run_parser.add_argument("--load-shedding", action="store_true",
+                            help="Turunkan kualitas (pose, resolusi inferensi) otomatis jika waktu proses "
+                                 "per frame melebihi budget 1/fps, dan pulihkan saat ada headroom.")
+
+    batch_parser = subparsers.add_parser("batch", help="Analisis banyak rekaman secara paralel (satu proses per core).")
+    batch_parser.add_argument("inputs", nargs="+", help="File rekaman dan/atau folder berisi rekaman.")
+    batch_parser.add_argument("--output-dir", default="batch_results", help="Folder output (default: batch_results).")
+    batch_parser.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: jumlah core).")
+    batch_parser.add_argument("--format", choices=["csv", "jsonl"], default="csv", help="Format file hasil per rekaman.")
+    batch_parser.add_argument("--fps", type=float, default=30.0, help="FPS untuk tumpukan .npy tanpa timestamp.")
+    batch_parser.add_argument("--pose-complexity", type=int, choices=[0, 1, 2], default=1,
+                              help="Kompleksitas model MediaPipe Pose.")
+    batch_parser.add_argument("--face-detect-interval", type=int, default=10,
+                              help="Deteksi wajah penuh setiap N frame, tracking di antaranya (1 = setiap frame).")
+    batch_parser.add_argument("--rppg-method", choices=["green", "pos", "chrom"], default="green",
+                              help="Ekstraksi pulsa rPPG: kanal hijau, POS, atau CHROM.")
+    batch_parser.add_argument("--inference-width", type=int, default=640,
+                              help="Lebar frame untuk model wajah/pose (0 = resolusi asli).")
+
+    replay_parser = subparsers.add_parser("replay", help="Putar ulang rekaman sesi biner ke SignalProcessor.")
+    replay_parser.add_argument("session", help="File sesi hasil `run --record` atau tombol rekam di GUI.")
+    replay_parser.add_argument("--speed", type=float, default=0.0,
+                               help="Kecepatan putar (1.0 = waktu asli, 0 = secepat mungkin).")
+    replay_parser.add_argument("--mode", choices=[signal_processing.PROCESSING_MODE_BLOCK,
+                                                  signal_processing.PROCESSING_MODE_STREAMING],
+                               default=signal_processing.PROCESSING_MODE_BLOCK, help="Mode pemrosesan SignalProcessor.")
+    replay_parser.add_argument("--rppg-method", choices=["green", "pos", "chrom"], default="green",
+                               help="Ekstraksi pulsa rPPG: kanal hijau, POS, atau CHROM.")
+    replay_parser.add_argument("--roi", default="face", help="Sub-ROI wajah untuk rPPG (face, forehead, left_cheek, right_cheek).")
+    replay_parser.add_argument("--output", default=None, help="Simpan estimasi hasil replay ke file JSON.")
+    return parser
+
 if __name__ == "__main__":
     """
     Titik masuk utama aplikasi Pengukuran Fisiologis.
-    Script ini bertugas menginisialisasi dan menjalankan GUI aplikasi.
+    Tanpa argumen, script ini menjalankan GUI; subcommand `run` menjalankan pipeline headless
+    `batch` memproses banyak rekaman secara paralel, dan `replay` memutar ulang rekaman sesi.
     """
-    
+    args = build_parser().parse_args()
+
     print(f"Memulai aplikasi dari main.py...")  # Menandai awal eksekusi aplikasi di console
-    
+
     # Menampilkan nilai konstanta SIGNAL_BUFFER_SIZE dari modul signal_processing
     # Ini sebagai contoh akses ke konfigurasi global dari modul lain
     print(f"Menggunakan SIGNAL_BUFFER_SIZE: {signal_processing.SIGNAL_BUFFER_SIZE}")
-    
-    # Membuat objek aplikasi GUI menggunakan kelas AppGUI dari modul gui
-    app = gui.AppGUI()
-    
-    # Memulai event loop utama Tkinter
-    # Ini akan menjalankan GUI dan membuat aplikasi tetap responsif sampai window ditutup
-    app.mainloop()
-    
+
+    if args.command == "run":
+        run_headless(args)
+    elif args.command == "batch":
+        run_batch_command(args)
+    elif args.command == "replay":
+        run_replay_command(args)
+    else:
+        run_gui()
+
     # Ketika GUI ditutup dan loop berhenti, cetak pesan penutupan aplikasi
-    print("Aplikasi ditutup.")
\ No newline at end of file
+    print("Aplikasi ditutup.")
@@ -0,0 +1,403 @@
+# pipeline.py
+import csv
+import json
+import os
+import time
+import cv2
+import numpy as np
+from signal_processing import SignalProcessor, SIGNAL_BUFFER_SIZE
+from utils import FaceDetectorMP, TrackedFaceDetector, RoiColorStats, downscale_for_inference, scale_bounding_box
+from pose_respiration_tracker import PoseRespirationTracker
+from ring_buffer import RingBuffer
+from profiling import profiler
+from session_recording import SessionRecorder
+
+# Pengaturan SignalProcessor default untuk pemakaian live (GUI maupun headless)
+DEFAULT_PROCESSOR_OPTIONS = {
+    "rppg_hop_seconds": 0.5,   # Estimasi BPM setiap 0.5 detik
+    "resp_hop_seconds": 2.0,   # Estimasi RPM setiap 2 detik
+    "progressive": True,
+    "zero_pad_factor": 4,
+    "peak_interpolation": True,
+    "resample": True,          # Sampel diinterpolasi ke grid seragam berdasarkan timestamp frame
+}
+
+# Lebar frame untuk inferensi model; kamera 1080p diperkecil, kamera 640x480 tidak berubah
+DEFAULT_INFERENCE_WIDTH = 640
+
+FRAME_FIELDS = ["frame_index", "timestamp", "face_x", "face_y", "face_w", "face_h",
+                "r", "g", "b", "resp_raw", "pose_detected", "bpm", "rpm"]
+ESTIMATE_FIELDS = ["frame_index", "timestamp", "kind", "value", "provisional"]
+
+class PhysioPipeline:
+    def __init__(self, fs=30.0, buffer_size=SIGNAL_BUFFER_SIZE, processor_options=None,
+                 face_model_selection=0, pose_model_complexity=1, rate_history_size=5,
+                 face_detect_interval=10, inference_width=DEFAULT_INFERENCE_WIDTH, pose_interval=1):
+        """
+        Rantai pemrosesan tanpa GUI: ROI wajah -> rata-rata RGB, pose -> sinyal
+        pernapasan, lalu SignalProcessor untuk BPM/RPM. Dipakai oleh GUI maupun
+        entry point command-line.
+
+        Args:
+            fs (float): Frekuensi sampling untuk SignalProcessor.
+            buffer_size (int): Ukuran buffer sinyal.
+            processor_options (dict, optional): Argumen tambahan SignalProcessor,
+                                                default DEFAULT_PROCESSOR_OPTIONS.
+            face_model_selection (int): Model MediaPipe Face Detection (0/1).
+            pose_model_complexity (int): Kompleksitas model MediaPipe Pose (0/1/2).
+            rate_history_size (int): Jumlah estimasi terakhir yang dirata-rata untuk tampilan.
+            face_detect_interval (int): Deteksi wajah penuh setiap N frame dengan tracking di
+                                        antaranya (TrackedFaceDetector); 1 = deteksi setiap frame.
+            inference_width (int, optional): Lebar frame untuk model wajah dan pose; frame yang
+                                             lebih lebar diperkecil sekali per frame. None = resolusi asli.
+            pose_interval (int): Jalankan model pose setiap N frame (1 = setiap frame); frame di
+                                 antaranya tidak menambah sampel respirasi (lihat update_estimates).
+        """
+        self.buffer_size = buffer_size
+        self.inference_width = inference_width
+        self.pose_interval = max(1, int(pose_interval))
+        self.processor_options = dict(DEFAULT_PROCESSOR_OPTIONS if processor_options is None else processor_options)
+        if face_detect_interval > 1:
+            self.face_detector = TrackedFaceDetector(detect_interval=face_detect_interval,
+                                                     model_selection=face_model_selection)
+        else:
+            self.face_detector = FaceDetectorMP(model_selection=face_model_selection)
+        self.pose_tracker = PoseRespirationTracker(model_complexity=pose_model_complexity)
+        self.roi_stats = RoiColorStats()
+        self._face_row = self.roi_stats.index("face")
+        self.bpm_history = RingBuffer(rate_history_size, with_timestamps=False)
+        self.rpm_history = RingBuffer(rate_history_size, with_timestamps=False)
+        self.processor = None
+        self.recorder = None  # SessionRecorder aktif (lihat start_recording)
+        # Pengaturan kualitas awal; pengendali beban (load_controller.py) kembali ke sini saat headroom cukup
+        self.base_quality = self.quality_settings()
+        self.reset(fs)
+
+    def reset(self, fs=None):
+        """
+        Mulai sesi baru: buffer sinyal dan riwayat laju dikosongkan.
+
+        Args:
+            fs (float, optional): Frekuensi sampling baru, default tetap.
+        """
+        if fs is not None:
+            self.fs = fs
+        self.processor = SignalProcessor(fs=self.fs, buffer_size=self.buffer_size, **self.processor_options)
+        self.bpm_history.clear()
+        self.rpm_history.clear()
+        self.averaged_bpm = 0.0
+        self.averaged_rpm = 0.0
+        self.pose_tracker.reset()
+        if isinstance(self.face_detector, TrackedFaceDetector):
+            self.face_detector.reset()
+        self.frame_index = 0
+        self._frames_since_pose = 0
+        self._last_pose = (0.0, False)
+
+    def analyze_frame(self, frame_bgr, timestamp, frame_to_draw_on=None):
+        """
+        Tahap inferensi: deteksi wajah, rata-rata RGB ROI wajah, dan sinyal pernapasan dari pose.
+
+        Args:
+            frame_bgr (np.array): Frame kamera BGR.
+            timestamp (float): Waktu pengambilan frame.
+            frame_to_draw_on (np.array, optional): Frame BGR untuk menggambar ROI dan landmark.
+
+        Returns:
+            dict: Observasi frame ('timestamp', 'face_bbox', 'rgb' (R, G, B seluruh wajah),
+                  'roi_rgb' (array (n_roi, 3), baris sesuai `roi_stats.names`), 'resp_raw', 'pose_detected',
+                  'shoulders' (posisi bahu kiri/kanan terakhir atau None), 'pose_skipped' (True jika
+                  model pose dilewati pada frame ini karena `pose_interval`; 'resp_raw' dan
+                  'pose_detected' berisi nilai frame pose terakhir)).
+        """
+        # Satu frame RGB kecil dipakai bersama oleh detektor wajah dan pose; bbox dipetakan
+        # kembali ke resolusi penuh sehingga rata-rata ROI tetap memakai piksel asli.
+        # Landmark pose ternormalisasi (0..1) sehingga tidak perlu dipetakan.
+        with profiler.stage("color_conversion"):
+            frame_rgb, scale = downscale_for_inference(frame_bgr, self.inference_width)
+        with profiler.stage("face_detection"):
+            face_bbox = scale_bounding_box(self.face_detector.detect_face_bounding_box(frame_rgb),
+                                           scale, frame_bgr.shape)
+
+        if face_bbox is not None and frame_to_draw_on is not None:
+            cv2.rectangle(frame_to_draw_on,
+                          (face_bbox[0], face_bbox[1]),
+                          (face_bbox[0] + face_bbox[2], face_bbox[1] + face_bbox[3]),
+                          (0, 255, 0), 2)
+        # Rata-rata RGB semua sub-ROI wajah dalam satu lintasan; fallback seluruh frame jika tanpa wajah
+        with profiler.stage("roi_color_means"):
+            roi_rgb, _ = self.roi_stats.compute(frame_bgr, face_bbox)
+        rgb = tuple(roi_rgb[self._face_row])
+
+        pose_skipped = self._frames_since_pose + 1 < self.pose_interval
+        if pose_skipped:
+            self._frames_since_pose += 1
+            resp_raw, pose_detected = self._last_pose
+        else:
+            with profiler.stage("pose_inference"):
+                resp_raw, pose_detected = self.pose_tracker.get_respiration_signal_and_draw_landmarks(
+                    frame_rgb, frame_to_draw_on
+                )
+            # dy bahu mencakup semua frame sejak pose terakhir; dibagi agar skalanya tetap per frame
+            resp_raw /= self._frames_since_pose + 1
+            self._frames_since_pose = 0
+            self._last_pose = (resp_raw, pose_detected)
+        return {
+            "timestamp": timestamp,
+            "face_bbox": face_bbox,
+            "rgb": rgb,
+            "roi_rgb": roi_rgb,
+            "resp_raw": resp_raw,
+            "pose_detected": pose_detected,
+            "shoulders": self.pose_tracker.last_shoulders,
+            "pose_skipped": pose_skipped,
+        }
+
+    def update_estimates(self, observation):
+        """
+        Tahap DSP: masukkan observasi ke SignalProcessor dan perbarui rata-rata BPM/RPM.
+
+        Args:
+            observation (dict): Hasil `analyze_frame`.
+
+        Returns:
+            dict: Observasi ditambah 'frame_index', 'filtered_rppg', 'filtered_resp', 'bpm', 'rpm'
+                  (rata-rata tampilan), 'estimates' (get_last_estimates), flag 'new_bpm'/'new_rpm'
+                  jika estimasi baru dihasilkan pada frame ini, 'resp_sample' (nilai respirasi yang
+                  benar-benar masuk ke DSP, None jika frame ini tanpa sampel), serta 'rppg_plot'/'resp_plot'
+                  (trace terfilter, atau sinyal mentah jika belum ada). Semua array adalah salinan
+                  sehingga aman dibaca thread lain sementara buffer sinyal terus ditulis.
+        """
+        timestamp = observation["timestamp"]
+        result = dict(observation)
+        # Frame tanpa pose: dengan resampler tidak ada sampel baru (diinterpolasi di antara frame pose),
+        # tanpa resampler nilai terakhir ditahan agar jarak sampel tetap 1 / fs
+        resp_sample = observation["resp_raw"]
+        if observation.get("pose_skipped") and self.processor.resp_resampler is not None:
+            resp_sample = None
+        result["resp_sample"] = resp_sample
+        if self.recorder is not None:
+            self.recorder.record(result)  # Merekam nilai yang dipakai DSP, sehingga replay identik
+        # Kanal hijau atau proyeksi POS/CHROM sesuai opsi 'rppg_method' SignalProcessor
+        with profiler.stage("dsp_rppg"):
+            filtered_rppg, bpm_current = self.processor.process_rppg_rgb(observation["rgb"], timestamp)
+        with profiler.stage("dsp_respiration"):
+            filtered_resp, rpm_current = self.processor.process_respiration(resp_sample, timestamp)
+
+        # Riwayat hanya diisi saat penjadwal menghasilkan estimasi baru (bukan nilai cache)
+        new_bpm = bpm_current > 0 and self.processor.rppg_estimate.fresh
+        if new_bpm:
+            self.bpm_history.append(bpm_current)
+            self.averaged_bpm = self.bpm_history.mean()
+        elif not self.bpm_history:
+            self.averaged_bpm = 0.0
+
+        new_rpm = rpm_current > 0 and self.processor.resp_estimate.fresh
+        if new_rpm:
+            self.rpm_history.append(rpm_current)
+            self.averaged_rpm = self.rpm_history.mean()
+        elif not self.rpm_history:
+            self.averaged_rpm = 0.0
+
+        # Mode streaming mengembalikan view RingBuffer tanpa copy yang terus ditulis tahap ini;
+        # salin sebelum hasil dikirim ke thread render agar plot tidak membaca data setengah tertulis
+        filtered_rppg = np.array(filtered_rppg)
+        filtered_resp = np.array(filtered_resp)
+        rppg_plot = filtered_rppg if len(filtered_rppg) > 0 else np.array(self.processor.get_raw_rppg_signal_for_plot())
+        resp_plot = filtered_resp if len(filtered_resp) > 0 else np.array(self.processor.get_raw_resp_signal_for_plot())
+
+        result.update({
+            "frame_index": self.frame_index,
+            "filtered_rppg": filtered_rppg,
+            "filtered_resp": filtered_resp,
+            "rppg_plot": rppg_plot,
+            "resp_plot": resp_plot,
+            "bpm": self.averaged_bpm,
+            "rpm": self.averaged_rpm,
+            "estimates": self.processor.get_last_estimates(),
+            "new_bpm": new_bpm,
+            "new_rpm": new_rpm,
+        })
+        self.frame_index += 1
+        return result
+
+    def quality_settings(self):
+        """
+        Pengaturan kualitas yang sedang dipakai.
+
+        Returns:
+            dict: {'pose_complexity', 'pose_interval', 'inference_width'}.
+        """
+        return {
+            "pose_complexity": self.pose_tracker.model_complexity,
+            "pose_interval": self.pose_interval,
+            "inference_width": self.inference_width,
+        }
+
+    def apply_quality_settings(self, settings):
+        """
+        Terapkan level kualitas dari LoadSheddingController. Dipanggil dari thread inferensi
+        (atau di antara sesi) karena model pose bisa diganti; kunci lain (misal 'plot_hz') diabaikan.
+
+        Args:
+            settings (dict): Berisi 'pose_complexity', 'pose_interval' dan 'inference_width'.
+        """
+        if settings["inference_width"] != self.inference_width:
+            self.inference_width = settings["inference_width"]
+            if isinstance(self.face_detector, TrackedFaceDetector):
+                self.face_detector.reset()  # Template tracking berada di koordinat frame inferensi lama
+        self.pose_interval = max(1, int(settings["pose_interval"]))
+        self.pose_tracker.set_model_complexity(settings["pose_complexity"])
+
+    def start_recording(self, path, metadata=None):
+        """
+        Mulai merekam observasi mentah setiap frame (timestamp, RGB sub-ROI, bbox wajah, bahu,
+        sinyal pernapasan) ke file sesi biner, agar DSP bisa diulang tanpa kamera/MediaPipe.
+
+        Args:
+            path (str): Path file sesi baru.
+            metadata (dict, optional): Info tambahan untuk header file.
+
+        Returns:
+            SessionRecorder: Perekam yang aktif.
+        """
+        self.stop_recording()
+        self.recorder = SessionRecorder(path, self.roi_stats.names, self.fs, metadata=metadata)
+        return self.recorder
+
+    def stop_recording(self):
+        """Tutup perekam sesi (jika ada) setelah semua record tertulis."""
+        if self.recorder is not None:
+            self.recorder.close()
+            print(f"Rekaman sesi disimpan: {self.recorder.path} ({self.recorder.records_written} frame)")
+            self.recorder = None
+
+    def process_frame(self, frame_bgr, timestamp, frame_to_draw_on=None):
+        """Jalankan inferensi dan DSP untuk satu frame (lihat `update_estimates`)."""
+        return self.update_estimates(self.analyze_frame(frame_bgr, timestamp, frame_to_draw_on))
+
+    def close(self):
+        """Menutup perekam sesi dan melepaskan resource model MediaPipe."""
+        self.stop_recording()
+        self.face_detector.close()
+        self.pose_tracker.close()
+
+class ResultWriter:
+    def __init__(self, output_dir, fmt="csv", prefix=""):
+        """
+        Tulis hasil per frame dan per estimasi ke disk dalam format CSV atau JSONL.
+
+        Args:
+            output_dir (str): Folder tujuan (dibuat jika belum ada).
+            fmt (str): 'csv' atau 'jsonl'.
+            prefix (str): Awalan nama file, misal nama rekaman.
+        """
+        if fmt not in ("csv", "jsonl"):
+            raise ValueError(f"Format output tidak dikenal: {fmt}")
+        os.makedirs(output_dir, exist_ok=True)
+        self.fmt = fmt
+        self.frames_path = os.path.join(output_dir, f"{prefix}frames.{fmt}")
+        self.estimates_path = os.path.join(output_dir, f"{prefix}estimates.{fmt}")
+        self._frames_file = open(self.frames_path, "w", newline="")
+        self._estimates_file = open(self.estimates_path, "w", newline="")
+        self._frames_csv = None
+        self._estimates_csv = None
+        if fmt == "csv":
+            self._frames_csv = csv.DictWriter(self._frames_file, fieldnames=FRAME_FIELDS)
+            self._estimates_csv = csv.DictWriter(self._estimates_file, fieldnames=ESTIMATE_FIELDS)
+            self._frames_csv.writeheader()
+            self._estimates_csv.writeheader()
+
+    def _write(self, file, csv_writer, record):
+        if self.fmt == "csv":
+            csv_writer.writerow(record)
+        else:
+            file.write(json.dumps(record) + "\n")
+
+    def write_result(self, result):
+        """Tulis satu baris per frame dan satu baris per estimasi baru (jika ada)."""
+        bbox = result["face_bbox"] or (None, None, None, None)
+        r, g, b = result["rgb"]
+        self._write(self._frames_file, self._frames_csv, {
+            "frame_index": result["frame_index"],
+            "timestamp": float(result["timestamp"]),
+            "face_x": bbox[0], "face_y": bbox[1], "face_w": bbox[2], "face_h": bbox[3],
+            "r": float(r), "g": float(g), "b": float(b),
+            "resp_raw": float(result["resp_raw"]),
+            "pose_detected": bool(result["pose_detected"]),
+            "bpm": round(float(result["bpm"]), 2),
+            "rpm": round(float(result["rpm"]), 2),
+        })
+        estimates = result["estimates"]
+        for kind, is_new in (("bpm", result["new_bpm"]), ("rpm", result["new_rpm"])):
+            if is_new:
+                self._write(self._estimates_file, self._estimates_csv, {
+                    "frame_index": result["frame_index"],
+                    "timestamp": float(result["timestamp"]),
+                    "kind": kind,
+                    "value": float(estimates[kind]),
+                    "provisional": bool(estimates[f"{kind}_provisional"]),
+                })
+
+    def close(self):
+        self._frames_file.close()
+        self._estimates_file.close()
+
+def run_source(pipeline, source, writer=None, max_frames=None, load_controller=None):
+    """
+    Proses seluruh frame dari sebuah sumber (kamera atau rekaman) tanpa GUI.
+
+    Args:
+        pipeline (PhysioPipeline): Pipeline yang sudah diinisialisasi (di-reset di sini).
+        source: Sumber frame dengan antarmuka `get_timed_frame()` (lihat video_capture).
+        writer (ResultWriter, optional): Tujuan penulisan hasil.
+        max_frames (int, optional): Batas jumlah frame yang diproses.
+        load_controller (LoadSheddingController, optional): Menurunkan/menaikkan kualitas
+                                                            berdasarkan waktu proses per frame.
+
+    Returns:
+        dict: Ringkasan ('frames', 'elapsed_seconds', 'frames_per_second', 'bpm', 'rpm',
+              'face_detection_rate', 'pose_detection_rate', 'face_tracking' berisi
+              statistik TrackedFaceDetector jika dipakai, 'load_shedding' berisi level
+              kualitas akhir jika `load_controller` dipakai, dan 'profile' berisi latensi
+              per tahap jika `profiling.profiler` aktif).
+    """
+    fs = source.fps if source.fps and source.fps > 0 else 30.0
+    pipeline.reset(fs)
+    frames = faces = poses = 0
+    result = None
+    start = time.perf_counter()
+    while max_frames is None or frames < max_frames:
+        with profiler.stage("capture"):
+            ret, frame_bgr, timestamp, _ = source.get_timed_frame()
+        if not ret or frame_bgr is None:
+            break
+        frame_start = time.perf_counter()
+        result = pipeline.process_frame(frame_bgr, timestamp)
+        if load_controller is not None:
+            settings = load_controller.observe(time.perf_counter() - frame_start)
+            if settings is not None:
+                pipeline.apply_quality_settings(settings)
+        frames += 1
+        faces += result["face_bbox"] is not None
+        poses += bool(result["pose_detected"])
+        if writer is not None:
+            writer.write_result(result)
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "frames": frames,
+        "elapsed_seconds": elapsed,
+        "frames_per_second": frames / elapsed if elapsed > 0 else 0.0,
+        "bpm": float(result["bpm"]) if result else 0.0,
+        "rpm": float(result["rpm"]) if result else 0.0,
+        "face_detection_rate": faces / frames if frames else 0.0,
+        "pose_detection_rate": poses / frames if frames else 0.0,
+    }
+    if isinstance(pipeline.face_detector, TrackedFaceDetector):
+        summary["face_tracking"] = pipeline.face_detector.get_stats()
+    if load_controller is not None:
+        summary["load_shedding"] = load_controller.get_stats()
+    if profiler.enabled:
+        summary["profile"] = profiler.summary()
+    return summary
@@ -0,0 +1,315 @@
+# pipeline_stages.py
+import collections
+import threading
+import time
+import traceback
+from profiling import profiler
+
+QUEUE_POLICY_DROP_OLDEST = 'drop_oldest'  # Produsen tidak pernah menunggu, item tertua dibuang
+QUEUE_POLICY_BLOCK = 'block'              # Produsen menunggu sampai ada slot (backpressure)
+
+class BoundedQueue:
+    def __init__(self, maxsize, policy=QUEUE_POLICY_BLOCK):
+        """
+        Antrean berkapasitas tetap antar tahap pipeline dengan kebijakan penuh yang eksplisit.
+
+        Args:
+            maxsize (int): Jumlah item maksimum dalam antrean.
+            policy (str): 'drop_oldest' (untuk data yang boleh dilewati, misal frame kamera
+                          live atau tampilan) atau 'block' (setiap item wajib diproses,
+                          misal sampel sinyal untuk DSP).
+        """
+        if maxsize <= 0:
+            raise ValueError(f"Ukuran antrean harus > 0, didapat {maxsize}.")
+        if policy not in (QUEUE_POLICY_DROP_OLDEST, QUEUE_POLICY_BLOCK):
+            raise ValueError(f"Kebijakan antrean tidak dikenal: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items = collections.deque()
+        self._condition = threading.Condition()
+        self.closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item, timeout=None):
+        """
+        Masukkan item sesuai kebijakan antrean.
+
+        Returns:
+            bool: False jika antrean sudah ditutup atau timeout saat menunggu slot.
+        """
+        with self._condition:
+            if self.closed:
+                return False
+            if self.policy == QUEUE_POLICY_BLOCK:
+                has_room = self._condition.wait_for(
+                    lambda: self.closed or len(self._items) < self.maxsize, timeout=timeout)
+                if not has_room or self.closed:
+                    return False
+            elif len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._condition.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """
+        Ambil item tertua.
+
+        Returns:
+            object: Item, atau None jika timeout atau antrean ditutup dan sudah kosong.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._items or self.closed, timeout=timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._condition.notify_all()
+            return item
+
+    def close(self):
+        """Tutup antrean: item yang tersisa masih bisa diambil, put berikutnya ditolak."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+class PipelineStage:
+    def __init__(self, name, func, input_queue=None, output_queue=None):
+        """
+        Satu tahap pipeline yang berjalan di thread sendiri.
+
+        Args:
+            name (str): Nama tahap (untuk log dan statistik).
+            func (callable): Tanpa `input_queue`: func() menghasilkan item baru atau None
+                             jika sumber habis. Dengan `input_queue`: func(item) mengembalikan
+                             item untuk tahap berikutnya (None = tidak diteruskan).
+            input_queue (BoundedQueue, optional): Antrean masukan.
+            output_queue (BoundedQueue, optional): Antrean keluaran.
+        """
+        self.name = name
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.error = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            while not self._stop_event.is_set():
+                if self.input_queue is None:
+                    item = None
+                else:
+                    item = self.input_queue.get(timeout=0.1)
+                    if item is None:
+                        if self.input_queue.closed:
+                            break  # Tahap sebelumnya selesai dan antrean sudah kosong
+                        continue
+                start = time.perf_counter()
+                output = self.func() if self.input_queue is None else self.func(item)
+                self.busy_seconds += time.perf_counter() - start
+                if self.input_queue is None and output is None:
+                    break  # Sumber habis
+                self.processed += 1
+                if output is not None and self.output_queue is not None:
+                    # Backpressure tetap bisa dihentikan lewat stop()
+                    while not self.output_queue.put(output, timeout=0.1):
+                        if self.output_queue.closed or self._stop_event.is_set():
+                            break
+        except Exception as e:
+            self.error = e
+            print(f"Error pada tahap pipeline '{self.name}': {e}")
+            traceback.print_exc()
+        finally:
+            if self.output_queue is not None:
+                self.output_queue.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+class StagedPipeline:
+    def __init__(self, source, pipeline, render_func=None, on_finished=None,
+                 frame_queue_size=2, observation_queue_size=8, render_queue_size=2, load_controller=None):
+        """
+        Jalankan PhysioPipeline sebagai tahap-tahap paralel yang dihubungkan antrean terbatas:
+        capture -> inferensi (wajah + pose) -> DSP -> render.
+
+        Tahap OpenCV/MediaPipe melepas GIL sehingga bisa tumpang tindih dengan DSP dan
+        render; laju pemrosesan ditentukan oleh tahap paling lambat, bukan jumlah semuanya.
+        Timestamp asli setiap frame ikut dibawa di sepanjang pipeline.
+
+        Kebijakan antrean:
+            - capture -> inferensi: 'drop_oldest' untuk kamera live (selalu frame terbaru),
+              'block' untuk rekaman (tidak ada frame yang hilang).
+            - inferensi -> DSP: selalu 'block', setiap sampel wajib masuk ke sinyal.
+            - DSP -> render: 'drop_oldest', tampilan boleh melewati frame.
+
+        Args:
+            source: Sumber frame dengan `get_timed_frame()` dan atribut `is_live`.
+            pipeline (PhysioPipeline): Pipeline yang sudah di-reset untuk sesi ini.
+            render_func (callable, optional): Dipanggil di thread render dengan hasil
+                                              `update_estimates` (berisi 'frame_display').
+            on_finished (callable, optional): Dipanggil (dari thread pengawas) saat pipeline berhenti
+                                              sendiri karena sumber habis atau error.
+            frame_queue_size (int): Kapasitas antrean frame mentah.
+            observation_queue_size (int): Kapasitas antrean observasi menuju DSP.
+            render_queue_size (int): Kapasitas antrean menuju render.
+            load_controller (LoadSheddingController, optional): Mengamati waktu tahap inferensi
+                                                                (tahap terberat) per frame dan
+                                                                menurunkan/menaikkan kualitas pipeline.
+        """
+        self.source = source
+        self.pipeline = pipeline
+        self.render_func = render_func
+        self.on_finished = on_finished
+        self.load_controller = load_controller
+        self._stopping = False
+
+        frame_policy = QUEUE_POLICY_DROP_OLDEST if getattr(source, "is_live", False) else QUEUE_POLICY_BLOCK
+        self.frame_queue = BoundedQueue(frame_queue_size, frame_policy)
+        self.observation_queue = BoundedQueue(observation_queue_size, QUEUE_POLICY_BLOCK)
+        self.render_queue = BoundedQueue(render_queue_size, QUEUE_POLICY_DROP_OLDEST)
+
+        self.stages = [
+            PipelineStage("capture", self._capture, output_queue=self.frame_queue),
+            PipelineStage("inference", self._analyze, self.frame_queue, self.observation_queue),
+            PipelineStage("dsp", self.pipeline.update_estimates, self.observation_queue, self.render_queue),
+            PipelineStage("render", self._render, self.render_queue),
+        ]
+        self._watcher = None
+
+    def _capture(self):
+        with profiler.stage("capture"):
+            ret, frame_bgr, timestamp, sequence = self.source.get_timed_frame()
+        if not ret or frame_bgr is None:
+            return None
+        return {"frame": frame_bgr, "timestamp": timestamp, "sequence": sequence}
+
+    def _analyze(self, packet):
+        start = time.perf_counter()
+        frame_display = packet["frame"].copy()
+        observation = self.pipeline.analyze_frame(packet["frame"], packet["timestamp"], frame_display)
+        if self.load_controller is not None:
+            # Level baru diterapkan di thread inferensi, satu-satunya pemakai model pose
+            settings = self.load_controller.observe(time.perf_counter() - start)
+            if settings is not None:
+                self.pipeline.apply_quality_settings(settings)
+        observation["sequence"] = packet["sequence"]
+        observation["frame_display"] = frame_display
+        return observation
+
+    def _render(self, result):
+        if self.render_func is not None:
+            self.render_func(result)
+        return None
+
+    def _watch(self):
+        # Tahap render selesai terakhir: saat itu seluruh pipeline sudah berhenti
+        render_stage = self.stages[-1]
+        render_stage.join()
+        for stage in self.stages:
+            stage.stop()
+        if not self._stopping and self.on_finished is not None:
+            self.on_finished()
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        self._watcher = threading.Thread(target=self._watch, name="stage-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self, timeout=1.5):
+        """Hentikan semua tahap dan tunggu thread-nya (tanpa memanggil on_finished)."""
+        self._stopping = True
+        for stage in self.stages:
+            stage.stop()
+        for q in (self.frame_queue, self.observation_queue, self.render_queue):
+            q.close()
+        deadline = time.monotonic() + timeout
+        for stage in self.stages:
+            stage.join(timeout=max(0.0, deadline - time.monotonic()))
+
+    def is_running(self):
+        return any(stage.is_alive() for stage in self.stages)
+
+    def get_stats(self):
+        """
+        Statistik per tahap dan antrean.
+
+        Returns:
+            dict: {nama_tahap: {'processed', 'busy_seconds', 'mean_ms'}} serta
+                  'dropped_frames' dan 'dropped_renders' (item yang dibuang antrean drop_oldest).
+        """
+        stats = {}
+        for stage in self.stages:
+            stats[stage.name] = {
+                "processed": stage.processed,
+                "busy_seconds": stage.busy_seconds,
+                "mean_ms": 1000.0 * stage.busy_seconds / stage.processed if stage.processed else 0.0,
+            }
+        stats["dropped_frames"] = self.frame_queue.dropped
+        stats["dropped_renders"] = self.render_queue.dropped
+        return stats
+
+class LatestMailbox:
+    def __init__(self):
+        """
+        Kotak surat thread-safe berkapasitas satu dengan aturan latest-wins: produsen
+        selalu menimpa snapshot lama, konsumen (thread Tk) mengambilnya dengan laju sendiri.
+        Snapshot yang tertimpa sebelum sempat diambil dihitung sebagai `dropped`.
+        """
+        self._lock = threading.Lock()
+        self._item = None
+        self._has_item = False
+        self.published = 0
+        self.dropped = 0
+        self.taken = 0
+
+    def publish(self, item):
+        """Simpan snapshot terbaru, menggantikan snapshot yang belum diambil."""
+        with self._lock:
+            if self._has_item:
+                self.dropped += 1
+            self._item = item
+            self._has_item = True
+            self.published += 1
+
+    def take(self):
+        """
+        Ambil snapshot terbaru.
+
+        Returns:
+            object: Snapshot, atau None jika belum ada snapshot baru sejak pengambilan terakhir.
+        """
+        with self._lock:
+            if not self._has_item:
+                return None
+            item, self._item = self._item, None
+            self._has_item = False
+            self.taken += 1
+            return item
+
+    def clear(self):
+        """Buang snapshot yang tertunda dan nolkan penghitung."""
+        with self._lock:
+            self._item = None
+            self._has_item = False
+            self.published = self.dropped = self.taken = 0
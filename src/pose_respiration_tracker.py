@@ -1,8 +1,7 @@
 # pose_respiration_tracker.py
 import cv2
 import mediapipe as mp
-import numpy as np
-import collections  # Untuk struktur data deque yang efisien, digunakan untuk smoothing
+from ring_buffer import RingBuffer  # Buffer array berkapasitas tetap untuk smoothing
 
 class PoseRespirationTracker:
     def __init__(self, 
@@ -24,23 +23,49 @@ class PoseRespirationTracker:
         """
         # Setup MediaPipe Pose dengan parameter yang diberikan
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence,
-            model_complexity=model_complexity
-        )
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.model_complexity = model_complexity
+        self.pose = self._create_pose(model_complexity)
         self.mp_drawing = mp.solutions.drawing_utils  # Utilitas untuk menggambar landmark pada frame
         
         self.prev_shoulder_y_mid = None  # Posisi vertikal tengah bahu frame sebelumnya
+        # Posisi bahu terakhir ((x, y, visibility) kiri, kanan) ternormalisasi 0..1, None jika tidak ada pose
+        self.last_shoulders = None
         self.raw_signal_multiplier = float(raw_signal_multiplier)  # Pastikan multiplier bertipe float
         
-        # Setup deque untuk smoothing sinyal dy internal, hanya aktif jika window > 1
+        # Setup ring buffer untuk smoothing sinyal dy internal, hanya aktif jika window > 1
         self.internal_smoothing_window = max(1, int(internal_smoothing_window))
         if self.internal_smoothing_window > 1:
-            self.dy_history = collections.deque(maxlen=self.internal_smoothing_window)
+            self.dy_history = RingBuffer(self.internal_smoothing_window, with_timestamps=False)
         else:
             self.dy_history = None  # Nonaktifkan smoothing jika window=1
 
+    def _create_pose(self, model_complexity):
+        return self.mp_pose.Pose(
+            min_detection_confidence=self.min_detection_confidence,
+            min_tracking_confidence=self.min_tracking_confidence,
+            model_complexity=model_complexity
+        )
+
+    def set_model_complexity(self, model_complexity):
+        """
+        Ganti model pose saat berjalan (misal oleh pengendali beban). Model lama ditutup dan
+        posisi bahu sebelumnya dilupakan karena landmark model berbeda tidak sebanding.
+        Harus dipanggil dari thread yang sama dengan pemrosesan frame.
+
+        Args:
+            model_complexity (int): Kompleksitas model pose baru (0/1/2).
+        """
+        if model_complexity == self.model_complexity:
+            return
+        new_pose = self._create_pose(model_complexity)
+        if self.pose:
+            self.pose.close()
+        self.pose = new_pose
+        self.model_complexity = model_complexity
+        self.reset()
+
     def get_respiration_signal_and_draw_landmarks(self, frame_rgb, frame_to_draw_on=None):
         """
         Proses frame RGB untuk ekstrak sinyal pernapasan dari gerakan bahu,
@@ -60,6 +85,7 @@ class PoseRespirationTracker:
         raw_signal = 0.0
         pose_detected = False
         dy = 0.0  # Perubahan posisi vertikal bahu antar frame
+        self.last_shoulders = None
 
         if results.pose_landmarks:  # Jika pose berhasil dideteksi
             pose_detected = True
@@ -69,6 +95,8 @@ class PoseRespirationTracker:
                 # Ambil landmark bahu kiri dan kanan
                 left_shoulder = landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value]
                 right_shoulder = landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
+                self.last_shoulders = ((left_shoulder.x, left_shoulder.y, left_shoulder.visibility),
+                                       (right_shoulder.x, right_shoulder.y, right_shoulder.visibility))
 
                 # Cek visibilitas landmark (agar hanya pakai yang cukup jelas)
                 if left_shoulder.visibility > 0.3 and right_shoulder.visibility > 0.3:
@@ -116,7 +144,7 @@ class PoseRespirationTracker:
                 self.dy_history.append(dy)
 
             if self.dy_history:
-                averaged_dy = np.mean(list(self.dy_history))
+                averaged_dy = self.dy_history.mean()
                 raw_signal = averaged_dy * self.raw_signal_multiplier
             else:
                 raw_signal = dy * self.raw_signal_multiplier
@@ -126,6 +154,13 @@ class PoseRespirationTracker:
             
         return raw_signal, pose_detected
 
+    def reset(self):
+        """Lupakan posisi bahu dan riwayat smoothing, misalnya saat memulai sesi/rekaman baru."""
+        self.prev_shoulder_y_mid = None
+        self.last_shoulders = None
+        if self.dy_history:
+            self.dy_history.clear()
+
     def close(self):
         """Melepaskan resource model MediaPipe Pose saat aplikasi selesai."""
         if self.pose:
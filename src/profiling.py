@@ -0,0 +1,145 @@
+# profiling.py
+import functools
+import json
+import threading
+import time
+import numpy as np
+from ring_buffer import RingBuffer
+
+PROFILE_WINDOW_SIZE = 300  # Jumlah durasi terakhir per tahap untuk persentil bergulir (~10 dtk @ 30 FPS)
+
+class _NullTimer:
+    # Context manager kosong, dipakai saat profiling nonaktif (tanpa alokasi, tanpa perf_counter)
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _StageTimer:
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler.record(self._name, time.perf_counter() - self._start)
+        return False
+
+class StageProfiler:
+    def __init__(self, enabled=False, window_size=PROFILE_WINDOW_SIZE):
+        """
+        Pengukur latensi per tahap (capture, konversi warna, deteksi wajah, pose, DSP, tampilan, plot).
+
+        Setiap tahap menyimpan `window_size` durasi terakhir di RingBuffer sehingga p50/p95/p99
+        selalu mencerminkan kondisi terbaru. Saat nonaktif, `stage()` mengembalikan context
+        manager kosong yang sama sehingga overhead hanya satu pemanggilan method.
+
+        Args:
+            enabled (bool): Aktifkan pengukuran sejak awal.
+            window_size (int): Jumlah sampel durasi per tahap.
+        """
+        self.enabled = enabled
+        self.window_size = window_size
+        self._durations = {}  # nama tahap -> RingBuffer durasi (detik)
+        self._counts = {}     # nama tahap -> jumlah total pengukuran
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """
+        Context manager pengukur satu tahap.
+
+        Contoh:
+            with profiler.stage("face_detection"):
+                bbox = detector.detect_face_bounding_box(frame_rgb)
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name)
+
+    def timed(self, name):
+        """Decorator pengukur seluruh pemanggilan fungsi sebagai tahap `name`."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _StageTimer(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        """Catat satu durasi (detik) untuk tahap `name`."""
+        with self._lock:
+            durations = self._durations.get(name)
+            if durations is None:
+                durations = self._durations[name] = RingBuffer(self.window_size, with_timestamps=False)
+                self._counts[name] = 0
+            durations.append(seconds)
+            self._counts[name] += 1
+
+    def summary(self):
+        """
+        Statistik bergulir per tahap dalam milidetik.
+
+        Returns:
+            dict: {nama_tahap: {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}},
+                  urut berdasarkan p50 terbesar.
+        """
+        with self._lock:
+            snapshot = {name: (np.array(buffer.view()), self._counts[name]) for name, buffer in self._durations.items()}
+        stats = {}
+        for name, (durations, count) in snapshot.items():
+            if len(durations) == 0:
+                continue
+            p50, p95, p99 = np.percentile(durations, [50, 95, 99]) * 1000.0
+            stats[name] = {
+                "count": count,
+                "mean_ms": float(durations.mean() * 1000.0),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": float(durations.max() * 1000.0),
+            }
+        return dict(sorted(stats.items(), key=lambda item: -item[1]["p50_ms"]))
+
+    def format_summary(self):
+        """Ringkasan dalam bentuk tabel teks (untuk panel GUI / console)."""
+        lines = [f"{'Tahap':<18}{'p50':>8}{'p95':>8}{'p99':>8}  (ms)"]
+        for name, stat in self.summary().items():
+            lines.append(f"{name:<18}{stat['p50_ms']:>8.2f}{stat['p95_ms']:>8.2f}{stat['p99_ms']:>8.2f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """
+        Simpan ringkasan ke file JSON.
+
+        Args:
+            path (str): Path file tujuan.
+        """
+        with open(path, "w") as f:
+            json.dump({
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "window_size": self.window_size,
+                "stages": self.summary(),
+            }, f, indent=2)
+
+    def reset(self):
+        """Hapus semua pengukuran."""
+        with self._lock:
+            self._durations.clear()
+            self._counts.clear()
+
+# Profiler bersama untuk seluruh aplikasi; nonaktif secara default
+profiler = StageProfiler()
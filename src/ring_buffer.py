@@ -0,0 +1,147 @@
+# ring_buffer.py
+import time
+import numpy as np
+
+class RingBuffer:
+    def __init__(self, capacity, shape=(), dtype=np.float64, with_timestamps=True):
+        """
+        Buffer melingkar berkapasitas tetap berbasis array NumPy.
+
+        Data disimpan dua kali (di indeks i dan i + capacity) sehingga `capacity`
+        sampel terakhir selalu berada dalam satu blok memori yang berurutan.
+        Dengan begitu `view()` bisa mengembalikan data urut lama -> baru tanpa
+        menyalin (zero-copy) dan tanpa alokasi baru setiap frame.
+
+        Args:
+            capacity (int): Jumlah sampel maksimum yang disimpan.
+            shape (tuple): Bentuk satu sampel, () untuk skalar, (3,) untuk RGB, dst.
+            dtype: Tipe data NumPy untuk nilai sampel.
+            with_timestamps (bool): Simpan timestamp di samping setiap nilai.
+        """
+        capacity = int(capacity)
+        if capacity <= 0:
+            raise ValueError(f"Kapasitas ring buffer harus > 0, didapat {capacity}.")
+        self.capacity = capacity
+        self.shape = tuple(shape)
+        self._data = np.zeros((2 * capacity,) + self.shape, dtype=dtype)
+        self._times = np.zeros(2 * capacity, dtype=np.float64) if with_timestamps else None
+        self._pos = 0    # Indeks tulis berikutnya dalam rentang [0, capacity)
+        self._count = 0  # Jumlah sampel valid (maksimal capacity)
+
+    def __len__(self):
+        return self._count
+
+    def is_full(self):
+        """True jika buffer sudah berisi `capacity` sampel."""
+        return self._count == self.capacity
+
+    def append(self, value, timestamp=None):
+        """
+        Tambahkan satu sampel, sampel tertua otomatis tertimpa bila buffer penuh (O(1)).
+
+        Args:
+            value: Nilai sampel (skalar atau array dengan bentuk `shape`).
+            timestamp (float, optional): Waktu sampel, default time.monotonic().
+        """
+        pos = self._pos
+        self._data[pos] = value
+        self._data[pos + self.capacity] = value
+        if self._times is not None:
+            if timestamp is None:
+                timestamp = time.monotonic()
+            self._times[pos] = timestamp
+            self._times[pos + self.capacity] = timestamp
+        self._pos = pos + 1 if pos + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def extend(self, values, timestamps=None):
+        """
+        Tambahkan banyak sampel sekaligus (urut lama -> baru).
+
+        Args:
+            values (array-like): Sampel-sampel baru, sumbu pertama = sampel.
+            timestamps (array-like, optional): Timestamp untuk tiap sampel.
+        """
+        values = np.asarray(values, dtype=self._data.dtype)
+        n = len(values)
+        if n == 0:
+            return
+        if timestamps is None and self._times is not None:
+            timestamps = np.full(n, time.monotonic())
+        if n > self.capacity:  # Hanya `capacity` sampel terakhir yang relevan
+            values = values[-self.capacity:]
+            if timestamps is not None:
+                timestamps = np.asarray(timestamps)[-self.capacity:]
+            n = self.capacity
+
+        # Tulis dalam maksimal dua potongan agar tidak melewati batas capacity
+        first = min(n, self.capacity - self._pos)
+        chunks = ((self._pos, 0, first), (0, first, n - first))
+        for dst, src, length in chunks:
+            if length <= 0:
+                continue
+            self._data[dst:dst + length] = values[src:src + length]
+            self._data[dst + self.capacity:dst + self.capacity + length] = values[src:src + length]
+            if self._times is not None:
+                ts = np.asarray(timestamps, dtype=np.float64)
+                self._times[dst:dst + length] = ts[src:src + length]
+                self._times[dst + self.capacity:dst + self.capacity + length] = ts[src:src + length]
+        self._pos = (self._pos + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def _span(self, n=None):
+        # Rentang indeks pada array ganda untuk n sampel terakhir
+        count = self._count if n is None else max(0, min(int(n), self._count))
+        end = self._pos + self.capacity
+        return end - count, end
+
+    def view(self, n=None):
+        """
+        View read-only (tanpa copy) dari n sampel terakhir, urut lama -> baru.
+
+        View hanya valid sampai append/extend berikutnya; salin dengan
+        `np.array(...)` jika data perlu disimpan lebih lama.
+
+        Args:
+            n (int, optional): Jumlah sampel terakhir, default semua sampel valid.
+
+        Returns:
+            np.array: Array kontigu dengan bentuk (n,) + shape.
+        """
+        start, end = self._span(n)
+        out = self._data[start:end]
+        out.flags.writeable = False
+        return out
+
+    def timestamps(self, n=None):
+        """View read-only timestamp untuk n sampel terakhir (urut lama -> baru)."""
+        if self._times is None:
+            return np.array([])
+        start, end = self._span(n)
+        out = self._times[start:end]
+        out.flags.writeable = False
+        return out
+
+    def last(self, default=None):
+        """Sampel terbaru, atau `default` jika buffer kosong."""
+        if self._count == 0:
+            return default
+        return self._data[self._pos + self.capacity - 1]
+
+    def last_timestamp(self, default=None):
+        """Timestamp sampel terbaru, atau `default` jika kosong/tanpa timestamp."""
+        if self._count == 0 or self._times is None:
+            return default
+        return self._times[self._pos + self.capacity - 1]
+
+    def mean(self):
+        """Rata-rata seluruh sampel valid (0.0 jika kosong)."""
+        if self._count == 0:
+            return 0.0
+        return np.mean(self.view(), axis=0)
+
+    def clear(self):
+        """Kosongkan buffer tanpa mengalokasikan ulang memori."""
+        self._pos = 0
+        self._count = 0
@@ -0,0 +1,228 @@
+# session_recording.py
+import json
+import os
+import struct
+import threading
+import time
+import numpy as np
+from pipeline_stages import BoundedQueue, QUEUE_POLICY_BLOCK
+
+SESSION_MAGIC = b"PHYSSES\x00"
+SESSION_VERSION = 1
+SESSION_ALIGNMENT = 64          # Record pertama dimulai di offset kelipatan ini (ramah mmap)
+SESSION_BATCH_SIZE = 64         # Jumlah record per chunk yang diserahkan ke thread penulis
+SESSION_FLUSH_SECONDS = 1.0     # Chunk yang belum penuh tetap ditulis setidaknya setiap interval ini
+SESSION_EXTENSION = ".physses"
+
+def session_record_dtype(n_roi):
+    """
+    Dtype terstruktur satu record per frame (ukuran tetap, little-endian).
+
+    Args:
+        n_roi (int): Jumlah sub-ROI wajah (baris `roi_rgb`).
+
+    Returns:
+        np.dtype: Field 'timestamp', 'roi_rgb' (n_roi, 3), 'face_bbox' (x, y, w, h; -1 jika tidak ada wajah),
+                  'shoulders' (2, 3) (x, y, visibility kiri/kanan; NaN jika tidak ada pose),
+                  'resp_raw' (sampel respirasi yang dipakai DSP live; NaN jika frame itu tanpa sampel)
+                  dan 'pose_detected'.
+    """
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("roi_rgb", "<f4", (n_roi, 3)),
+        ("face_bbox", "<i4", (4,)),
+        ("shoulders", "<f4", (2, 3)),
+        ("resp_raw", "<f4"),
+        ("pose_detected", "u1"),
+    ])
+
+def _dtype_to_fields(dtype):
+    # Deskripsi dtype yang bisa disimpan di header JSON: [[nama, tipe, shape], ...]
+    return [[name, dtype.fields[name][0].base.str, list(dtype.fields[name][0].shape)] for name in dtype.names]
+
+def _fields_to_dtype(fields):
+    return np.dtype([(name, type_str, tuple(shape)) for name, type_str, shape in fields])
+
+class SessionRecorder:
+    def __init__(self, path, roi_names, fs, metadata=None, batch_size=SESSION_BATCH_SIZE,
+                 flush_seconds=SESSION_FLUSH_SECONDS):
+        """
+        Perekam sesi biner append-only: header (magic, versi, JSON deskripsi dtype) lalu
+        record berukuran tetap per frame. Record dikumpulkan per chunk di thread pemanggil
+        dan ditulis oleh thread latar, sehingga tahap DSP tidak pernah menunggu disk.
+        File yang terpotong (misal aplikasi crash) tetap terbaca sampai record utuh terakhir.
+
+        Args:
+            path (str): Path file tujuan (dibuat baru).
+            roi_names (list): Nama sub-ROI sesuai urutan baris `roi_rgb`.
+            fs (float): Frekuensi sampling nominal sesi.
+            metadata (dict, optional): Info tambahan (sumber, opsi pipeline, dll.) untuk header.
+            batch_size (int): Jumlah record per chunk.
+            flush_seconds (float): Chunk yang belum penuh diserahkan ke penulis setelah interval ini.
+        """
+        self.path = path
+        self.roi_names = list(roi_names)
+        self.dtype = session_record_dtype(len(self.roi_names))
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.records_written = 0
+        self.error = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "xb")
+        header = json.dumps({
+            "fields": _dtype_to_fields(self.dtype),
+            "roi_names": self.roi_names,
+            "fs": fs,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "metadata": metadata or {},
+        }).encode("utf-8")
+        prefix_size = len(SESSION_MAGIC) + struct.calcsize("<II")
+        padding = -(prefix_size + len(header)) % SESSION_ALIGNMENT
+        header += b" " * padding  # Spasi di akhir JSON tetap valid
+        self._file.write(SESSION_MAGIC + struct.pack("<II", SESSION_VERSION, len(header)) + header)
+        self._file.flush()
+
+        self._chunk = np.zeros(batch_size, dtype=self.dtype)
+        self._count = 0
+        self._last_handoff = time.monotonic()
+        self._queue = BoundedQueue(256, QUEUE_POLICY_BLOCK)
+        self._writer = threading.Thread(target=self._write_loop, name="session-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, observation):
+        """
+        Tambahkan satu frame dari hasil `PhysioPipeline.analyze_frame`/`update_estimates`.
+
+        Args:
+            observation (dict): Berisi 'timestamp', 'roi_rgb', 'face_bbox', 'shoulders',
+                                'resp_sample' (nilai yang masuk ke DSP, None jika tidak ada)
+                                dan 'pose_detected'.
+        """
+        row = self._chunk[self._count]
+        row["timestamp"] = observation["timestamp"]
+        row["roi_rgb"] = observation["roi_rgb"]
+        bbox = observation["face_bbox"]
+        row["face_bbox"] = bbox if bbox is not None else (-1, -1, -1, -1)
+        shoulders = observation.get("shoulders")
+        row["shoulders"] = shoulders if shoulders is not None else np.nan
+        resp_sample = observation["resp_sample"]
+        row["resp_raw"] = np.nan if resp_sample is None else resp_sample
+        row["pose_detected"] = bool(observation["pose_detected"])
+        self._count += 1
+        if self._count == self.batch_size or time.monotonic() - self._last_handoff >= self.flush_seconds:
+            self._handoff()
+
+    def _handoff(self):
+        # Serahkan chunk terisi ke thread penulis lalu mulai chunk baru
+        if self._count:
+            self._queue.put(self._chunk[:self._count])
+            self._chunk = np.zeros(self.batch_size, dtype=self.dtype)
+            self._count = 0
+        self._last_handoff = time.monotonic()
+
+    def _write_loop(self):
+        while True:
+            chunk = self._queue.get(timeout=0.5)
+            if chunk is None:
+                if self._queue.closed:
+                    break
+                continue
+            try:
+                self._file.write(chunk.tobytes())
+                self._file.flush()
+                self.records_written += len(chunk)
+            except OSError as e:
+                self.error = e
+                print(f"Error menulis rekaman sesi '{self.path}': {e}")
+
+    def close(self):
+        """Tulis sisa chunk, hentikan thread penulis, dan tutup file."""
+        if self._file.closed:
+            return
+        self._handoff()
+        self._queue.close()
+        self._writer.join()
+        self._file.close()
+
+class SessionReader:
+    def __init__(self, path):
+        """
+        Pembaca rekaman sesi: header diparse, record dipetakan dengan np.memmap (tanpa
+        memuat seluruh file). Record terakhir yang terpotong diabaikan.
+
+        Args:
+            path (str): Path file rekaman sesi.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            magic = f.read(len(SESSION_MAGIC))
+            if magic != SESSION_MAGIC:
+                raise ValueError(f"Bukan file rekaman sesi: {path}")
+            version, header_size = struct.unpack("<II", f.read(struct.calcsize("<II")))
+            if version != SESSION_VERSION:
+                raise ValueError(f"Versi rekaman sesi tidak didukung: {version}")
+            header = json.loads(f.read(header_size).decode("utf-8"))
+        self.dtype = _fields_to_dtype(header["fields"])
+        self.roi_names = header["roi_names"]
+        self.fs = header["fs"]
+        self.created = header["created"]
+        self.metadata = header["metadata"]
+        self.data_offset = len(SESSION_MAGIC) + struct.calcsize("<II") + header_size
+
+        count = (os.path.getsize(path) - self.data_offset) // self.dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=self.data_offset, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def duration(self):
+        """Durasi sesi dalam detik (timestamp terakhir - pertama)."""
+        if len(self.records) < 2:
+            return 0.0
+        return float(self.records["timestamp"][-1] - self.records["timestamp"][0])
+
+    def replay(self, processor, speed=None, roi="face", on_result=None):
+        """
+        Putar ulang sesi ke SignalProcessor tanpa kamera maupun MediaPipe. Record menyimpan
+        sampel respirasi yang dipakai DSP live (NaN = tanpa sampel), sehingga dengan opsi
+        processor yang sama estimasinya identik dengan sesi live.
+
+        Args:
+            processor (SignalProcessor): Processor tujuan (sebaiknya baru dibuat dengan fs sesi).
+            speed (float, optional): None/0 = secepat mungkin, 1.0 = waktu asli, 2.0 = dua kali lebih cepat.
+            roi (str): Sub-ROI yang dipakai sebagai sinyal rPPG.
+            on_result (callable, optional): Dipanggil per record dengan
+                                            (record, filtered_rppg, bpm, filtered_resp, rpm).
+
+        Returns:
+            dict: {'frames', 'bpm', 'rpm', 'estimates'} dengan 'estimates' berisi estimasi baru
+                  {'timestamp', 'kind', 'value', 'provisional'}.
+        """
+        roi_row = self.roi_names.index(roi)
+        estimates = []
+        bpm = rpm = 0.0
+        first_timestamp = wall_start = None
+        for record in self.records:
+            timestamp = float(record["timestamp"])
+            if speed:
+                if first_timestamp is None:
+                    first_timestamp, wall_start = timestamp, time.monotonic()
+                delay = (timestamp - first_timestamp) / speed - (time.monotonic() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+            filtered_rppg, bpm = processor.process_rppg_rgb(record["roi_rgb"][roi_row].astype(np.float64), timestamp)
+            resp_raw = float(record["resp_raw"])
+            filtered_resp, rpm = processor.process_respiration(None if np.isnan(resp_raw) else resp_raw, timestamp)
+            for kind, schedule, value in (("bpm", processor.rppg_estimate, bpm), ("rpm", processor.resp_estimate, rpm)):
+                if schedule.fresh and value > 0:
+                    estimates.append({"timestamp": timestamp, "kind": kind, "value": float(value),
+                                      "provisional": bool(schedule.provisional)})
+            if on_result is not None:
+                on_result(record, filtered_rppg, bpm, filtered_resp, rpm)
+        return {"frames": len(self.records), "bpm": float(bpm), "rpm": float(rpm), "estimates": estimates}
@@ -1,8 +1,12 @@
 # signal_processing.py
+import time
 import numpy as np
-from scipy.signal import butter, filtfilt
-from scipy.fft import fft
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import butter, sosfilt, sosfilt_zi, sosfiltfilt
+from scipy.fft import rfft, rfftfreq
 from scipy.ndimage import uniform_filter1d  # Untuk moving average detrending yang efisien
+from ring_buffer import RingBuffer
+from profiling import profiler
 
 # --- Parameter filter untuk detak jantung (rPPG) ---
 # Rentang frekuensi normal detak jantung ~0.75 - 4 Hz (45 - 240 BPM)
@@ -16,29 +20,703 @@ RESP_LOWCUT = 0.1
 RESP_HIGHCUT = 0.8  # Batas atas dinaikkan untuk aktivitas ringan
 RESP_FILTER_ORDER = 2  # Orde filter yang lebih rendah untuk noise rendah
 
+# Panjang window moving average untuk detrending (detik)
+RPPG_DETREND_SECONDS = 2.0
+RESP_DETREND_SECONDS = 10.0  # Lebih panjang agar drift postur hilang tanpa memotong napas
+
+# Mode pemrosesan: 'block' = detrend + filtfilt ulang seluruh window tiap frame (zero-phase),
+# 'streaming' = tiap sampel melewati detrender dan filter IIR kausal ber-state (O(1) per sampel)
+PROCESSING_MODE_BLOCK = 'block'
+PROCESSING_MODE_STREAMING = 'streaming'
+
+# Metode estimasi spektral: 'fft' = FFT penuh lalu ambil bin dalam band (default, tercepat untuk blok),
+# 'in_band_dft' = perkalian matriks DFT khusus bin dalam band, O(bin * N) per estimasi; hanya
+# menguntungkan jika jumlah bin sangat sedikit (tanpa zero-padding), bukan optimasi umum,
+# 'sliding_dft' = bin dalam band diperbarui per sampel (hanya mode streaming)
+SPECTRAL_METHOD_FFT = 'fft'
+SPECTRAL_METHOD_IN_BAND_DFT = 'in_band_dft'
+SPECTRAL_METHOD_SLIDING_DFT = 'sliding_dft'
+
+# --- Metode ekstraksi pulsa rPPG dari rata-rata RGB ROI ---
+RPPG_METHOD_GREEN = 'green'  # Kanal hijau saja (perilaku awal)
+RPPG_METHOD_POS = 'pos'      # Plane-Orthogonal-to-Skin (Wang dkk., 2017)
+RPPG_METHOD_CHROM = 'chrom'  # Chrominance (de Haan & Jeanne, 2013)
+RPPG_PROJECTION_WINDOW_SECONDS = 1.6  # Panjang window proyeksi overlap-add
+
+# Panjang window minimal untuk estimasi sementara (mode progresif) sebelum buffer penuh
+RPPG_MIN_WINDOW_SECONDS = 4.0
+RESP_MIN_WINDOW_SECONDS = 8.0  # Minimal ~2 siklus napas pada laju normal
+
+# Resampling berbasis timestamp: celah antar frame lebih panjang dari ini tidak diinterpolasi,
+# grid dimulai ulang dari sampel berikutnya
+RESAMPLE_MAX_GAP_SECONDS = 1.0
+
 # Ukuran buffer untuk simpan data sinyal sebelum filtering dan FFT
 SIGNAL_BUFFER_SIZE = 384  # ~12.8 detik data @ 30 FPS, agar analisis stabil
 
+class BandpassFilter:
+    def __init__(self, fs, lowcut, highcut, order):
+        """
+        Filter bandpass Butterworth yang didesain sekali dalam bentuk
+        second-order sections (SOS), lebih stabil secara numerik daripada (b, a)
+        untuk orde tinggi dan cutoff ternormalisasi yang rendah.
+
+        Args:
+            fs (float): Frekuensi sampling.
+            lowcut (float): Frekuensi cutoff bawah (Hz).
+            highcut (float): Frekuensi cutoff atas (Hz).
+            order (int): Orde filter Butterworth.
+
+        Raises:
+            ValueError: Jika batas frekuensi ternormalisasi tidak valid.
+        """
+        nyq = 0.5 * fs  # Frekuensi Nyquist
+        low = lowcut / nyq
+        high = highcut / nyq
+        if not (0 < low < 1 and 0 < high < 1 and low < high):
+            raise ValueError(f"Batas frekuensi tidak valid (low: {low}, high: {high}).")
+
+        self.fs = fs
+        self.lowcut = lowcut
+        self.highcut = highcut
+        self.order = order
+        self.sos = butter(order, [low, high], btype='band', output='sos')
+        # Koefisien per section (b0, b1, b2, a1, a2) sebagai float Python untuk filter per sampel
+        self.sections = tuple((float(b0), float(b1), float(b2), float(a1), float(a2))
+                              for b0, b1, b2, _, a1, a2 in self.sos)
+        # Kondisi awal steady-state untuk input step satuan (dikali sampel pertama saat dipakai)
+        self.zi = sosfilt_zi(self.sos)
+        # Panjang padding default sosfiltfilt, dihitung sekali
+        n_zeros = min((self.sos[:, 2] == 0).sum(), (self.sos[:, 5] == 0).sum())
+        self.padlen = 3 * (2 * len(self.sos) + 1 - n_zeros)
+
+    def filtfilt(self, data):
+        """
+        Filtering zero-phase (maju-mundur) untuk pemrosesan blok/offline.
+
+        Args:
+            data (np.array): Sinyal input; untuk array multi-dimensi difilter sepanjang sumbu terakhir.
+
+        Returns:
+            np.array: Sinyal terfilter tanpa pergeseran fasa.
+        """
+        data = np.asarray(data)
+        padlen = min(self.padlen, data.shape[-1] - 1)
+        return sosfiltfilt(self.sos, data, padlen=padlen)
+
+    def filter(self, data, zi=None):
+        """
+        Filtering kausal satu arah dengan state yang bisa diteruskan antar blok.
+
+        Args:
+            data (np.array): Sinyal input.
+            zi (np.array, optional): State filter dari panggilan sebelumnya.
+                                     Jika None, dipakai kondisi awal steady-state
+                                     yang diskalakan dengan sampel pertama.
+
+        Returns:
+            tuple: (y (np.array), zf (np.array)) sinyal terfilter dan state akhir.
+        """
+        data = np.asarray(data, dtype=np.float64)
+        if zi is None:
+            zi = self.zi * (data[0] if len(data) > 0 else 0.0)
+        return sosfilt(self.sos, data, zi=zi)
+
+class FilterBank:
+    def __init__(self):
+        """
+        Cache filter bandpass per (fs, lowcut, highcut, order) agar desain filter
+        hanya dilakukan sekali, bukan setiap frame.
+        """
+        self._filters = {}
+
+    def get(self, fs, lowcut, highcut, order):
+        """
+        Ambil (atau desain lalu simpan) filter untuk band tertentu.
+
+        Returns:
+            BandpassFilter: Filter ter-cache, atau None jika batas frekuensi tidak valid.
+        """
+        key = (float(fs), float(lowcut), float(highcut), int(order))
+        if key not in self._filters:
+            try:
+                self._filters[key] = BandpassFilter(*key)
+            except ValueError as e:
+                # Simpan None agar peringatan hanya muncul sekali per band
+                print(f"Peringatan filter: {e}")
+                self._filters[key] = None
+        return self._filters[key]
+
+class StreamingDetrender:
+    def __init__(self, window_samples):
+        """
+        Detrender moving average kausal dengan running sum, O(1) per sampel.
+
+        Args:
+            window_samples (int): Panjang window moving average (sampel).
+        """
+        self.window_samples = max(3, int(window_samples))  # Minimal 3 sampel window
+        self._window = RingBuffer(self.window_samples, with_timestamps=False)
+        self._running_sum = 0.0
+        self._pushes_since_resync = 0
+
+    def push(self, value):
+        """
+        Masukkan satu sampel dan kembalikan sampel dikurangi rata-rata window terakhir.
+
+        Args:
+            value (float): Sampel mentah terbaru.
+
+        Returns:
+            float: Sampel yang sudah di-detrend.
+        """
+        if self._window.is_full():
+            self._running_sum -= self._window.view()[0]  # Sampel tertua keluar dari window
+        self._window.append(value)
+        self._running_sum += value
+
+        # Hitung ulang jumlah secara eksak sesekali agar error floating point tidak menumpuk
+        self._pushes_since_resync += 1
+        if self._pushes_since_resync >= self.window_samples:
+            self._running_sum = float(np.sum(self._window.view()))
+            self._pushes_since_resync = 0
+
+        return value - self._running_sum / len(self._window)
+
+    def reset(self):
+        self._window.clear()
+        self._running_sum = 0.0
+        self._pushes_since_resync = 0
+
+class StreamingBandpass:
+    def __init__(self, band, detrend_window_samples):
+        """
+        Rantai streaming: detrender running-sum lalu kaskade IIR SOS kausal
+        dengan state yang dipertahankan antar sampel.
+
+        Args:
+            band (BandpassFilter): Filter ter-cache dari FilterBank.
+            detrend_window_samples (int): Panjang window detrending (sampel).
+        """
+        self.band = band
+        self.detrender = StreamingDetrender(detrend_window_samples)
+        self._zi = None  # State filter [[z0, z1], ...] per section, diinisialisasi saat sampel pertama masuk
+
+    def push(self, value):
+        """
+        Proses satu sampel mentah menjadi satu sampel terfilter.
+
+        Args:
+            value (float): Sampel mentah terbaru.
+
+        Returns:
+            float: Sampel terfilter (kausal).
+        """
+        detrended = self.detrender.push(float(value))
+        if self.band is None:  # Band tidak valid, hanya detrending
+            return detrended
+        if self._zi is None:
+            self._zi = (self.band.zi * detrended).tolist()
+        # Direct form II transposed per section, sama dengan sosfilt tanpa overhead panggilan scipy per sampel
+        y = detrended
+        for (b0, b1, b2, a1, a2), z in zip(self.band.sections, self._zi):
+            x = y
+            y = b0 * x + z[0]
+            z[0] = b1 * x - a1 * y + z[1]
+            z[1] = b2 * x - a2 * y
+        return y
+
+    def reset(self):
+        self.detrender.reset()
+        self._zi = None
+
+def band_frequency_grid(n_fft, fs, lowcut, highcut):
+    """
+    Indeks dan frekuensi bin FFT n_fft-titik yang berada dalam [lowcut, highcut].
+
+    Returns:
+        tuple: (bins (np.array int), freqs (np.array float))
+    """
+    xf = rfftfreq(int(n_fft), 1.0/fs)
+    bins = np.where((xf >= lowcut) & (xf <= highcut))[0]
+    return bins, xf[bins]
+
+def refine_peak_frequency(freqs, magnitudes, peak_index):
+    """
+    Perhalus frekuensi puncak dengan interpolasi parabola (kuadratik) pada
+    magnitudo bin puncak dan dua tetangganya, sehingga resolusi tidak dibatasi
+    lebar bin fs/N. Bekerja pada banyak spektrum sekaligus (sumbu terakhir = bin).
+
+    Args:
+        freqs (np.array): Frekuensi bin (berjarak sama).
+        magnitudes (np.array): Magnitudo spektrum pada `freqs`, bentuk (..., n_bins).
+        peak_index (int/np.array): Indeks bin puncak, bentuk (...).
+
+    Returns:
+        float/np.array: Frekuensi puncak hasil interpolasi (Hz).
+    """
+    magnitudes = np.asarray(magnitudes)
+    peak_index = np.asarray(peak_index)
+    n_bins = magnitudes.shape[-1]
+    if n_bins < 3:
+        return freqs[peak_index]
+
+    # Puncak di tepi band tidak punya tetangga di kedua sisi -> tidak digeser
+    inner = np.clip(peak_index, 1, n_bins - 2)[..., np.newaxis]
+    a = np.take_along_axis(magnitudes, inner - 1, axis=-1)[..., 0]
+    b = np.take_along_axis(magnitudes, inner, axis=-1)[..., 0]
+    c = np.take_along_axis(magnitudes, inner + 1, axis=-1)[..., 0]
+    denominator = a - 2 * b + c
+    valid = (peak_index > 0) & (peak_index < n_bins - 1) & (denominator != 0)
+    safe_denominator = np.where(valid, denominator, 1.0)
+    delta = np.where(valid, 0.5 * (a - c) / safe_denominator, 0.0)  # Pergeseran dalam bin, |delta| <= 0.5
+    return freqs[peak_index] + delta * (freqs[1] - freqs[0])
+
+def detrend_moving_average(signals, window_samples):
+    """
+    Hapus tren lambat dengan moving average sepanjang sumbu terakhir.
+    Bisa untuk satu sinyal (N,) maupun banyak stream sekaligus (n_streams, N).
+
+    Args:
+        signals (np.array): Sinyal input.
+        window_samples (int): Ukuran window moving average (sampel), minimal 3.
+
+    Returns:
+        np.array: Sinyal yang sudah di-detrend.
+    """
+    signals = np.asarray(signals, dtype=np.float64)
+    if signals.shape[-1] == 0:
+        return np.array([])
+
+    window_samples = max(3, int(window_samples))  # Minimal 3 sampel window
+    if signals.shape[-1] >= window_samples:
+        # Moving average efisien dengan uniform_filter1d dan mode refleksi tepi
+        return signals - uniform_filter1d(signals, size=window_samples, axis=-1, mode='reflect')
+    # Jika data pendek, buang rata-rata sederhana
+    return signals - np.mean(signals, axis=-1, keepdims=True)
+
+def estimate_dominant_frequency(signals, fs, lowcut, highcut, n_fft=None, peak_interpolation=False):
+    """
+    Frekuensi dominan dalam [lowcut, highcut] dari rFFT sepanjang sumbu terakhir.
+    Bisa untuk satu sinyal (N,) maupun banyak stream sekaligus (n_streams, N).
+
+    Args:
+        signals (np.array): Sinyal terfilter.
+        fs (float): Frekuensi sampling.
+        lowcut (float): Batas bawah band (Hz).
+        highcut (float): Batas atas band (Hz).
+        n_fft (int, optional): Panjang FFT (zero-padding), default panjang sinyal.
+        peak_interpolation (bool): Perhalus puncak dengan interpolasi parabola.
+
+    Returns:
+        float/np.array: Frekuensi dominan (Hz) per stream, 0.0 jika band kosong.
+    """
+    signals = np.asarray(signals)
+    n_fft = signals.shape[-1] if n_fft is None else int(n_fft)
+    valid_freq_indices, freqs = band_frequency_grid(n_fft, fs, lowcut, highcut)
+    if len(freqs) == 0:
+        return np.zeros(signals.shape[:-1])
+
+    yf = rfft(signals, n=n_fft, axis=-1)  # Frekuensi positif saja
+    magnitudes = np.abs(yf[..., valid_freq_indices])
+    peak_index = np.argmax(magnitudes, axis=-1)
+    if peak_interpolation:
+        return refine_peak_frequency(freqs, magnitudes, peak_index)
+    return freqs[peak_index]
+
+class InBandDFT:
+    def __init__(self, n, fs, lowcut, highcut, n_fft=None):
+        """
+        Bank DFT yang hanya menghitung bin dalam rentang [lowcut, highcut].
+
+        Bin yang dipakai sama persis dengan bin FFT yang dipilih jalur FFT
+        (termasuk zero-padding ke n_fft), sehingga argmax (dan estimasi BPM/RPM)
+        identik. Dievaluasi sebagai perkalian matriks-vektor padat dengan basis
+        kompleks yang dihitung sekali: O(bin * N) per estimasi, sehingga hanya
+        lebih murah dari FFT O(N log N) jika jumlah bin sangat sedikit. Dengan
+        zero-padding atau band lebar, FFT sama cepat atau lebih cepat.
+        Basisnya juga dipakai SlidingDFT untuk sinkronisasi ulang.
+
+        Args:
+            n (int): Panjang window analisis (sampel).
+            fs (float): Frekuensi sampling.
+            lowcut (float): Batas bawah band (Hz).
+            highcut (float): Batas atas band (Hz).
+            n_fft (int, optional): Panjang DFT setelah zero-padding, default n.
+        """
+        self.n = int(n)
+        self.n_fft = self.n if n_fft is None else int(n_fft)
+        self.bins, self.freqs = band_frequency_grid(self.n_fft, fs, lowcut, highcut)
+        self.basis = np.exp(-2j * np.pi * np.outer(self.bins, np.arange(self.n)) / self.n_fft)
+
+    def magnitudes(self, window):
+        """Magnitudo spektrum bin dalam band untuk window sepanjang n."""
+        return np.abs(self.basis @ window)
+
+class SlidingDFT(InBandDFT):
+    def __init__(self, n, fs, lowcut, highcut):
+        """
+        Sliding DFT untuk bin dalam band: setiap sampel baru memperbarui
+        semua bin dengan O(jumlah bin), tanpa FFT ulang seluruh window.
+        Spektrum disinkronkan ulang secara eksak setiap n sampel agar
+        error pembulatan tidak menumpuk.
+        """
+        super().__init__(n, fs, lowcut, highcut)
+        self._twiddle = np.exp(2j * np.pi * self.bins / self.n)
+        self._spectrum = np.zeros(len(self.bins), dtype=np.complex128)
+        self._updates_since_resync = 0
+        self.ready = False  # True setelah window pertama penuh tersinkron
+
+    def resync(self, window):
+        """Hitung ulang spektrum secara eksak dari window penuh."""
+        self._spectrum = self.basis @ window
+        self._updates_since_resync = 0
+        self.ready = True
+
+    def push(self, new_sample, old_sample):
+        """
+        Geser window satu sampel: `old_sample` keluar, `new_sample` masuk.
+
+        Returns:
+            bool: True jika sinkronisasi ulang eksak diperlukan sekarang.
+        """
+        self._spectrum = (self._spectrum + (new_sample - old_sample)) * self._twiddle
+        self._updates_since_resync += 1
+        return self._updates_since_resync >= self.n
+
+    def current_magnitudes(self):
+        return np.abs(self._spectrum)
+
+    def reset(self):
+        self._spectrum[:] = 0
+        self._updates_since_resync = 0
+        self.ready = False
+
+def _temporal_normalize(windows):
+    # Bagi setiap kanal dengan rata-rata temporalnya: (..., 3, L) -> (..., 3, L) bernilai ~1
+    means = windows.mean(axis=-1, keepdims=True)
+    return windows / np.where(means > 0, means, 1.0)
+
+def _safe_std_ratio(a, b):
+    std_b = b.std(axis=-1)
+    return np.where(std_b > 0, a.std(axis=-1) / np.where(std_b > 0, std_b, 1.0), 0.0)
+
+def pos_pulse(windows):
+    """
+    Proyeksi POS (Plane-Orthogonal-to-Skin) untuk banyak window RGB sekaligus.
+
+    Args:
+        windows (np.array): Window RGB dengan bentuk (..., 3, L), baris R, G, B.
+
+    Returns:
+        np.array: Sinyal pulsa per window (..., L), rata-rata nol.
+    """
+    cn = _temporal_normalize(np.asarray(windows, dtype=np.float64))
+    r, g, b = cn[..., 0, :], cn[..., 1, :], cn[..., 2, :]
+    s1 = g - b
+    s2 = g + b - 2.0 * r
+    h = s1 + _safe_std_ratio(s1, s2)[..., None] * s2
+    return h - h.mean(axis=-1, keepdims=True)
+
+def chrom_pulse(windows, band=None):
+    """
+    Proyeksi CHROM (chrominance) untuk banyak window RGB sekaligus, dengan jendela Hann
+    untuk overlap-add. Sinyal X/Y difilter bandpass sebelum alpha = std(Xf) / std(Yf)
+    dihitung, agar drift pencahayaan frekuensi rendah tidak mendominasi rasio.
+
+    Args:
+        windows (np.array): Window RGB dengan bentuk (..., 3, L), baris R, G, B.
+        band (BandpassFilter, optional): Filter band rPPG; None = X/Y tanpa filter.
+
+    Returns:
+        np.array: Sinyal pulsa per window (..., L).
+    """
+    cn = _temporal_normalize(np.asarray(windows, dtype=np.float64))
+    r, g, b = cn[..., 0, :], cn[..., 1, :], cn[..., 2, :]
+    x = 3.0 * r - 2.0 * g
+    y = 1.5 * r + g - 1.5 * b
+    if band is not None:
+        # Zero-phase sepanjang sumbu waktu, semua window sekaligus
+        x = band.filtfilt(x)
+        y = band.filtfilt(y)
+    h = x - _safe_std_ratio(x, y)[..., None] * y
+    h = h - h.mean(axis=-1, keepdims=True)
+    return h * np.hanning(h.shape[-1])
+
+class RgbPulseProjector:
+    def __init__(self, method, fs, window_seconds=RPPG_PROJECTION_WINDOW_SECONDS, hop_samples=1,
+                 filter_bank=None):
+        """
+        Ekstraksi pulsa POS/CHROM dari aliran rata-rata RGB dengan overlap-add bertahap.
+
+        Sampel RGB disimpan di ring buffer (N x 3). Setiap `hop_samples` sampel, semua
+        window yang baru lengkap diproyeksikan sekaligus (sliding_window_view, tanpa copy)
+        dan dijumlahkan ke ekor overlap-add; sampel yang sudah tidak tersentuh window
+        berikutnya dikeluarkan sebagai sampel pulsa final. Window lama tidak pernah
+        dihitung ulang.
+
+        Args:
+            method (str): RPPG_METHOD_POS atau RPPG_METHOD_CHROM.
+            fs (float): Frekuensi sampling.
+            window_seconds (float): Panjang window proyeksi (detik).
+            hop_samples (int): Jumlah sampel baru sebelum window-window baru diproses.
+            filter_bank (FilterBank, optional): Sumber filter band rPPG untuk CHROM,
+                                                default filter bank bersama.
+        """
+        if method == RPPG_METHOD_POS:
+            self._kernel = pos_pulse
+        elif method == RPPG_METHOD_CHROM:
+            filter_bank = filter_bank if filter_bank is not None else _shared_filter_bank
+            band = filter_bank.get(fs, RPPG_LOWCUT, RPPG_HIGHCUT, RPPG_FILTER_ORDER)
+            self._kernel = lambda windows: chrom_pulse(windows, band)
+        else:
+            raise ValueError(f"Metode proyeksi RGB tidak dikenal: {method}")
+        self.method = method
+        self.window = max(2, int(round(window_seconds * fs)))
+        self.hop_samples = max(1, int(hop_samples))
+        self._rgb = RingBuffer(self.window + self.hop_samples, shape=(3,))
+        self._tail = np.zeros(self.window - 1)  # Jumlah parsial untuk window-1 sampel terakhir
+        self.reset()
+
+    def reset(self):
+        self._rgb.clear()
+        self._tail[:] = 0.0
+        self._total = 0    # Jumlah sampel RGB yang pernah masuk
+        self._pending = 0  # Sampel yang window-nya belum diproses
+
+    def push(self, rgb, timestamp=None):
+        """
+        Tambahkan satu sampel rata-rata (R, G, B).
+
+        Returns:
+            tuple: (values, timestamps) sampel pulsa yang baru final (bisa kosong).
+        """
+        self._rgb.append(rgb, timestamp)
+        self._total += 1
+        self._pending += 1
+        if self._total < self.window or self._pending < self.hop_samples:
+            return np.empty(0), np.empty(0)
+
+        L = self.window
+        p = min(self._pending, self._total - L + 1)  # Window pertama baru berakhir di sampel ke-L
+        self._pending = 0
+        segment = self._rgb.view(L + p - 1)
+        segment_times = self._rgb.timestamps(L + p - 1)
+        pulses = self._kernel(sliding_window_view(segment, L, axis=0))  # (p, L)
+
+        # Overlap-add semua window baru sekaligus ke akumulator (ekor lama + p sampel baru)
+        positions = np.arange(p)[:, None] + np.arange(L)
+        accumulator = np.bincount(positions.ravel(), weights=pulses.ravel(), minlength=L - 1 + p)
+        accumulator[:L - 1] += self._tail
+        self._tail[:] = accumulator[p:]
+        return accumulator[:p], np.array(segment_times[:p])
+
+class UniformResampler:
+    def __init__(self, fs, max_gap_seconds=RESAMPLE_MAX_GAP_SECONDS):
+        """
+        Ubah sampel bertimestamp tidak teratur (frame terlambat, jitter, frame dilewati)
+        menjadi sampel pada grid seragam t0 + k / fs dengan interpolasi linear antara dua
+        sampel masukan berurutan. Setiap sampel masukan menghasilkan 0..n sampel grid,
+        sehingga semua tahap sesudahnya (detrend, filter, FFT, POS/CHROM, penjadwal hop)
+        tetap bisa menganggap jarak sampel tepat 1 / fs.
+
+        Args:
+            fs (float): Frekuensi grid keluaran.
+            max_gap_seconds (float): Celah maksimum yang masih diinterpolasi.
+        """
+        self.fs = fs
+        self.max_gap_seconds = max_gap_seconds
+        self.reset()
+
+    def reset(self):
+        self._origin = None       # Timestamp titik grid ke-0
+        self._next_index = 0      # Indeks titik grid berikutnya yang belum dikeluarkan
+        self._prev_timestamp = None
+        self._prev_value = None
+        self.gap_resets = 0       # Jumlah celah > max_gap_seconds (grid dimulai ulang)
+        self.out_of_order = 0     # Sampel dengan timestamp tidak naik (dibuang)
+
+    def push(self, value, timestamp):
+        """
+        Tambahkan satu sampel (skalar atau vektor, misal R, G, B).
+
+        Returns:
+            list: Pasangan (nilai, timestamp grid) yang jatuh di (timestamp sebelumnya, timestamp].
+        """
+        value = np.asarray(value, dtype=np.float64)
+        if self._prev_timestamp is not None and timestamp <= self._prev_timestamp:
+            self.out_of_order += 1
+            return []
+        if self._prev_timestamp is None or timestamp - self._prev_timestamp > self.max_gap_seconds:
+            if self._prev_timestamp is not None:
+                self.gap_resets += 1
+            self._origin, self._next_index = timestamp, 1
+            self._prev_timestamp, self._prev_value = timestamp, value
+            return [(value, timestamp)]
+
+        samples = []
+        t0, v0 = self._prev_timestamp, self._prev_value
+        span = timestamp - t0
+        grid_time = self._origin + self._next_index / self.fs
+        while grid_time <= timestamp:
+            samples.append((v0 + (value - v0) * ((grid_time - t0) / span), grid_time))
+            self._next_index += 1
+            grid_time = self._origin + self._next_index / self.fs
+        self._prev_timestamp, self._prev_value = timestamp, value
+        return samples
+
+class EstimationSchedule:
+    def __init__(self, fs, hop_seconds):
+        """
+        Penjadwal estimasi spektral: sampel tetap masuk setiap frame, tetapi
+        rantai detrend -> filter -> FFT hanya dijalankan setiap `hop_seconds`.
+
+        Args:
+            fs (float): Frekuensi sampling.
+            hop_seconds (float): Jarak antar estimasi (detik), 0 = setiap sampel.
+        """
+        self.hop_seconds = max(0.0, float(hop_seconds))
+        self.hop_samples = max(1, int(round(self.hop_seconds * fs)))
+        self.reset()
+
+    def reset(self):
+        self._samples_since_estimate = 0
+        self.has_estimate = False
+        self.fresh = False            # True hanya pada panggilan yang menghasilkan estimasi baru
+        self.last_value = 0.0         # Estimasi terakhir (BPM/RPM)
+        self.last_timestamp = None    # Timestamp sampel saat estimasi terakhir dibuat
+        self.last_filtered = np.array([])
+        self.latest_sample_timestamp = None
+        self.provisional = False      # True jika estimasi berasal dari window yang belum penuh
+
+    def sample_added(self, timestamp):
+        self._samples_since_estimate += 1
+        self.latest_sample_timestamp = timestamp
+        self.fresh = False
+
+    def is_due(self):
+        """True jika estimasi berikutnya perlu dijalankan sekarang."""
+        return not self.has_estimate or self._samples_since_estimate >= self.hop_samples
+
+    def record(self, value, filtered_signal, provisional=False):
+        """Simpan hasil estimasi baru beserta sinyal terfilternya."""
+        self._samples_since_estimate = 0
+        self.has_estimate = True
+        self.fresh = True
+        self.last_value = value
+        self.last_timestamp = self.latest_sample_timestamp
+        self.last_filtered = filtered_signal
+        self.provisional = provisional
+
+    def age(self):
+        """
+        Umur estimasi terakhir dalam detik (waktu sampel), atau None jika belum ada estimasi.
+        """
+        if not self.has_estimate or self.last_timestamp is None or self.latest_sample_timestamp is None:
+            return None
+        return max(0.0, self.latest_sample_timestamp - self.last_timestamp)
+
+# Filter bank bersama; desain filter identik dipakai ulang oleh semua SignalProcessor
+_shared_filter_bank = FilterBank()
+
 class SignalProcessor:
-    def __init__(self, fs, buffer_size=SIGNAL_BUFFER_SIZE):
+    def __init__(self, fs, buffer_size=SIGNAL_BUFFER_SIZE, filter_bank=None, mode=PROCESSING_MODE_BLOCK,
+                 rppg_hop_seconds=0.0, resp_hop_seconds=0.0, spectral_method=SPECTRAL_METHOD_FFT,
+                 progressive=False, zero_pad_factor=1, peak_interpolation=False, rppg_method=RPPG_METHOD_GREEN,
+                 resample=False):
         """
         Inisialisasi pemroses sinyal.
 
         Args:
             fs (float): Frekuensi sampling (FPS kamera).
             buffer_size (int): Ukuran buffer sinyal.
+            filter_bank (FilterBank, optional): Cache desain filter, default filter bank bersama.
+            mode (str): PROCESSING_MODE_BLOCK (zero-phase, seluruh window per frame) atau
+                        PROCESSING_MODE_STREAMING (kausal ber-state, O(1) per sampel).
+            rppg_hop_seconds (float): Interval estimasi BPM (detik), 0 = setiap frame.
+            resp_hop_seconds (float): Interval estimasi RPM (detik), 0 = setiap frame.
+            spectral_method (str): SPECTRAL_METHOD_FFT (default), SPECTRAL_METHOD_IN_BAND_DFT (hanya
+                                   menguntungkan untuk sedikit bin), atau SPECTRAL_METHOD_SLIDING_DFT
+                                   (butuh mode streaming).
+            progressive (bool): Beri estimasi sementara dari window yang masih tumbuh
+                                (mulai RPPG/RESP_MIN_WINDOW_SECONDS) sebelum buffer penuh.
+            zero_pad_factor (int): Panjang DFT = buffer_size * faktor ini; window pendek
+                                   di-zero-pad ke grid frekuensi yang sama dengan window penuh.
+            peak_interpolation (bool): Perhalus puncak dengan interpolasi parabola.
+            rppg_method (str): RPPG_METHOD_GREEN, RPPG_METHOD_POS atau RPPG_METHOD_CHROM;
+                               POS/CHROM dipakai lewat `process_rppg_rgb`.
+            resample (bool): Interpolasi sampel ke grid seragam 1 / fs berdasarkan timestamp
+                             pengambilan (UniformResampler), sehingga frame yang terlambat atau
+                             dilewati tidak membiaskan BPM/RPM. False = setiap sampel dianggap
+                             berjarak tepat 1 / fs.
         """
         if fs <= 0:
             print(f"Peringatan: Frekuensi sampling (fs) tidak valid: {fs}. Menggunakan fs=30.0 sebagai default.")
             fs = 30.0  # Fallback jika FPS tidak valid
         self.fs = fs
         self.buffer_size = buffer_size
-        self.rppg_raw_signal = []  # Buffer sinyal rPPG mentah (channel hijau)
-        self.resp_raw_signal = []  # Buffer sinyal pernapasan mentah (gerakan)
+        # Ring buffer berkapasitas tetap (nilai + timestamp), tanpa alokasi per frame
+        self.rppg_raw_signal = RingBuffer(buffer_size)  # Buffer sinyal rPPG mentah (channel hijau)
+        self.resp_raw_signal = RingBuffer(buffer_size)  # Buffer sinyal pernapasan mentah (gerakan)
+        self.filter_bank = filter_bank if filter_bank is not None else _shared_filter_bank
+
+        if mode not in (PROCESSING_MODE_BLOCK, PROCESSING_MODE_STREAMING):
+            print(f"Peringatan: Mode pemrosesan tidak dikenal: {mode}. Menggunakan '{PROCESSING_MODE_BLOCK}'.")
+            mode = PROCESSING_MODE_BLOCK
+        self.mode = mode
+        self.rppg_stream = None
+        self.resp_stream = None
+        self.rppg_filtered_signal = None
+        self.resp_filtered_signal = None
+        if mode == PROCESSING_MODE_STREAMING:
+            self.rppg_stream = StreamingBandpass(
+                self.filter_bank.get(fs, RPPG_LOWCUT, RPPG_HIGHCUT, RPPG_FILTER_ORDER),
+                fs * RPPG_DETREND_SECONDS)
+            self.resp_stream = StreamingBandpass(
+                self.filter_bank.get(fs, RESP_LOWCUT, RESP_HIGHCUT, RESP_FILTER_ORDER),
+                fs * RESP_DETREND_SECONDS)
+            # Trace terfilter yang diperbarui terus-menerus, sejajar dengan buffer mentah
+            self.rppg_filtered_signal = RingBuffer(buffer_size)
+            self.resp_filtered_signal = RingBuffer(buffer_size)
+
+        # Penjadwal estimasi, memisahkan laju estimasi dari laju frame
+        self.rppg_estimate = EstimationSchedule(fs, rppg_hop_seconds)
+        self.resp_estimate = EstimationSchedule(fs, resp_hop_seconds)
+
+        if spectral_method not in (SPECTRAL_METHOD_FFT, SPECTRAL_METHOD_IN_BAND_DFT, SPECTRAL_METHOD_SLIDING_DFT):
+            print(f"Peringatan: Metode spektral tidak dikenal: {spectral_method}. Menggunakan '{SPECTRAL_METHOD_FFT}'.")
+            spectral_method = SPECTRAL_METHOD_FFT
+        if spectral_method == SPECTRAL_METHOD_SLIDING_DFT and mode != PROCESSING_MODE_STREAMING:
+            # Sliding DFT butuh sampel terfilter satu per satu, hanya tersedia di mode streaming
+            print(f"Peringatan: sliding_dft butuh mode streaming. Menggunakan '{SPECTRAL_METHOD_FFT}'.")
+            spectral_method = SPECTRAL_METHOD_FFT
+        self.spectral_method = spectral_method
+        self.progressive = progressive
+        self.zero_pad_factor = max(1, int(zero_pad_factor))
+        self.peak_interpolation = peak_interpolation
+        self._dft_banks = {}  # Cache InBandDFT per (n, lowcut, highcut)
+        self.rppg_sdft = None
+        self.resp_sdft = None
+        if spectral_method == SPECTRAL_METHOD_SLIDING_DFT:
+            self.rppg_sdft = SlidingDFT(buffer_size, fs, RPPG_LOWCUT, RPPG_HIGHCUT)
+            self.resp_sdft = SlidingDFT(buffer_size, fs, RESP_LOWCUT, RESP_HIGHCUT)
+
+        if rppg_method not in (RPPG_METHOD_GREEN, RPPG_METHOD_POS, RPPG_METHOD_CHROM):
+            print(f"Peringatan: Metode rPPG tidak dikenal: {rppg_method}. Menggunakan '{RPPG_METHOD_GREEN}'.")
+            rppg_method = RPPG_METHOD_GREEN
+        self.rppg_method = rppg_method
+        self.rppg_projector = None
+        if rppg_method != RPPG_METHOD_GREEN:
+            # Window proyeksi diproses per hop estimasi; buffer rPPG lalu berisi sampel pulsa POS/CHROM
+            self.rppg_projector = RgbPulseProjector(rppg_method, fs, hop_samples=self.rppg_estimate.hop_samples,
+                                                    filter_bank=self.filter_bank)
+
+        self.rppg_resampler = UniformResampler(fs) if resample else None
+        self.resp_resampler = UniformResampler(fs) if resample else None
 
     def _butter_bandpass_filter(self, data, lowcut, highcut, order):
         """
-        Terapkan filter bandpass Butterworth pada data sinyal.
+        Terapkan filter bandpass Butterworth (SOS ter-cache, zero-phase) pada data sinyal.
 
         Args:
             data (list/np.array): Data sinyal input.
@@ -52,19 +730,13 @@ class SignalProcessor:
         if len(data) < order * 3:  # Cek data cukup panjang untuk filtering
             return np.array([])  # Return kosong jika tidak cukup
 
-        nyq = 0.5 * self.fs  # Frekuensi Nyquist
-        low = lowcut / nyq
-        high = highcut / nyq
-        
-        # Validasi batas cutoff normalisasi
-        if not (0 < low < 1 and 0 < high < 1 and low < high):
-            print(f"Peringatan filter: Batas frekuensi tidak valid (low: {low}, high: {high}).")
+        # Desain filter diambil dari cache, tidak didesain ulang setiap frame
+        band = self.filter_bank.get(self.fs, lowcut, highcut, order)
+        if band is None:
             return np.array(data)  # Return data asli jika cutoff tidak valid
 
         try:
-            b, a = butter(order, [low, high], btype='band')
-            y = filtfilt(b, a, data)  # Zero-phase filtering
-            return y
+            return band.filtfilt(data)  # Zero-phase filtering
         except ValueError as e:
             print(f"Error saat filtering ({lowcut}-{highcut} Hz): {e}. Return data asli.")
             return np.array(data)
@@ -80,133 +752,349 @@ class SignalProcessor:
         Returns:
             np.array: Sinyal yang sudah dihilangkan tren lambatnya (detrended).
         """
-        if len(signal_segment) == 0:
-            return np.array([])
-
-        window_samples = int(self.fs * window_seconds)
-        if window_samples < 3:  # Minimal 3 sampel window
-            window_samples = 3
-        
-        if len(signal_segment) >= window_samples:
-            # Moving average efisien dengan uniform_filter1d dan mode refleksi tepi
-            moving_avg = uniform_filter1d(signal_segment, size=window_samples, mode='reflect')
-            detrended_signal = signal_segment - moving_avg
+        return detrend_moving_average(signal_segment, self.fs * window_seconds)
+
+    def _append_filtered(self, filtered_buffer, sdft, filtered_value, timestamp):
+        # Tambah sampel terfilter ke trace, sekaligus geser sliding DFT jika aktif
+        was_full = filtered_buffer.is_full()
+        old_sample = filtered_buffer.view()[0] if (sdft is not None and was_full) else 0.0
+        filtered_buffer.append(filtered_value, timestamp)
+        if sdft is None or not filtered_buffer.is_full():
+            return
+        if not was_full or sdft.push(filtered_value, old_sample):
+            sdft.resync(filtered_buffer.view())
+
+    def _get_dft_bank(self, n, n_fft, lowcut, highcut):
+        key = (int(n), int(n_fft), lowcut, highcut)
+        if key not in self._dft_banks:
+            self._dft_banks[key] = InBandDFT(n, self.fs, lowcut, highcut, n_fft=n_fft)
+        return self._dft_banks[key]
+
+    def _window_ready(self, raw_buffer, min_window_seconds):
+        # Buffer penuh, atau (mode progresif) window yang tumbuh sudah cukup panjang
+        if raw_buffer.is_full():
+            return True
+        return self.progressive and len(raw_buffer) >= min_window_seconds * self.fs
+
+    def _estimate_rate(self, filtered_signal, lowcut, highcut, min_samples, sdft=None):
+        """
+        Cari frekuensi dominan dalam rentang [lowcut, highcut] lalu konversi ke
+        satuan per menit (BPM/RPM). Spektrum dihitung dengan metode `spectral_method`.
+
+        Args:
+            filtered_signal (np.array): Sinyal yang sudah difilter.
+            lowcut (float): Batas bawah rentang frekuensi (Hz).
+            highcut (float): Batas atas rentang frekuensi (Hz).
+            min_samples (float): Panjang minimal sinyal agar estimasi bermakna.
+            sdft (SlidingDFT, optional): Sliding DFT band terkait (metode sliding_dft).
+
+        Returns:
+            float: Estimasi laju per menit (dibulatkan 1 desimal), 0.0 jika gagal.
+        """
+        N = len(filtered_signal)
+        if N < min_samples:
+            return 0.0
+
+        # Window pendek di-zero-pad ke grid frekuensi yang sama dengan window penuh
+        n_fft = max(N, self.buffer_size * self.zero_pad_factor)
+
+        if self.spectral_method != SPECTRAL_METHOD_FFT:
+            # Hanya bin dalam band yang dihitung
+            if sdft is not None and sdft.ready and sdft.n == N and n_fft == N:
+                freqs, magnitudes = sdft.freqs, sdft.current_magnitudes()
+            else:
+                bank = self._get_dft_bank(N, n_fft, lowcut, highcut)
+                freqs, magnitudes = bank.freqs, bank.magnitudes(filtered_signal)
         else:
-            # Jika data pendek, buang rata-rata sederhana
-            detrended_signal = signal_segment - np.mean(signal_segment)
-        return detrended_signal
+            # Kernel FFT ter-vektorisasi yang sama dengan BatchSignalProcessor
+            dominant_freq = estimate_dominant_frequency(filtered_signal, self.fs, lowcut, highcut,
+                                                        n_fft=n_fft, peak_interpolation=self.peak_interpolation)
+            return round(float(dominant_freq) * 60, 1)  # Konversi Hz ke per menit
 
-    def process_rppg(self, roi_pixels_green_channel_mean):
+        if len(freqs) == 0:
+            return 0.0
+
+        peak_index = int(np.argmax(magnitudes))
+        if self.peak_interpolation:
+            dominant_freq = refine_peak_frequency(freqs, magnitudes, peak_index)
+        else:
+            dominant_freq = freqs[peak_index]
+
+        return round(float(dominant_freq) * 60, 1)  # Konversi Hz ke per menit
+
+    def process_rppg(self, roi_pixels_green_channel_mean, timestamp=None):
         """
         Proses sinyal rPPG dari channel hijau ROI:
         simpan, detrend, filter, FFT untuk estimasi BPM.
 
         Args:
             roi_pixels_green_channel_mean (float): Rata-rata intensitas hijau ROI frame terbaru.
+            timestamp (float, optional): Waktu pengambilan sampel, default time.monotonic().
 
         Returns:
             tuple: (filtered_rppg (np.array), estimated_bpm (float))
         """
-        self.rppg_raw_signal.append(roi_pixels_green_channel_mean)
-        if len(self.rppg_raw_signal) > self.buffer_size:
-            self.rppg_raw_signal.pop(0)
+        if self.rppg_resampler is None:
+            self._add_rppg_sample(roi_pixels_green_channel_mean, timestamp)
+            return self._update_rppg_estimate()
+        self.rppg_estimate.fresh = False  # Frame tanpa titik grid baru tidak menghasilkan estimasi baru
+        for value, grid_timestamp in self._resample(self.rppg_resampler, roi_pixels_green_channel_mean, timestamp):
+            self._add_rppg_sample(float(value), grid_timestamp)
+        return self._update_rppg_estimate()
+
+    def process_rppg_rgb(self, rgb_means, timestamp=None):
+        """
+        Proses rata-rata (R, G, B) ROI sesuai `rppg_method`: kanal hijau langsung ke
+        `process_rppg`, atau proyeksi POS/CHROM yang mengeluarkan sampel pulsa per hop.
 
-        if len(self.rppg_raw_signal) < self.buffer_size:
-            return np.array([]), 0.0  # Buffer belum penuh
+        Args:
+            rgb_means (tuple): Rata-rata (R, G, B) ROI frame terbaru.
+            timestamp (float, optional): Waktu pengambilan sampel, default time.monotonic().
 
-        current_rppg_segment = np.array(self.rppg_raw_signal)
+        Returns:
+            tuple: (filtered_rppg (np.array), estimated_bpm (float))
+        """
+        if self.rppg_projector is None:
+            return self.process_rppg(rgb_means[1], timestamp)
+        if timestamp is None:
+            timestamp = time.monotonic()
+        self.rppg_estimate.fresh = False  # Frame tanpa sampel pulsa final tidak menghasilkan estimasi baru
+        if self.rppg_resampler is None:
+            rgb_samples = [(rgb_means, timestamp)]
+        else:
+            rgb_samples = self._resample(self.rppg_resampler, rgb_means, timestamp)
+        for rgb, rgb_timestamp in rgb_samples:
+            with profiler.stage("rppg_projection"):
+                values, timestamps = self.rppg_projector.push(rgb, rgb_timestamp)
+            for value, sample_timestamp in zip(values, timestamps):
+                self._add_rppg_sample(value, sample_timestamp)
+        return self._update_rppg_estimate()
 
-        # Detrend sinyal dengan moving average ~2 detik window
-        detrended_rppg = self._detrend_with_moving_average(current_rppg_segment, window_seconds=2.0)
+    def _resample(self, resampler, value, timestamp):
+        # Sampel pada grid seragam untuk satu sampel masukan (bisa kosong atau beberapa)
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with profiler.stage("resample"):
+            return resampler.push(value, timestamp)
 
-        # Filter bandpass untuk rentang detak jantung
-        filtered_rppg = self._butter_bandpass_filter(detrended_rppg, RPPG_LOWCUT, RPPG_HIGHCUT, RPPG_FILTER_ORDER)
-        if len(filtered_rppg) == 0:
-            return current_rppg_segment, 0.0  # Jika gagal filter, return sinyal mentah
+    def _add_rppg_sample(self, value, timestamp):
+        self.rppg_raw_signal.append(value, timestamp)
+        if self.rppg_stream is not None:
+            # Mode streaming: satu sampel masuk -> satu sampel terfilter keluar (O(1))
+            self._append_filtered(self.rppg_filtered_signal, self.rppg_sdft,
+                                  self.rppg_stream.push(value), timestamp)
+        self.rppg_estimate.sample_added(self.rppg_raw_signal.last_timestamp())
 
-        # FFT untuk estimasi frekuensi dominan => BPM
-        N = len(filtered_rppg)
-        if N < self.fs:  # Minimal 1 detik data untuk FFT
-            return filtered_rppg, 0.0
-        
-        yf = fft(filtered_rppg)
-        xf = np.fft.fftfreq(N, 1.0/self.fs)[:N//2]  # Frekuensi positif
+    def _update_rppg_estimate(self):
+        # Detrend -> filter -> spektrum untuk buffer rPPG (jika window siap dan hop tiba)
+        if not self._window_ready(self.rppg_raw_signal, RPPG_MIN_WINDOW_SECONDS):
+            return np.array([]), 0.0  # Buffer belum penuh (atau window progresif belum cukup)
 
-        # Cari indeks frekuensi dalam rentang rPPG
-        valid_freq_indices = np.where((xf >= RPPG_LOWCUT) & (xf <= RPPG_HIGHCUT))[0]
-        
-        if len(valid_freq_indices) == 0:
-            return filtered_rppg, 0.0
+        if not self.rppg_estimate.is_due():
+            # Di antara hop: kembalikan estimasi terakhir tanpa menjalankan DSP
+            return self._trace_between_hops(self.rppg_estimate, self.rppg_filtered_signal, self.rppg_stream)
 
-        abs_yf = np.abs(yf[valid_freq_indices])
-        if len(abs_yf) == 0:
-            return filtered_rppg, 0.0
+        if self.rppg_stream is not None:
+            filtered_rppg = self.rppg_filtered_signal.view()
+        else:
+            current_rppg_segment = self.rppg_raw_signal.view()  # View kontigu tanpa copy
 
-        dominant_freq_index_in_subset = np.argmax(abs_yf)
-        dominant_freq = xf[valid_freq_indices[dominant_freq_index_in_subset]]
+            # Detrend sinyal dengan moving average ~2 detik window
+            with profiler.stage("rppg_detrend"):
+                detrended_rppg = self._detrend_with_moving_average(current_rppg_segment, window_seconds=RPPG_DETREND_SECONDS)
 
-        bpm = dominant_freq * 60  # Konversi Hz ke BPM
-        bpm = round(bpm, 1)
+            # Filter bandpass untuk rentang detak jantung
+            with profiler.stage("rppg_filter"):
+                filtered_rppg = self._butter_bandpass_filter(detrended_rppg, RPPG_LOWCUT, RPPG_HIGHCUT, RPPG_FILTER_ORDER)
+            if len(filtered_rppg) == 0:
+                self.rppg_estimate.record(0.0, np.array(current_rppg_segment))
+                return current_rppg_segment, 0.0  # Jika gagal filter, return sinyal mentah
 
+        # FFT untuk estimasi frekuensi dominan => BPM, minimal 1 detik data
+        with profiler.stage("rppg_spectrum"):
+            bpm = self._estimate_rate(filtered_rppg, RPPG_LOWCUT, RPPG_HIGHCUT, min_samples=self.fs, sdft=self.rppg_sdft)
+        self.rppg_estimate.record(bpm, filtered_rppg, provisional=not self.rppg_raw_signal.is_full())
         return filtered_rppg, bpm
 
-    def process_respiration(self, raw_motion_signal_value):
+    def process_respiration(self, raw_motion_signal_value, timestamp=None):
         """
         Proses sinyal pernapasan (gerakan):
         simpan, detrend dengan window lebih panjang, filter, FFT untuk RPM.
 
         Args:
-            raw_motion_signal_value (float): Sinyal mentah pernapasan frame terbaru.
+            raw_motion_signal_value (float): Sinyal mentah pernapasan frame terbaru; None jika
+                                             frame ini tidak punya sampel (model pose dilewati).
+            timestamp (float, optional): Waktu pengambilan sampel, default time.monotonic().
 
         Returns:
             tuple: (filtered_resp (np.array), estimated_rpm (float))
         """
-        self.resp_raw_signal.append(raw_motion_signal_value)
-        if len(self.resp_raw_signal) > self.buffer_size:
-            self.resp_raw_signal.pop(0)
+        if raw_motion_signal_value is None:
+            self.resp_estimate.fresh = False
+        elif self.resp_resampler is None:
+            self._add_resp_sample(raw_motion_signal_value, timestamp)
+        else:
+            self.resp_estimate.fresh = False
+            for value, grid_timestamp in self._resample(self.resp_resampler, raw_motion_signal_value, timestamp):
+                self._add_resp_sample(float(value), grid_timestamp)
+        return self._update_resp_estimate()
+
+    def _add_resp_sample(self, value, timestamp):
+        self.resp_raw_signal.append(value, timestamp)
+        if self.resp_stream is not None:
+            self._append_filtered(self.resp_filtered_signal, self.resp_sdft,
+                                  self.resp_stream.push(value), timestamp)
+        self.resp_estimate.sample_added(self.resp_raw_signal.last_timestamp())
 
-        if len(self.resp_raw_signal) < self.buffer_size:
+    def _update_resp_estimate(self):
+        # Detrend -> filter -> spektrum untuk buffer respirasi (jika window siap dan hop tiba)
+        if not self._window_ready(self.resp_raw_signal, RESP_MIN_WINDOW_SECONDS):
             return np.array([]), 0.0
 
-        current_resp_segment = np.array(self.resp_raw_signal)
-
-        # Detrend dengan moving average ~10 detik window (drift postur dihilangkan)
-        detrended_resp = self._detrend_with_moving_average(current_resp_segment, window_seconds=10.0)
-        
-        # Filter bandpass respirasi
-        filtered_resp = self._butter_bandpass_filter(detrended_resp, RESP_LOWCUT, RESP_HIGHCUT, RESP_FILTER_ORDER)
-        if len(filtered_resp) == 0:
-            return current_resp_segment, 0.0
-
-        # FFT untuk frekuensi dominan respirasi (RPM)
-        N = len(filtered_resp)
-        if N < self.fs * 2:  # Butuh cukup panjang untuk frekuensi rendah (2 periode)
-            return filtered_resp, 0.0
-            
-        yf = fft(filtered_resp)
-        xf = np.fft.fftfreq(N, 1.0/self.fs)[:N//2]
-
-        valid_freq_indices = np.where((xf >= RESP_LOWCUT) & (xf <= RESP_HIGHCUT))[0]
-        
-        if len(valid_freq_indices) == 0:
-            return filtered_resp, 0.0
-
-        abs_yf = np.abs(yf[valid_freq_indices])
-        if len(abs_yf) == 0:
-            return filtered_resp, 0.0
-            
-        dominant_freq_index_in_subset = np.argmax(abs_yf)
-        dominant_freq = xf[valid_freq_indices[dominant_freq_index_in_subset]]
-        
-        rpm = dominant_freq * 60  # Konversi Hz ke RPM
-        rpm = round(rpm, 1)
+        if not self.resp_estimate.is_due():
+            return self._trace_between_hops(self.resp_estimate, self.resp_filtered_signal, self.resp_stream)
+
+        if self.resp_stream is not None:
+            filtered_resp = self.resp_filtered_signal.view()
+        else:
+            current_resp_segment = self.resp_raw_signal.view()
 
+            # Detrend dengan moving average ~10 detik window (drift postur dihilangkan)
+            with profiler.stage("resp_detrend"):
+                detrended_resp = self._detrend_with_moving_average(current_resp_segment, window_seconds=RESP_DETREND_SECONDS)
+
+            # Filter bandpass respirasi
+            with profiler.stage("resp_filter"):
+                filtered_resp = self._butter_bandpass_filter(detrended_resp, RESP_LOWCUT, RESP_HIGHCUT, RESP_FILTER_ORDER)
+            if len(filtered_resp) == 0:
+                self.resp_estimate.record(0.0, np.array(current_resp_segment))
+                return current_resp_segment, 0.0
+
+        # FFT untuk frekuensi dominan respirasi (RPM), butuh >= 2 detik untuk frekuensi rendah
+        with profiler.stage("resp_spectrum"):
+            rpm = self._estimate_rate(filtered_resp, RESP_LOWCUT, RESP_HIGHCUT, min_samples=self.fs * 2, sdft=self.resp_sdft)
+        self.resp_estimate.record(rpm, filtered_resp, provisional=not self.resp_raw_signal.is_full())
         return filtered_resp, rpm
 
+    def _trace_between_hops(self, schedule, filtered_buffer, stream):
+        # Mode streaming punya trace terfilter yang selalu baru; mode blok memakai hasil hop terakhir
+        if stream is not None:
+            return filtered_buffer.view(), schedule.last_value
+        return schedule.last_filtered, schedule.last_value
+
+    def get_last_estimates(self):
+        """
+        Estimasi terakhir beserta umurnya, untuk ditampilkan di GUI.
+
+        Returns:
+            dict: {'bpm', 'bpm_age', 'bpm_provisional', 'rpm', 'rpm_age', 'rpm_provisional'};
+                  umur dalam detik atau None.
+        """
+        return {
+            "bpm": self.rppg_estimate.last_value,
+            "bpm_age": self.rppg_estimate.age(),
+            "bpm_provisional": self.rppg_estimate.provisional,
+            "rpm": self.resp_estimate.last_value,
+            "rpm_age": self.resp_estimate.age(),
+            "rpm_provisional": self.resp_estimate.provisional,
+        }
+
     def get_raw_rppg_signal_for_plot(self):
-        # Return buffer sinyal rPPG mentah untuk plotting
-        return np.array(self.rppg_raw_signal)
+        # Return view read-only buffer sinyal rPPG mentah untuk plotting (tanpa copy)
+        return self.rppg_raw_signal.view()
 
     def get_raw_resp_signal_for_plot(self):
-        # Return buffer sinyal respirasi mentah untuk plotting
-        return np.array(self.resp_raw_signal)
+        # Return view read-only buffer sinyal respirasi mentah untuk plotting (tanpa copy)
+        return self.resp_raw_signal.view()
+
+class BatchSignalProcessor:
+    def __init__(self, n_streams, fs, buffer_size=SIGNAL_BUFFER_SIZE, filter_bank=None,
+                 rppg_hop_seconds=0.0, resp_hop_seconds=0.0, zero_pad_factor=1, peak_interpolation=False):
+        """
+        Pemroses sinyal untuk banyak feed/subjek sekaligus. Buffer disimpan sebagai
+        satu array (buffer x n_streams), lalu detrend, filter bandpass dan pencarian
+        puncak FFT dijalankan untuk semua stream dalam satu panggilan ter-vektorisasi
+        (axis=-1), bukan satu objek Python dan satu panggilan scipy per stream.
+
+        Args:
+            n_streams (int): Jumlah stream yang diproses bersamaan.
+            fs (float): Frekuensi sampling (sama untuk semua stream).
+            buffer_size (int): Ukuran buffer sinyal per stream.
+            filter_bank (FilterBank, optional): Cache desain filter, default filter bank bersama.
+            rppg_hop_seconds (float): Interval estimasi BPM (detik), 0 = setiap frame.
+            resp_hop_seconds (float): Interval estimasi RPM (detik), 0 = setiap frame.
+            zero_pad_factor (int): Panjang FFT = buffer_size * faktor ini.
+            peak_interpolation (bool): Perhalus puncak dengan interpolasi parabola.
+        """
+        if fs <= 0:
+            print(f"Peringatan: Frekuensi sampling (fs) tidak valid: {fs}. Menggunakan fs=30.0 sebagai default.")
+            fs = 30.0
+        self.n_streams = int(n_streams)
+        self.fs = fs
+        self.buffer_size = buffer_size
+        self.filter_bank = filter_bank if filter_bank is not None else _shared_filter_bank
+        self.zero_pad_factor = max(1, int(zero_pad_factor))
+        self.peak_interpolation = peak_interpolation
+
+        self.rppg_raw_signal = RingBuffer(buffer_size, shape=(self.n_streams,))
+        self.resp_raw_signal = RingBuffer(buffer_size, shape=(self.n_streams,))
+        self.rppg_estimate = EstimationSchedule(fs, rppg_hop_seconds)
+        self.resp_estimate = EstimationSchedule(fs, resp_hop_seconds)
+
+    def _process_band(self, raw_buffer, schedule, values, timestamp, lowcut, highcut, order,
+                      detrend_seconds, min_samples):
+        raw_buffer.append(values, timestamp)
+        schedule.sample_added(raw_buffer.last_timestamp())
+
+        empty_rates = np.zeros(self.n_streams)
+        if not raw_buffer.is_full():
+            return np.empty((self.n_streams, 0)), empty_rates
+        if not schedule.is_due():
+            return schedule.last_filtered, schedule.last_value
+
+        # (buffer, n_streams) -> (n_streams, buffer) agar semua operasi berjalan di axis=-1
+        segments = raw_buffer.view().T
+        detrended = detrend_moving_average(segments, self.fs * detrend_seconds)
+
+        band = self.filter_bank.get(self.fs, lowcut, highcut, order)
+        if band is None or segments.shape[-1] < min_samples:
+            schedule.record(empty_rates, detrended)
+            return detrended, empty_rates
+        filtered = band.filtfilt(detrended)
+
+        n_fft = max(filtered.shape[-1], self.buffer_size * self.zero_pad_factor)
+        dominant_freqs = estimate_dominant_frequency(filtered, self.fs, lowcut, highcut,
+                                                     n_fft=n_fft, peak_interpolation=self.peak_interpolation)
+        rates = np.round(dominant_freqs * 60, 1)
+        schedule.record(rates, filtered)
+        return filtered, rates
+
+    def process_rppg(self, green_channel_means, timestamp=None):
+        """
+        Proses satu sampel rPPG untuk setiap stream.
+
+        Args:
+            green_channel_means (array-like): Rata-rata hijau ROI per stream, bentuk (n_streams,).
+            timestamp (float, optional): Waktu pengambilan sampel, default time.monotonic().
+
+        Returns:
+            tuple: (filtered_rppg (n_streams, N), estimated_bpm (n_streams,))
+        """
+        return self._process_band(self.rppg_raw_signal, self.rppg_estimate, green_channel_means, timestamp,
+                                  RPPG_LOWCUT, RPPG_HIGHCUT, RPPG_FILTER_ORDER,
+                                  RPPG_DETREND_SECONDS, min_samples=self.fs)
+
+    def process_respiration(self, raw_motion_signal_values, timestamp=None):
+        """
+        Proses satu sampel sinyal pernapasan untuk setiap stream.
+
+        Args:
+            raw_motion_signal_values (array-like): Sinyal gerakan per stream, bentuk (n_streams,).
+            timestamp (float, optional): Waktu pengambilan sampel, default time.monotonic().
+
+        Returns:
+            tuple: (filtered_resp (n_streams, N), estimated_rpm (n_streams,))
+        """
+        return self._process_band(self.resp_raw_signal, self.resp_estimate, raw_motion_signal_values, timestamp,
+                                  RESP_LOWCUT, RESP_HIGHCUT, RESP_FILTER_ORDER,
+                                  RESP_DETREND_SECONDS, min_samples=self.fs * 2)
@@ -0,0 +1,139 @@
+# synthetic_signals.py
+import numpy as np
+
+# Skenario uji standar: noise, drift dan artefak gerakan dengan tingkat kesulitan bertahap
+SCENARIOS = {
+    "clean":  {"noise_std": 0.05, "drift_per_second": 0.0,  "motion_artifacts_per_minute": 0.0},
+    "noisy":  {"noise_std": 0.5,  "drift_per_second": 0.0,  "motion_artifacts_per_minute": 0.0},
+    "drift":  {"noise_std": 0.2,  "drift_per_second": 0.05, "motion_artifacts_per_minute": 0.0},
+    "motion": {"noise_std": 0.2,  "drift_per_second": 0.02, "motion_artifacts_per_minute": 6.0},
+}
+
+MOTION_ARTIFACT_SECONDS = 0.6  # Durasi satu artefak gerakan (lonjakan + pergeseran baseline)
+
+def sample_timestamps(fs, seconds, jitter=0.0, seed=0, drop_fraction=0.0):
+    """
+    Timestamp pengambilan sampel dengan jitter dan frame yang dilewati (frame kamera tidak
+    pernah tepat 1/fs, dan loop yang sibuk membuang frame).
+
+    Args:
+        fs (float): Frekuensi sampling nominal (Hz).
+        seconds (float): Durasi sinyal (detik).
+        jitter (float): Deviasi standar jitter sebagai pecahan periode sampling (0 = seragam).
+        seed (int): Seed generator acak.
+        drop_fraction (float): Pecahan frame yang dibuang secara acak (0..1).
+
+    Returns:
+        np.array: Timestamp naik monoton (detik), panjang int(fs * seconds) dikurangi frame yang dibuang.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(fs * seconds)) / fs
+    if jitter > 0:
+        t = t + np.clip(rng.normal(0.0, jitter / fs, len(t)), -0.45 / fs, 0.45 / fs)
+    if drop_fraction > 0:
+        keep = rng.random(len(t)) >= drop_fraction
+        keep[0] = True
+        t = t[keep]
+    return t
+
+def motion_artifacts(t, per_minute, amplitude, seed=0):
+    """
+    Artefak gerakan: lonjakan berbentuk Hann pada posisi acak, masing-masing meninggalkan
+    pergeseran baseline kecil (kepala/badan tidak kembali tepat ke posisi semula).
+
+    Args:
+        t (np.array): Timestamp sampel (detik).
+        per_minute (float): Rata-rata jumlah artefak per menit.
+        amplitude (float): Amplitudo puncak lonjakan.
+        seed (int): Seed generator acak.
+
+    Returns:
+        np.array: Komponen artefak, bentuk sama dengan `t`.
+    """
+    artifacts = np.zeros(len(t))
+    duration = t[-1] - t[0] if len(t) > 1 else 0.0
+    count = int(round(per_minute * duration / 60.0))
+    if count == 0:
+        return artifacts
+    rng = np.random.default_rng(seed + 1)
+    for onset in rng.uniform(t[0], t[-1], count):
+        phase = (t - onset) / MOTION_ARTIFACT_SECONDS
+        inside = (phase >= 0) & (phase < 1)
+        artifacts[inside] += amplitude * rng.choice([-1.0, 1.0]) * np.sin(np.pi * phase[inside]) ** 2
+        artifacts[phase >= 1] += 0.2 * amplitude * rng.standard_normal()
+    return artifacts
+
+def synthetic_trace(fs, seconds, rate_per_minute, seed=0, noise_std=0.3, drift_per_second=0.05,
+                    motion_artifacts_per_minute=0.0, artifact_amplitude=3.0, harmonic_ratio=0.0,
+                    timestamps=None):
+    """
+    Sinusoida berfrekuensi diketahui + drift linear + noise Gaussian + artefak gerakan.
+
+    Args:
+        fs (float): Frekuensi sampling (Hz).
+        seconds (float): Durasi sinyal (detik).
+        rate_per_minute (float): Laju sebenarnya (BPM atau RPM).
+        seed (int): Seed generator acak.
+        noise_std (float): Deviasi standar noise relatif terhadap amplitudo sinyal (1.0).
+        drift_per_second (float): Kemiringan drift baseline per detik.
+        motion_artifacts_per_minute (float): Rata-rata jumlah artefak gerakan per menit.
+        artifact_amplitude (float): Amplitudo artefak relatif terhadap amplitudo sinyal.
+        harmonic_ratio (float): Amplitudo harmonik kedua (bentuk gelombang pulsa lebih realistis).
+        timestamps (np.array, optional): Timestamp sampel; default seragam 1/fs.
+
+    Returns:
+        np.array: Sinyal 1-D.
+    """
+    rng = np.random.default_rng(seed)
+    t = sample_timestamps(fs, seconds) if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+    omega = 2 * np.pi * rate_per_minute / 60.0
+    signal = np.sin(omega * t) + harmonic_ratio * np.sin(2 * omega * t + 0.5)
+    signal += drift_per_second * t + noise_std * rng.standard_normal(len(t))
+    if motion_artifacts_per_minute > 0:
+        signal += motion_artifacts(t, motion_artifacts_per_minute, artifact_amplitude, seed)
+    return signal
+
+def synthetic_rppg_trace(fs, seconds, bpm, scenario="clean", seed=0, timestamps=None):
+    """
+    Trace rata-rata kanal hijau ROI wajah: baseline ~120, pulsa kecil (amplitudo 0.5) dengan harmonik.
+
+    Returns:
+        np.array: Sinyal 1-D.
+    """
+    options = SCENARIOS[scenario]
+    pulse = synthetic_trace(fs, seconds, bpm, seed=seed, harmonic_ratio=0.3, timestamps=timestamps, **options)
+    return 120.0 + 0.5 * pulse
+
+def synthetic_respiration_trace(fs, seconds, rpm, scenario="clean", seed=0, timestamps=None):
+    """
+    Trace gerakan bahu (koordinat y ternormalisasi): baseline ~0.5, amplitudo napas 0.005.
+
+    Returns:
+        np.array: Sinyal 1-D.
+    """
+    options = SCENARIOS[scenario]
+    breathing = synthetic_trace(fs, seconds, rpm, seed=seed, timestamps=timestamps, **options)
+    return 0.5 + 0.005 * breathing
+
+def synthetic_rgb_trace(fs, seconds, bpm, scenario="clean", seed=0, timestamps=None):
+    """
+    Rata-rata (R, G, B) ROI kulit: pulsa paling kuat di kanal hijau, sedangkan drift dan
+    artefak (perubahan pencahayaan/gerakan) mengalikan ketiga kanal bersama-sama, sehingga
+    metode POS/CHROM dapat dibandingkan dengan kanal hijau saja.
+
+    Returns:
+        np.array: Bentuk (n, 3).
+    """
+    options = dict(SCENARIOS[scenario])
+    t = sample_timestamps(fs, seconds) if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+    pulse = synthetic_trace(fs, seconds, bpm, seed=seed, noise_std=0.0, drift_per_second=0.0,
+                            harmonic_ratio=0.3, timestamps=t)
+    illumination = 1.0 + synthetic_trace(fs, seconds, 0.0, seed=seed + 7, noise_std=0.0,
+                                         drift_per_second=0.01 * options["drift_per_second"],
+                                         motion_artifacts_per_minute=options["motion_artifacts_per_minute"],
+                                         artifact_amplitude=0.03, timestamps=t)
+    skin_tone = np.array([180.0, 120.0, 90.0])
+    pulse_strength = np.array([0.33, 0.77, 0.53]) * 0.004  # Kontribusi pulsa relatif per kanal
+    rng = np.random.default_rng(seed + 13)
+    noise = options["noise_std"] * 0.5 * rng.standard_normal((len(t), 3))
+    return skin_tone * illumination[:, None] * (1.0 + pulse_strength * pulse[:, None]) + noise
@@ -56,6 +56,245 @@ class FaceDetectorMP:
         if self.face_detection:
             self.face_detection.close()
 
+class TrackedFaceDetector:
+    def __init__(self, detector=None, detect_interval=10, min_track_confidence=0.6,
+                 smoothing=0.5, search_margin=0.5, template_width=32, **detector_options):
+        """
+        Deteksi wajah dengan pola detect-then-track: BlazeFace (FaceDetectorMP) hanya
+        dijalankan setiap `detect_interval` frame, di antaranya bounding box diikuti
+        dengan template matching murah pada citra grayscale yang diperkecil.
+        Deteksi ulang juga dipaksa bila confidence tracker turun di bawah ambang.
+
+        Args:
+            detector (FaceDetectorMP, optional): Detektor yang dipakai, default dibuat baru.
+            detect_interval (int): Jumlah frame maksimum antar deteksi penuh.
+            min_track_confidence (float): Skor template matching minimum (TM_CCOEFF_NORMED)
+                                          agar hasil tracking diterima.
+            smoothing (float): Bobot bbox sebelumnya pada smoothing eksponensial (0 = tanpa smoothing).
+            search_margin (float): Perluasan area pencarian relatif terhadap ukuran bbox.
+            template_width (int): Lebar template (piksel) setelah diperkecil.
+            **detector_options: Diteruskan ke FaceDetectorMP jika `detector` tidak diberikan.
+        """
+        self.detector = detector if detector is not None else FaceDetectorMP(**detector_options)
+        self.detect_interval = max(1, int(detect_interval))
+        self.min_track_confidence = min_track_confidence
+        self.smoothing = smoothing
+        self.search_margin = search_margin
+        self.template_width = template_width
+        self.reset()
+
+    def reset(self):
+        """Lupakan wajah yang sedang diikuti dan nolkan statistik."""
+        self._bbox = None        # Posisi mentah terakhir (x, y, w, h)
+        self._smoothed = None    # Bbox setelah smoothing (float)
+        self._template = None
+        self._scale = 1.0
+        self._frames_since_detection = 0
+        self.last_confidence = 0.0
+        self.detections = 0      # Jumlah pemanggilan detektor penuh
+        self.detector_misses = 0 # Deteksi penuh yang tidak menemukan wajah
+        self.track_hits = 0      # Frame yang berhasil diikuti tracker
+        self.track_misses = 0    # Tracker gagal sehingga deteksi ulang dipaksa
+
+    def _set_template(self, frame_rgb, bbox):
+        x, y, w, h = bbox
+        self._scale = self.template_width / float(w)
+        size = (self.template_width, max(1, int(round(h * self._scale))))
+        # Grayscale hanya pada potongan yang sudah diperkecil, bukan seluruh frame
+        small = cv2.resize(frame_rgb[y:y + h, x:x + w], size, interpolation=cv2.INTER_AREA)
+        self._template = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+
+    def _track(self, frame_rgb):
+        # Cari template di sekitar posisi terakhir, pada skala template
+        x, y, w, h = self._bbox
+        ih, iw = frame_rgb.shape[:2]
+        mx, my = int(w * self.search_margin), int(h * self.search_margin)
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(iw, x + w + mx), min(ih, y + h + my)
+        sw, sh = int((x1 - x0) * self._scale), int((y1 - y0) * self._scale)
+        th, tw = self._template.shape[:2]
+        if sw < tw or sh < th:
+            return None, 0.0
+        search = cv2.resize(frame_rgb[y0:y1, x0:x1], (sw, sh), interpolation=cv2.INTER_AREA)
+        search = cv2.cvtColor(search, cv2.COLOR_RGB2GRAY)
+        scores = cv2.matchTemplate(search, self._template, cv2.TM_CCOEFF_NORMED)
+        _, confidence, _, (lx, ly) = cv2.minMaxLoc(scores)
+        nx = min(max(0, x0 + int(round(lx / self._scale))), iw - w)
+        ny = min(max(0, y0 + int(round(ly / self._scale))), ih - h)
+        return (nx, ny, w, h), confidence
+
+    def _smooth(self, bbox):
+        bbox = np.asarray(bbox, dtype=np.float64)
+        if self._smoothed is None or self.smoothing <= 0:
+            self._smoothed = bbox
+        else:
+            self._smoothed = self.smoothing * self._smoothed + (1.0 - self.smoothing) * bbox
+        x, y, w, h = (int(round(v)) for v in self._smoothed)
+        return x, y, w, h
+
+    def detect_face_bounding_box(self, frame_rgb):
+        """
+        Sama seperti FaceDetectorMP.detect_face_bounding_box, tetapi detektor penuh
+        hanya dijalankan saat jadwal deteksi tiba atau tracker kehilangan wajah.
+
+        Args:
+            frame_rgb (np.array): Frame gambar dalam format RGB.
+
+        Returns:
+            tuple: (x, y, w, h) bounding box wajah (sudah dihaluskan), atau None.
+        """
+        if self._bbox is not None and self._frames_since_detection < self.detect_interval:
+            tracked, confidence = self._track(frame_rgb)
+            self.last_confidence = confidence
+            if tracked is not None and confidence >= self.min_track_confidence:
+                self.track_hits += 1
+                self._frames_since_detection += 1
+                self._bbox = tracked
+                return self._smooth(tracked)
+            self.track_misses += 1
+
+        bbox = self.detector.detect_face_bounding_box(frame_rgb)
+        self.detections += 1
+        self._frames_since_detection = 1
+        if bbox is None:
+            self.detector_misses += 1
+            self._bbox = None
+            self._smoothed = None
+            return None
+        self._bbox = bbox
+        self._set_template(frame_rgb, bbox)
+        self.last_confidence = 1.0
+        return self._smooth(bbox)
+
+    def get_stats(self):
+        """
+        Statistik tracking.
+
+        Returns:
+            dict: 'detections', 'detector_misses', 'track_hits', 'track_misses' dan
+                  'detection_ratio' (bagian frame yang menjalankan detektor penuh).
+        """
+        frames = self.detections + self.track_hits
+        return {
+            "detections": self.detections,
+            "detector_misses": self.detector_misses,
+            "track_hits": self.track_hits,
+            "track_misses": self.track_misses,
+            "detection_ratio": self.detections / frames if frames else 0.0,
+        }
+
+    def close(self):
+        """Melepaskan resource detektor wajah."""
+        self.detector.close()
+
+# Sub-ROI relatif terhadap bounding box wajah: (x0, y0, x1, y1) dalam pecahan lebar/tinggi bbox
+FACE_SUB_REGIONS = {
+    "face": (0.0, 0.0, 1.0, 1.0),
+    "forehead": (0.25, 0.05, 0.75, 0.25),
+    "left_cheek": (0.15, 0.45, 0.40, 0.70),
+    "right_cheek": (0.60, 0.45, 0.85, 0.70),
+}
+
+class RoiColorStats:
+    def __init__(self, regions=None):
+        """
+        Rata-rata warna per kanal untuk beberapa sub-ROI wajah dalam satu kali lintasan.
+
+        Integral image (cv2.integral) dihitung sekali pada potongan wajah, lalu rata-rata
+        setiap sub-ROI didapat dari empat titik integral tanpa membaca ulang piksel.
+
+        Args:
+            regions (dict, optional): {nama: (x0, y0, x1, y1)} pecahan bbox wajah,
+                                      default FACE_SUB_REGIONS.
+        """
+        regions = FACE_SUB_REGIONS if regions is None else regions
+        self.names = list(regions)
+        self._fractions = np.array([regions[name] for name in self.names], dtype=np.float64)
+        self._values = np.zeros((len(self.names), 3), dtype=np.float64)
+
+    def index(self, name):
+        """Indeks baris untuk sub-ROI `name` pada array hasil `compute`."""
+        return self.names.index(name)
+
+    def compute(self, frame_bgr, face_bbox):
+        """
+        Hitung rata-rata R, G, B untuk setiap sub-ROI.
+
+        Args:
+            frame_bgr (np.array): Frame resolusi penuh dalam format BGR.
+            face_bbox (tuple): (x, y, w, h) wajah, atau None.
+
+        Returns:
+            tuple: (values, face_found)
+                - values (np.array): Array (n_roi, 3) berurutan R, G, B per baris. Jika wajah tidak
+                  ada, semua baris berisi rata-rata seluruh frame (fallback).
+                - face_found (bool): True jika rata-rata berasal dari ROI wajah.
+        """
+        crop = get_roi_pixels(frame_bgr, face_bbox)
+        if crop.size == 0 or crop.ndim != 3:
+            # Fallback seluruh frame hanya dihitung jika tidak ada wajah (satu lintasan cv2.mean)
+            b, g, r, _ = cv2.mean(frame_bgr)
+            self._values[:] = (r, g, b)
+            return self._values.copy(), False
+
+        h, w = crop.shape[:2]
+        integral = cv2.integral(crop, sdepth=cv2.CV_64F)  # (h + 1, w + 1, 3), kanal B, G, R
+        x0 = np.floor(self._fractions[:, 0] * w).astype(int)
+        y0 = np.floor(self._fractions[:, 1] * h).astype(int)
+        x1 = np.maximum(np.ceil(self._fractions[:, 2] * w).astype(int), x0 + 1).clip(max=w)
+        y1 = np.maximum(np.ceil(self._fractions[:, 3] * h).astype(int), y0 + 1).clip(max=h)
+        x0, y0 = np.minimum(x0, x1 - 1), np.minimum(y0, y1 - 1)
+        sums = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+        areas = ((x1 - x0) * (y1 - y0)).astype(np.float64)
+        self._values[:] = sums[:, ::-1] / areas[:, None]  # BGR -> RGB
+        return self._values.copy(), True
+
+def downscale_for_inference(frame_bgr, inference_width):
+    """
+    Perkecil frame BGR untuk inferensi model lalu konversi ke RGB (sekali per frame).
+
+    Args:
+        frame_bgr (np.array): Frame resolusi penuh dalam format BGR.
+        inference_width (int): Lebar target; None/0 atau >= lebar frame = tanpa resize.
+
+    Returns:
+        tuple: (frame_rgb, scale) dengan scale = lebar penuh / lebar inferensi.
+    """
+    h, w = frame_bgr.shape[:2]
+    if not inference_width or w <= inference_width:
+        return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB), 1.0
+    scale = w / float(inference_width)
+    size = (int(inference_width), max(1, int(round(h / scale))))
+    # Resize dulu agar konversi warna hanya dilakukan pada piksel yang lebih sedikit.
+    # INTER_LINEAR jauh lebih murah dari INTER_AREA dan cukup untuk input model deteksi.
+    small_bgr = cv2.resize(frame_bgr, size, interpolation=cv2.INTER_LINEAR)
+    return cv2.cvtColor(small_bgr, cv2.COLOR_BGR2RGB), scale
+
+def scale_bounding_box(bbox, scale, frame_shape):
+    """
+    Petakan bounding box dari koordinat frame inferensi ke frame resolusi penuh.
+
+    Args:
+        bbox (tuple): (x, y, w, h) pada frame inferensi, atau None.
+        scale (float): Faktor skala (lebar penuh / lebar inferensi).
+        frame_shape (tuple): Shape frame resolusi penuh.
+
+    Returns:
+        tuple: (x, y, w, h) pada frame penuh (dibatasi ke dalam frame), atau None.
+    """
+    if bbox is None:
+        return None
+    if scale == 1.0:
+        return bbox
+    frame_h, frame_w = frame_shape[:2]
+    x, y = int(round(bbox[0] * scale)), int(round(bbox[1] * scale))
+    w, h = int(round(bbox[2] * scale)), int(round(bbox[3] * scale))
+    x, y = max(0, min(x, frame_w - 1)), max(0, min(y, frame_h - 1))
+    w, h = min(w, frame_w - x), min(h, frame_h - y)
+    if w <= 0 or h <= 0:
+        return None
+    return x, y, w, h
+
 def get_roi_pixels(frame, roi_coords_tuple):
     """
     Ekstrak piksel ROI dari frame berdasarkan koordinat bounding box.
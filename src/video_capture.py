@@ -1,26 +1,103 @@
 # video_capture.py
+import os
+import threading
+import time
 import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
 
 class VideoCapture:
-    def __init__(self, device_id=0):
+    def __init__(self, device_id=0, threaded=False, fourcc=None, width=None, height=None,
+                 driver_buffer_size=None):
         """
         Inisialisasi penangkap video dari perangkat kamera.
 
         Args:
             device_id (int): ID kamera (biasanya 0 untuk kamera bawaan/default).
+            threaded (bool): Jalankan thread grabber di background yang selalu menyimpan
+                             hanya frame terbaru, sehingga pemrosesan tidak tertinggal
+                             oleh frame basi yang mengantre di driver.
+            fourcc (str, optional): Kode format kamera, misal "MJPG".
+            width (int, optional): Lebar frame yang diminta dari kamera.
+            height (int, optional): Tinggi frame yang diminta dari kamera.
+            driver_buffer_size (int, optional): Jumlah buffer driver (1 = latensi minimal).
         """
         self.cap = cv2.VideoCapture(device_id)  # Buka stream video dari kamera
         if not self.cap.isOpened():
             raise IOError("Tidak dapat membuka kamera.")  # Error jika kamera gagal dibuka
-        
+
+        # Terapkan pengaturan kamera sebelum membaca frame (tidak semua driver mendukung)
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if driver_buffer_size:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, driver_buffer_size)
+
         # Ambil resolusi frame kamera
         self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        
+
         # Ambil FPS kamera (frame per detik)
         self.fps = self.cap.get(cv2.CAP_PROP_FPS)
         print(f"Kamera dibuka: {self.width}x{self.height} @ {self.fps} FPS")
 
+        self.sequence = 0        # Nomor urut frame yang sudah ditangkap
+        self.dropped_frames = 0  # Frame yang tertimpa sebelum sempat diambil pemrosesan
+        self.is_live = True      # Sumber kamera langsung
+        self.realtime = True     # Loop pemrosesan tetap dibatasi ke laju target
+
+        self.threaded = threaded
+        self._grabber_thread = None
+        if threaded:
+            self._condition = threading.Condition()
+            self._latest = (False, None, 0.0, 0)  # (ret, frame, timestamp, sequence)
+            self._latest_consumed = True
+            self._running = True
+            self._grabber_thread = threading.Thread(target=self._grab_loop, daemon=True)
+            self._grabber_thread.start()
+
+    def _grab_loop(self):
+        # Baca kamera secepat mungkin dan simpan hanya frame terbaru
+        while self._running:
+            ret, frame = self.cap.read()
+            timestamp = time.monotonic()
+            with self._condition:
+                self.sequence += 1
+                if not self._latest_consumed:
+                    self.dropped_frames += 1
+                self._latest = (ret, frame, timestamp, self.sequence)
+                self._latest_consumed = False
+                self._condition.notify_all()
+            if not ret:
+                break  # Kamera terputus, pembaca akan menerima ret=False
+
+    def get_timed_frame(self, timeout=1.0):
+        """
+        Membaca frame terbaru beserta timestamp monotonic dan nomor urutnya.
+
+        Pada mode threaded, menunggu frame yang belum pernah diambil (maksimal
+        `timeout` detik) sehingga frame yang sama tidak diproses dua kali.
+
+        Returns:
+            tuple: (ret, frame, timestamp, sequence)
+        """
+        if not self.threaded:
+            ret, frame = self.cap.read()
+            self.sequence += 1
+            return ret, frame, time.monotonic(), self.sequence
+
+        with self._condition:
+            if self._latest_consumed and self._running:
+                self._condition.wait_for(lambda: not self._latest_consumed or not self._running, timeout=timeout)
+            if self._latest_consumed:
+                return False, None, time.monotonic(), self.sequence  # Timeout: tidak ada frame baru
+            self._latest_consumed = True
+            return self._latest
+
     def get_frame(self):
         """
         Membaca satu frame dari kamera.
@@ -30,9 +107,186 @@ class VideoCapture:
                 - ret (bool): True jika pembacaan frame berhasil
                 - frame (np.array): Frame gambar dalam format BGR (OpenCV default)
         """
-        ret, frame = self.cap.read()
+        ret, frame, _, _ = self.get_timed_frame()
         return ret, frame
 
     def release(self):
         """Melepaskan resource kamera saat tidak digunakan lagi."""
+        if self._grabber_thread is not None:
+            with self._condition:
+                self._running = False
+                self._condition.notify_all()
+            self._grabber_thread.join(timeout=1.0)
+            self._grabber_thread = None
+        self.cap.release()
+
+class FileFrameSource:
+    def __init__(self, fps, realtime=False):
+        """
+        Dasar sumber frame dari rekaman dengan antarmuka yang sama seperti VideoCapture
+        (get_frame, get_timed_frame, release, fps, width, height).
+
+        Args:
+            fps (float): Laju frame rekaman.
+            realtime (bool): True = diputar sesuai timestamp asli (seperti kamera),
+                             False = secepat mungkin tanpa throttle.
+        """
+        self.fps = fps
+        self.realtime = realtime
+        self.is_live = False
+        self.sequence = 0
+        self.dropped_frames = 0  # Sumber file tidak pernah membuang frame
+        self.width = 0
+        self.height = 0
+        self._first_timestamp = None
+        self._wall_start = None
+
+    def _read_next(self):
+        """Diimplementasikan subclass: return (ret, frame, timestamp_detik)."""
+        raise NotImplementedError
+
+    def get_timed_frame(self, timeout=None):
+        """
+        Membaca frame berikutnya beserta timestamp asli rekaman dan nomor urutnya.
+
+        Returns:
+            tuple: (ret, frame, timestamp, sequence)
+        """
+        ret, frame, timestamp = self._read_next()
+        if not ret:
+            return False, None, timestamp, self.sequence
+        self.sequence += 1
+
+        if self.realtime:
+            # Tunggu sampai waktu dinding sesuai dengan timestamp rekaman
+            if self._first_timestamp is None:
+                self._first_timestamp, self._wall_start = timestamp, time.monotonic()
+            delay = (timestamp - self._first_timestamp) - (time.monotonic() - self._wall_start)
+            if delay > 0:
+                time.sleep(delay)
+        return True, frame, timestamp, self.sequence
+
+    def get_frame(self):
+        ret, frame, _, _ = self.get_timed_frame()
+        return ret, frame
+
+    def release(self):
+        pass
+
+class VideoFileSource(FileFrameSource):
+    def __init__(self, path, realtime=False):
+        """
+        Sumber frame dari file video, memakai timestamp asli dari container.
+
+        Args:
+            path (str): Path file video.
+            realtime (bool): Putar sesuai timestamp asli atau secepat mungkin.
+        """
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Tidak dapat membuka file video: {path}")
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        super().__init__(fps if fps and fps > 0 else 30.0, realtime)
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        print(f"Video dibuka: {path} {self.width}x{self.height} @ {self.fps} FPS, {self.frame_count} frame")
+
+    def _read_next(self):
+        ret, frame = self.cap.read()
+        # Timestamp frame yang baru dibaca; fallback ke nomor frame / fps jika container tidak menyediakan
+        position_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        timestamp = position_ms / 1000.0 if position_ms > 0 or self.sequence == 0 else self.sequence / self.fps
+        return ret, frame, timestamp
+
+    def release(self):
         self.cap.release()
+
+class ImageSequenceSource(FileFrameSource):
+    def __init__(self, directory, fps=30.0, realtime=False):
+        """
+        Sumber frame dari folder berisi gambar berurutan (diurutkan berdasarkan nama file).
+
+        Args:
+            directory (str): Folder gambar.
+            fps (float): Laju frame untuk menghitung timestamp (i / fps).
+            realtime (bool): Putar sesuai timestamp atau secepat mungkin.
+        """
+        super().__init__(fps, realtime)
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise IOError(f"Tidak ada file gambar di folder: {directory}")
+        self._index = 0
+        self.skipped_files = 0  # Gambar rusak/tidak terbaca yang dilewati
+        for path in self.paths:
+            first = cv2.imread(path)
+            if first is not None:
+                self.height, self.width = first.shape[:2]
+                break
+        print(f"Urutan gambar dibuka: {directory} ({len(self.paths)} frame @ {self.fps} FPS)")
+
+    def _read_next(self):
+        # Gambar yang tidak terbaca dilewati; timestamp tetap mengikuti posisi file sehingga celahnya terlihat
+        while self._index < len(self.paths):
+            path = self.paths[self._index]
+            frame = cv2.imread(path)
+            timestamp = self._index / self.fps
+            self._index += 1
+            if frame is not None:
+                return True, frame, timestamp
+            self.skipped_files += 1
+            print(f"Peringatan: gambar tidak dapat dibaca, dilewati: {path}")
+        return False, None, self._index / self.fps
+
+class ArrayFrameSource(FileFrameSource):
+    def __init__(self, frames, fps=30.0, timestamps=None, realtime=False):
+        """
+        Sumber frame dari array (N, H, W, 3) BGR, misalnya tumpukan frame .npy
+        yang dibuka dengan mmap sehingga tidak perlu dimuat seluruhnya ke memori.
+
+        Args:
+            frames (np.array): Tumpukan frame BGR uint8.
+            fps (float): Laju frame jika `timestamps` tidak diberikan.
+            timestamps (np.array, optional): Timestamp per frame (detik).
+            realtime (bool): Putar sesuai timestamp atau secepat mungkin.
+        """
+        super().__init__(fps, realtime)
+        self.frames = frames
+        self.timestamps = np.asarray(timestamps, dtype=np.float64) if timestamps is not None else None
+        self.height, self.width = frames.shape[1:3]
+        self._index = 0
+
+    def _read_next(self):
+        if self._index >= len(self.frames):
+            return False, None, self._index / self.fps
+        i = self._index
+        self._index += 1
+        timestamp = self.timestamps[i] if self.timestamps is not None else i / self.fps
+        return True, np.ascontiguousarray(self.frames[i]), timestamp
+
+def open_video_source(source, realtime=False, fps=30.0, **camera_options):
+    """
+    Buka sumber frame sesuai jenis `source`, semuanya dengan antarmuka yang sama.
+
+    Args:
+        source (int/str): ID kamera, file video, folder gambar, atau tumpukan frame .npy
+                          (file `<nama>_timestamps.npy` di sebelahnya dipakai jika ada).
+        realtime (bool): Untuk sumber file: putar sesuai timestamp asli atau secepat mungkin.
+        fps (float): Laju frame untuk folder gambar / .npy tanpa timestamp.
+        **camera_options: Diteruskan ke VideoCapture jika sumber berupa kamera.
+
+    Returns:
+        VideoCapture/FileFrameSource: Sumber frame yang sudah dibuka.
+    """
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return VideoCapture(device_id=int(source), **camera_options)
+    if os.path.isdir(source):
+        return ImageSequenceSource(source, fps=fps, realtime=realtime)
+    if source.lower().endswith(".npy"):
+        frames = np.load(source, mmap_mode='r')
+        timestamps_path = source[:-4] + "_timestamps.npy"
+        timestamps = np.load(timestamps_path) if os.path.exists(timestamps_path) else None
+        print(f"Tumpukan frame dibuka: {source} ({len(frames)} frame)")
+        return ArrayFrameSource(frames, fps=fps, timestamps=timestamps, realtime=realtime)
+    return VideoFileSource(source, realtime=realtime)
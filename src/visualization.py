@@ -1,21 +1,45 @@
 # visualization.py
+import math
+import threading
 import matplotlib.pyplot as plt
 import numpy as np
+from ring_buffer import RingBuffer
+
+PLOT_RENDER_HZ = 10.0      # Laju render plot default, terpisah dari laju pemrosesan
+PLOT_MAX_POINTS = 256      # Jumlah titik maksimum per garis setelah decimation
+YLIM_PADDING = 0.2         # Ruang tambahan saat batas sumbu-y diperbarui
+YLIM_SHRINK_RATIO = 0.25   # Batas diperkecil jika rentang data < rasio ini dari rentang sumbu
 
 class RealtimePlotter:
-    def __init__(self, buffer_size):
+    def __init__(self, buffer_size, blit=True, max_points=PLOT_MAX_POINTS):
         self.buffer_size = buffer_size
-        
+        self.blit = blit
+        # Decimation: buffer panjang digambar dengan langkah `stride`, titik terbaru selalu ikut
+        self.stride = max(1, math.ceil(buffer_size / max_points))
+        self._x = np.arange((buffer_size - 1) % self.stride, buffer_size, self.stride)
+
+        # Data disimpan di buffer tetap; update_plots hanya menyalin data (murah, per frame),
+        # sedangkan artist matplotlib baru disentuh saat render (laju tetap, thread Tk).
+        # update_plots dan render berjalan di thread berbeda: buffer data dijaga lock, render
+        # hanya memegangnya selama menyalin snapshot, bukan selama menggambar
+        self._lock = threading.Lock()
+        self.current_rppg_data = np.full(self.buffer_size, np.nan)           # rPPG terfilter
+        self.current_resp_filtered_data = np.full(self.buffer_size, np.nan)  # Respirasi terfilter
+        self.resp_raw_history = RingBuffer(self.buffer_size, with_timestamps=False)             # Respirasi mentah
+        self.rgb_history = RingBuffer(self.buffer_size, shape=(3,), with_timestamps=False)     # R, G, B mentah
+        self._padded = np.full((4, self.buffer_size), np.nan)  # Ruang kerja render (resp mentah, R, G, B)
+        self.dirty = False
+
         # Membuat figure dengan 3 subplot vertikal
-        self.fig, self.axs = plt.subplots(3, 1, figsize=(6, 7)) 
+        self.fig, self.axs = plt.subplots(3, 1, figsize=(6, 7))
         self.fig.suptitle("Sinyal Fisiologis & Mentah RGB")
+        empty = np.full(len(self._x), np.nan)
 
         # --- Subplot 1: Sinyal rPPG terfilter ---
         self.axs[0].set_title("Sinyal rPPG Terfilter")
         self.axs[0].set_xlabel("Sampel")
         self.axs[0].set_ylabel("Amplitudo")
-        self.current_rppg_data = np.zeros(self.buffer_size)  # Buffer data rPPG untuk plot
-        self.line_rppg, = self.axs[0].plot(self.current_rppg_data, color='purple', label='rPPG Terfilter')
+        self.line_rppg, = self.axs[0].plot(self._x, empty, color='purple', label='rPPG Terfilter', animated=blit)
         self.axs[0].grid(True)
         self.axs[0].legend(loc='upper right')
 
@@ -23,11 +47,8 @@ class RealtimePlotter:
         self.axs[1].set_title("Sinyal Respirasi")
         self.axs[1].set_xlabel("Sampel")
         self.axs[1].set_ylabel("Amplitudo")
-        self.current_resp_filtered_data = np.zeros(self.buffer_size)  # Buffer respirasi terfilter
-        self.line_resp_filtered, = self.axs[1].plot(self.current_resp_filtered_data, color='orange', label='Respirasi Terfilter')
-        
-        self.resp_raw_plot_buffer = np.zeros(self.buffer_size)  # Buffer respirasi mentah
-        self.line_resp_raw, = self.axs[1].plot(self.resp_raw_plot_buffer, color='cyan', label='Respirasi Mentah', linestyle=':')
+        self.line_resp_filtered, = self.axs[1].plot(self._x, empty, color='orange', label='Respirasi Terfilter', animated=blit)
+        self.line_resp_raw, = self.axs[1].plot(self._x, empty, color='cyan', label='Respirasi Mentah', linestyle=':', animated=blit)
         self.axs[1].grid(True)
         self.axs[1].legend(loc='upper right')
 
@@ -35,136 +56,179 @@ class RealtimePlotter:
         self.axs[2].set_title("Sinyal RGB Mentah dari ROI Wajah")
         self.axs[2].set_xlabel("Sampel")
         self.axs[2].set_ylabel("Intensitas Rata-rata")
-        self.r_raw_buffer = np.zeros(self.buffer_size)  # Buffer kanal merah
-        self.g_raw_buffer = np.zeros(self.buffer_size)  # Buffer kanal hijau
-        self.b_raw_buffer = np.zeros(self.buffer_size)  # Buffer kanal biru
-        self.line_r_raw, = self.axs[2].plot(self.r_raw_buffer, color='red', label='Merah (R)')
-        self.line_g_raw, = self.axs[2].plot(self.g_raw_buffer, color='green', label='Hijau (G)')
-        self.line_b_raw, = self.axs[2].plot(self.b_raw_buffer, color='blue', label='Biru (B)')
+        self.line_r_raw, = self.axs[2].plot(self._x, empty, color='red', label='Merah (R)', animated=blit)
+        self.line_g_raw, = self.axs[2].plot(self._x, empty, color='green', label='Hijau (G)', animated=blit)
+        self.line_b_raw, = self.axs[2].plot(self._x, empty, color='blue', label='Biru (B)', animated=blit)
         self.axs[2].grid(True)
         self.axs[2].legend(loc='upper right')
 
+        self._axis_lines = [
+            [self.line_rppg],
+            [self.line_resp_filtered, self.line_resp_raw],
+            [self.line_r_raw, self.line_g_raw, self.line_b_raw],
+        ]
+        for ax in self.axs:
+            ax.set_xlim(0, self.buffer_size - 1)
+        self._reset_limits()
+
         # Atur layout agar tidak saling tumpang tindih
         plt.tight_layout(rect=[0, 0.03, 1, 0.95])
 
+        self._canvas = None
+        self._backgrounds = None  # Latar statis (sumbu, grid, legend) per subplot untuk blitting
+
+    def _reset_limits(self):
+        self.axs[0].set_ylim(-1, 1)
+        self.axs[1].set_ylim(-1, 1)
+        self.axs[2].set_ylim(0, 256)
+
     def get_figure(self):
         # Mengembalikan objek figure matplotlib untuk embed di GUI
         return self.fig
 
+    def attach(self, canvas):
+        """
+        Hubungkan plotter ke canvas (FigureCanvasTkAgg). Setiap kali canvas digambar ulang
+        penuh (awal, resize, perubahan batas sumbu) latar statis disimpan ulang untuk blitting.
+        """
+        self._canvas = canvas
+        self._backgrounds = None
+        if self.blit and getattr(canvas, "supports_blit", False):
+            canvas.mpl_connect('draw_event', self._on_draw)
+        else:
+            self.blit = False
+            for lines in self._axis_lines:
+                for line in lines:
+                    line.set_animated(False)
+
+    def _on_draw(self, event):
+        # Dipanggil setelah draw penuh: simpan latar tanpa garis, lalu gambar garis di atasnya
+        self._backgrounds = [self._canvas.copy_from_bbox(ax.bbox) for ax in self.axs]
+        for ax, lines in zip(self.axs, self._axis_lines):
+            for line in lines:
+                ax.draw_artist(line)
+
     def get_current_plot_data(self):
-        # Mengembalikan copy data buffer saat ini untuk penyimpanan atau analisis
-        return {
-            "rppg_filtered": self.current_rppg_data.copy(),
-            "rgb_r": self.r_raw_buffer.copy(),
-            "rgb_g": self.g_raw_buffer.copy(),
-            "rgb_b": self.b_raw_buffer.copy(),
-            "resp_filtered": self.current_resp_filtered_data.copy(),
-            "resp_raw": self.resp_raw_plot_buffer.copy()
-        }
-
-    def update_plots(self, rppg_signal_filtered, resp_signal_filtered, 
+        # Mengembalikan copy data buffer saat ini (resolusi penuh) untuk penyimpanan atau analisis
+        with self._lock:
+            rgb = self._padded_history(self.rgb_history)
+            return {
+                "rppg_filtered": np.nan_to_num(self.current_rppg_data),
+                "rgb_r": rgb[0],
+                "rgb_g": rgb[1],
+                "rgb_b": rgb[2],
+                "resp_filtered": np.nan_to_num(self.current_resp_filtered_data),
+                "resp_raw": self._padded_history(self.resp_raw_history),
+            }
+
+    def _padded_history(self, history):
+        # Isi history ke array sepanjang buffer_size (kiri diisi nol), bentuk (..., buffer_size)
+        data = history.view()
+        out = np.zeros(data.shape[1:] + (self.buffer_size,))
+        if len(data):
+            out[..., self.buffer_size - len(data):] = data.T
+        return out
+
+    def _copy_latest(self, target, signal):
+        # Salin `buffer_size` sampel terakhir ke buffer tetap, sisanya NaN (tidak digambar)
+        data = np.asarray(signal)[-self.buffer_size:]
+        target[:self.buffer_size - len(data)] = np.nan
+        target[self.buffer_size - len(data):] = data
+
+    def update_plots(self, rppg_signal_filtered, resp_signal_filtered,
                      r_raw_value=None, g_raw_value=None, b_raw_value=None,
                      resp_raw_value=None):
-        plot_updated = False
-
-        # Update plot rPPG jika data tersedia
-        if rppg_signal_filtered is not None and len(rppg_signal_filtered) > 0:
-            self.current_rppg_data.fill(0)  # Kosongkan buffer
-            data_to_plot_rppg = rppg_signal_filtered[-self.buffer_size:]  # Ambil data terbaru
-            self.current_rppg_data[-len(data_to_plot_rppg):] = data_to_plot_rppg
-            self.line_rppg.set_ydata(self.current_rppg_data)
-
-            # Set batas sumbu-y dengan padding agar plot lebih enak dilihat
-            if len(data_to_plot_rppg) > 1:
-                min_val, max_val = np.min(data_to_plot_rppg), np.max(data_to_plot_rppg)
-                padding = 0.1 * max(abs(min_val), abs(max_val), 0.1)
-                self.axs[0].set_ylim(min_val - padding, max_val + padding if max_val > min_val else max_val + 0.5)
-            plot_updated = True
-
-        min_resp_val_combined, max_resp_val_combined = float('inf'), float('-inf')
-        
-        # Update plot respirasi terfilter
-        if resp_signal_filtered is not None and len(resp_signal_filtered) > 0:
-            self.current_resp_filtered_data.fill(0)
-            data_to_plot_resp_filtered = resp_signal_filtered[-self.buffer_size:]
-            self.current_resp_filtered_data[-len(data_to_plot_resp_filtered):] = data_to_plot_resp_filtered
-            self.line_resp_filtered.set_ydata(self.current_resp_filtered_data)
-            if len(data_to_plot_resp_filtered) > 1:
-                min_resp_val_combined = min(min_resp_val_combined, np.min(data_to_plot_resp_filtered))
-                max_resp_val_combined = max(max_resp_val_combined, np.max(data_to_plot_resp_filtered))
-            plot_updated = True
-        
-        # Update plot respirasi mentah dengan nilai baru yang masuk
-        if resp_raw_value is not None:
-            self.resp_raw_plot_buffer = np.roll(self.resp_raw_plot_buffer, -1)
-            self.resp_raw_plot_buffer[-1] = resp_raw_value
-            self.line_resp_raw.set_ydata(self.resp_raw_plot_buffer)
-            if np.any(self.resp_raw_plot_buffer):
-                min_resp_val_combined = min(min_resp_val_combined, np.min(self.resp_raw_plot_buffer))
-                max_resp_val_combined = max(max_resp_val_combined, np.max(self.resp_raw_plot_buffer))
-            plot_updated = True
-
-        # Set batas sumbu-y subplot respirasi gabungan (mentah + terfilter)
-        if min_resp_val_combined != float('inf') and max_resp_val_combined != float('-inf'):
-            if max_resp_val_combined > min_resp_val_combined:
-                padding_resp = 0.1 * max(abs(min_resp_val_combined), abs(max_resp_val_combined), 0.1)
-                self.axs[1].set_ylim(min_resp_val_combined - padding_resp, max_resp_val_combined + padding_resp if max_resp_val_combined > min_resp_val_combined else max_resp_val_combined + 0.5)
-            else:
-                self.axs[1].set_ylim(min_resp_val_combined - 0.5, max_resp_val_combined + 0.5)
-
-        # Update plot sinyal RGB mentah secara individual
-        min_rgb_val, max_rgb_val = 256, 0
-        if r_raw_value is not None:
-            self.r_raw_buffer = np.roll(self.r_raw_buffer, -1)
-            self.r_raw_buffer[-1] = r_raw_value
-            self.line_r_raw.set_ydata(self.r_raw_buffer)
-            if np.any(self.r_raw_buffer):
-                min_rgb_val = min(min_rgb_val, np.min(self.r_raw_buffer[self.r_raw_buffer != 0]))
-                max_rgb_val = max(max_rgb_val, np.max(self.r_raw_buffer))
-            plot_updated = True
-            
-        if g_raw_value is not None:
-            self.g_raw_buffer = np.roll(self.g_raw_buffer, -1)
-            self.g_raw_buffer[-1] = g_raw_value
-            self.line_g_raw.set_ydata(self.g_raw_buffer)
-            if np.any(self.g_raw_buffer):
-                min_rgb_val = min(min_rgb_val, np.min(self.g_raw_buffer[self.g_raw_buffer != 0]))
-                max_rgb_val = max(max_rgb_val, np.max(self.g_raw_buffer))
-            plot_updated = True
-
-        if b_raw_value is not None:
-            self.b_raw_buffer = np.roll(self.b_raw_buffer, -1)
-            self.b_raw_buffer[-1] = b_raw_value
-            self.line_b_raw.set_ydata(self.b_raw_buffer)
-            if np.any(self.b_raw_buffer):
-                min_rgb_val = min(min_rgb_val, np.min(self.b_raw_buffer[self.b_raw_buffer != 0]))
-                max_rgb_val = max(max_rgb_val, np.max(self.b_raw_buffer))
-            plot_updated = True
-        
-        # Set batas sumbu-y subplot RGB dengan padding agar nilai 0-255 pas terlihat
-        if r_raw_value is not None or g_raw_value is not None or b_raw_value is not None:
-            if max_rgb_val > min_rgb_val and max_rgb_val != 0:
-                padding_rgb = 10
-                self.axs[2].set_ylim(max(0, min_rgb_val - padding_rgb), min(255, max_rgb_val + padding_rgb))
-            else:
-                self.axs[2].set_ylim(0, 256)
+        # Hanya memperbarui data plot (O(N) salin, tanpa np.roll, tanpa set_ylim);
+        # penggambaran dilakukan oleh render() dengan laju tetap
+        with self._lock:
+            if rppg_signal_filtered is not None and len(rppg_signal_filtered) > 0:
+                self._copy_latest(self.current_rppg_data, rppg_signal_filtered)
+            if resp_signal_filtered is not None and len(resp_signal_filtered) > 0:
+                self._copy_latest(self.current_resp_filtered_data, resp_signal_filtered)
+            if resp_raw_value is not None:
+                self.resp_raw_history.append(resp_raw_value)
+            if r_raw_value is not None or g_raw_value is not None or b_raw_value is not None:
+                last = self.rgb_history.last(default=(np.nan, np.nan, np.nan))
+                self.rgb_history.append((r_raw_value if r_raw_value is not None else last[0],
+                                         g_raw_value if g_raw_value is not None else last[1],
+                                         b_raw_value if b_raw_value is not None else last[2]))
+            self.dirty = True
+
+    def _update_limits(self, ax, data, min_padding, clip=None):
+        # Hysteresis: batas sumbu hanya berubah jika data keluar dari batas atau jauh lebih sempit
+        finite = data[np.isfinite(data)]
+        if finite.size < 2:
+            return False
+        lo, hi = float(finite.min()), float(finite.max())
+        y_lo, y_hi = ax.get_ylim()
+        span = hi - lo
+        inside = lo >= y_lo and hi <= y_hi
+        if inside and span >= YLIM_SHRINK_RATIO * (y_hi - y_lo):
+            return False
+        padding = max(YLIM_PADDING * span, min_padding)
+        new_lo, new_hi = lo - padding, hi + padding
+        if clip is not None:
+            new_lo, new_hi = max(clip[0], new_lo), min(clip[1], new_hi)
+        ax.set_ylim(new_lo, new_hi)
+        return True
+
+    def render(self):
+        """
+        Gambar data terbaru (dipanggil berkala dari thread Tk, misal PLOT_RENDER_HZ kali per detik).
+        Dengan blitting hanya garis yang digambar ulang di atas latar statis; gambar ulang
+        penuh hanya terjadi saat batas sumbu berubah.
+        """
+        if self._canvas is None:
+            return
+        # Snapshot ter-decimasi di bawah lock (indeks fancy selalu menyalin); matplotlib di luar lock
+        x = self._x
+        with self._lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            raw = self._padded
+            raw[:] = np.nan
+            resp_raw = self.resp_raw_history.view()
+            if len(resp_raw):
+                raw[0, self.buffer_size - len(resp_raw):] = resp_raw
+            rgb = self.rgb_history.view()
+            if len(rgb):
+                raw[1:, self.buffer_size - len(rgb):] = rgb.T
+            rppg = self.current_rppg_data[x]
+            resp_filtered = self.current_resp_filtered_data[x]
+            decimated_raw = raw[:, x]
+        self.line_rppg.set_ydata(rppg)
+        self.line_resp_filtered.set_ydata(resp_filtered)
+        self.line_resp_raw.set_ydata(decimated_raw[0])
+        self.line_r_raw.set_ydata(decimated_raw[1])
+        self.line_g_raw.set_ydata(decimated_raw[2])
+        self.line_b_raw.set_ydata(decimated_raw[3])
+
+        limits_changed = self._update_limits(self.axs[0], rppg, 0.1)
+        limits_changed |= self._update_limits(self.axs[1], np.concatenate((resp_filtered, decimated_raw[0])), 0.1)
+        limits_changed |= self._update_limits(self.axs[2], decimated_raw[1:].ravel(), 5.0, clip=(0, 256))
+
+        if not self.blit or limits_changed or self._backgrounds is None:
+            self._canvas.draw_idle()  # Gambar ulang penuh; latar blit disimpan ulang di _on_draw
+            return
+        for ax, background, lines in zip(self.axs, self._backgrounds, self._axis_lines):
+            self._canvas.restore_region(background)
+            for line in lines:
+                ax.draw_artist(line)
+            self._canvas.blit(ax.bbox)
 
     def clear_plots(self):
         # Reset semua buffer dan set batas sumbu-y default
-        self.current_rppg_data.fill(0)
-        self.line_rppg.set_ydata(self.current_rppg_data)
-        self.axs[0].set_ylim(-1, 1)
-        
-        self.current_resp_filtered_data.fill(0)
-        self.line_resp_filtered.set_ydata(self.current_resp_filtered_data)
-        self.resp_raw_plot_buffer.fill(0)
-        self.line_resp_raw.set_ydata(self.resp_raw_plot_buffer)
-        self.axs[1].set_ylim(-1, 1)
-        
-        self.r_raw_buffer.fill(0)
-        self.g_raw_buffer.fill(0)
-        self.b_raw_buffer.fill(0)
-        self.line_r_raw.set_ydata(self.r_raw_buffer)
-        self.line_g_raw.set_ydata(self.g_raw_buffer)
-        self.line_b_raw.set_ydata(self.b_raw_buffer)
-        self.axs[2].set_ylim(0, 256)
+        with self._lock:
+            self.current_rppg_data.fill(np.nan)
+            self.current_resp_filtered_data.fill(np.nan)
+            self.resp_raw_history.clear()
+            self.rgb_history.clear()
+            self.dirty = False
+        empty = np.full(len(self._x), np.nan)
+        for lines in self._axis_lines:
+            for line in lines:
+                line.set_ydata(empty)
+        self._reset_limits()
+        if self._canvas is not None:
+            self._canvas.draw_idle()